@@ -0,0 +1,190 @@
+"""initial schema
+
+Tabelas como eram criadas pelo Base.metadata.create_all() + run_migrations()
+em app/main.py. Bancos que já existiam antes do Alembic não devem rodar esta
+revisão: marque-os com `alembic stamp 0001` e siga com `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-11-20 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Mesmos nomes/valores que o sa.Enum(<classe>) dos models gera (nomes dos membros)
+bill_status = sa.Enum("PENDING", "CONFIRMED", "SCHEDULED", "PAID", "OVERDUE", "CANCELLED", name="billstatus")
+bill_type = sa.Enum("EXPENSE", "INCOME", name="billtype")
+payment_method = sa.Enum("PIX", "BOLETO", "DEBIT", "CREDIT", "TRANSFER", name="paymentmethod")
+payment_status = sa.Enum("SCHEDULED", "EXECUTED", "FAILED", "CANCELLED", name="paymentstatus")
+notification_channel = sa.Enum("EMAIL", "SMS", "PUSH", name="notificationchannel")
+notification_type = sa.Enum(
+    "REMINDER", "OVERDUE", "PAYMENT_CONFIRMED", "RECONCILIATION", "ANOMALY",
+    "SAVINGS_GOAL_REMINDER", "SAVINGS_GOAL_DEADLINE",
+    name="notificationtype",
+)
+savings_goal_status = sa.Enum("ACTIVE", "COMPLETED", "CANCELLED", "EXPIRED", name="savingsgoalstatus")
+investment_type = sa.Enum("STOCK", "FIXED_INCOME", "FUND", "CRYPTO", "REAL_ESTATE", "OTHER", name="investmenttype")
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("phone", sa.String(20), nullable=True),
+        sa.Column("reset_token", sa.String(255), nullable=True),
+        sa.Column("reset_token_expires", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("email_verified", sa.Boolean(), nullable=True),
+        sa.Column("verification_token", sa.String(255), nullable=True),
+        sa.Column("verification_token_expires", sa.DateTime(timezone=True), nullable=True),
+        *_timestamps(),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("notif_prefs", postgresql.JSONB(), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "accounts",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("type", sa.String(50), nullable=False),
+        sa.Column("estimated_balance", sa.Float(), nullable=True),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "bills",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("issuer", sa.String(255), nullable=True),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("currency", sa.String(3), nullable=True),
+        sa.Column("due_date", sa.Date(), nullable=True),
+        sa.Column("barcode", sa.String(255), nullable=True),
+        sa.Column("status", bill_status, nullable=True),
+        sa.Column("type", bill_type, nullable=True),
+        sa.Column("is_bill", sa.Boolean(), nullable=True),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("category", sa.String(50), nullable=True),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "bill_documents",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("bill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("bills.id"), nullable=False),
+        sa.Column("s3_path", sa.String(500), nullable=False),
+        sa.Column("content_sha256", sa.String(64), nullable=True),
+        sa.Column("ocr_text", sa.Text(), nullable=True),
+        sa.Column("ocr_confidence", sa.Float(), nullable=True),
+        sa.Column("ocr_method", sa.String(20), nullable=True),
+        sa.Column("extracted_json", postgresql.JSONB(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_bill_documents_content_sha256", "bill_documents", ["content_sha256"])
+
+    op.create_table(
+        "payments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("bill_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("bills.id"), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("scheduled_date", sa.Date(), nullable=False),
+        sa.Column("executed_date", sa.Date(), nullable=True),
+        sa.Column("method", payment_method, nullable=False),
+        sa.Column("status", payment_status, nullable=True),
+        sa.Column("comprovante_path", sa.String(500), nullable=True),
+        sa.Column("notify_before_days", postgresql.JSONB(), nullable=True),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "notifications",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("type", notification_type, nullable=False),
+        sa.Column("channel", notification_channel, nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("payload", postgresql.JSONB(), nullable=True),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "savings_goals",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("target_amount", sa.Float(), nullable=False),
+        sa.Column("current_amount", sa.Float(), nullable=True),
+        sa.Column("deadline", sa.Date(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("status", savings_goal_status, nullable=True),
+        sa.Column("notify_days_before", postgresql.JSONB(), nullable=True),
+        sa.Column("last_notification_sent", sa.Date(), nullable=True),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "investments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("type", investment_type, nullable=False),
+        sa.Column("amount_invested", sa.Float(), nullable=False),
+        sa.Column("current_value", sa.Float(), nullable=True),
+        sa.Column("purchase_date", sa.Date(), nullable=False),
+        sa.Column("sell_date", sa.Date(), nullable=True),
+        sa.Column("institution", sa.String(255), nullable=True),
+        sa.Column("ticker", sa.String(50), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("entity", sa.String(100), nullable=False),
+        sa.Column("action", sa.String(50), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("details", postgresql.JSONB(), nullable=True),
+        sa.Column("ip_address", sa.String(45), nullable=True),
+        sa.Column("user_agent", sa.String(500), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "audit_logs", "investments", "savings_goals", "notifications", "payments",
+        "bill_documents", "bills", "accounts", "users",
+    ):
+        op.drop_table(table)
+
+    bind = op.get_bind()
+    for enum_type in (
+        investment_type, savings_goal_status, notification_type, notification_channel,
+        payment_status, payment_method, bill_type, bill_status,
+    ):
+        enum_type.drop(bind, checkfirst=True)
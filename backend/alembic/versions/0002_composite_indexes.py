@@ -0,0 +1,53 @@
+"""composite indexes for per-user queries
+
+- bills (user_id, due_date): GET /bills, lembretes e relatórios por período
+- bills (user_id, status): fila de revisão (QA) e filtros por status
+- notifications (user_id, type, sent_at): checagem "já notificado hoje" das tasks do Celery
+- payments (user_id, scheduled_date): listagem de pagamentos
+
+Criados com CONCURRENTLY para não travar escrita em produção.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-11-20 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_bills_user_id_due_date", "bills", ["user_id", "due_date"]),
+    ("ix_bills_user_id_status", "bills", ["user_id", "status"]),
+    ("ix_notifications_user_id_type_sent_at", "notifications", ["user_id", "type", "sent_at"]),
+    ("ix_payments_user_id_scheduled_date", "payments", ["user_id", "scheduled_date"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,62 @@
+"""user_monthly_summary rollup
+
+Totais e contagens de bills por (usuário, mês do vencimento, tipo, categoria,
+status), mantidos por app.services.monthly_summary a cada escrita de bill.
+O backfill abaixo é o mesmo cálculo de monthly_summary.rebuild().
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-11-24 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tipos já criados na 0001
+bill_type = postgresql.ENUM("EXPENSE", "INCOME", name="billtype", create_type=False)
+bill_status = postgresql.ENUM(
+    "PENDING", "CONFIRMED", "SCHEDULED", "PAID", "OVERDUE", "CANCELLED", name="billstatus", create_type=False
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_monthly_summary",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("type", bill_type, nullable=False),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("status", bill_status, nullable=False),
+        sa.Column("total", sa.Numeric(14, 2), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "month", "type", "category", "status"),
+    )
+
+    op.execute("""
+        INSERT INTO user_monthly_summary (user_id, month, type, category, status, total, count)
+        SELECT user_id,
+               date_trunc('month', due_date)::date,
+               COALESCE(type, 'EXPENSE'),
+               COALESCE(category, ''),
+               COALESCE(status, 'PENDING'),
+               ROUND(COALESCE(SUM(amount), 0)::numeric, 2),
+               COUNT(*)
+        FROM bills
+        WHERE due_date IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_monthly_summary")
@@ -0,0 +1,30 @@
+"""users.token_version
+
+Versão dos tokens do usuário: vai no claim "ver" do JWT e é incrementada na
+redefinição de senha, revogando os tokens emitidos antes. Também compõe a
+chave do cache de usuário autenticado (app.services.user_cache).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-11-26 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
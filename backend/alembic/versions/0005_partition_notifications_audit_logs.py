@@ -0,0 +1,95 @@
+"""monthly partitions for notifications and audit_logs
+
+Recria as duas tabelas como PARTITION BY RANGE (uma partição por mês, de
+notifications.created_at e audit_logs.timestamp) e copia os dados. A chave de
+partição precisa fazer parte da PK, que passa a ser (id, <coluna>), e a coluna
+vira NOT NULL. São criadas partições do mês mais antigo existente até 12 meses
+à frente; depois disso a task maintain_partitions (app.db.partitions) cria os
+próximos meses e aplica DATA_RETENTION_DAYS.
+
+A cópia reescreve as tabelas inteiras: rodar numa janela de manutenção.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-11-27 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tabela -> (chave de partição, índices secundários (nome, colunas))
+TABLES = {
+    "notifications": ("created_at", [("ix_notifications_user_id_type_sent_at", "user_id, type, sent_at")]),
+    "audit_logs": ("timestamp", []),
+}
+
+MONTHS_AHEAD = 12
+
+
+def _create_monthly_partitions(table: str, column: str, source: str):
+    column = f'"{column}"'
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+            last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            SELECT date_trunc('month', COALESCE(min({column}), now()) AT TIME ZONE 'UTC')::date INTO month FROM {source};
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(month, 'YYYY_MM'),
+                    to_char(month, 'YYYY-MM-DD') || ' 00:00:00+00',
+                    to_char(month + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00'
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+
+
+def _swap_table(table: str, column: str, indexes, partitioned: bool):
+    """Rename `table` away, recreate it (partitioned or not), copy the rows and drop the old one."""
+    old = f"{table}_old"
+    key = f'"{column}"'  # audit_logs."timestamp"
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey")
+    for name, _ in indexes:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_old")
+
+    partition_by = f" PARTITION BY RANGE ({key})" if partitioned else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS){partition_by}")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {key} SET DEFAULT now()")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL")
+    primary_key = f"id, {key}" if partitioned else "id"
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    if partitioned:
+        _create_monthly_partitions(table, column, old)
+
+    # Linhas antigas sem data (created_at sem NOT NULL) entram no mês atual
+    op.execute(f"UPDATE {old} SET {key} = now() WHERE {key} IS NULL")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+    for name, columns in indexes:
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def upgrade() -> None:
+    for table, (column, indexes) in TABLES.items():
+        _swap_table(table, column, indexes, partitioned=True)
+
+
+def downgrade() -> None:
+    # Partições arquivadas (schema archive) não voltam: ficam onde estão
+    for table, (column, indexes) in TABLES.items():
+        _swap_table(table, column, indexes, partitioned=False)
@@ -1,16 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.db.models import User
 from app.core.security import decode_token
+from app.services.user_cache import user_cache
 
 security = HTTPBearer()
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user from JWT token."""
     token = credentials.credentials
@@ -30,12 +32,28 @@ async def get_current_user(
             detail="Invalid token payload",
         )
     
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    # Tokens emitidos antes do claim "ver" valem como versão 0
+    token_version = payload.get("ver", 0)
+    
+    cached_user = await user_cache.aget(user_id, token_version)
+    if cached_user is not None:
+        # Anexa à sessão sem SELECT: alterações no usuário continuam sendo salvas pelo commit
+        return await db.merge(cached_user, load=False)
+    
+    result = await db.execute(select(User).where(User.id == user_id, User.is_active == True))
+    user = result.scalars().first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive",
         )
     
+    if (user.token_version or 0) != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    await user_cache.aset(user)
     return user
-
@@ -0,0 +1,177 @@
+"""
+Keyset pagination and sparse fieldsets for the list endpoints.
+
+The body stays a JSON list (what the frontend already consumes); when there
+are more rows, the cursor for the next page goes in the X-Next-Cursor header.
+Without `limit` the endpoints return LIST_DEFAULT_LIMIT rows, never the whole table;
+clients that need every row follow the cursor (getAllPages in the frontend).
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class ListField:
+    """A response field: the columns it needs and how to build its value from a row."""
+    columns: Tuple[Any, ...]
+    serialize: Callable[[Any], Any]
+
+
+def column_field(column, convert: Callable[[Any], Any] = None) -> ListField:
+    """Field read straight from one column (None stays None)."""
+    key = column.key
+
+    def serialize(row):
+        value = getattr(row, key)
+        if value is None or convert is None:
+            return value
+        return convert(value)
+
+    return ListField((column,), serialize)
+
+
+def iso(value) -> str:
+    return value.isoformat()
+
+
+def enum_value(value) -> str:
+    return value.value
+
+
+def parse_fields(fields: Optional[str], available: Dict[str, ListField]) -> List[str]:
+    """Requested field names, in declaration order. None/empty means all fields."""
+    if not fields:
+        return list(available)
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos: {', '.join(sorted(unknown))}. Disponíveis: {', '.join(available)}"
+        )
+    return [name for name in available if name in requested]
+
+
+def select_columns(available: Dict[str, ListField], names: Sequence[str], *required) -> List[Any]:
+    """Columns to SELECT for the requested fields, plus the keyset columns."""
+    columns: List[Any] = []
+    for column in [col for name in names for col in available[name].columns] + list(required):
+        if not any(column is existing for existing in columns):
+            columns.append(column)
+    return columns
+
+
+def encode_cursor(sort_value: Any, row_id: UUID) -> str:
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if sort_value is not None:
+            python_type = sort_column.type.python_type
+            if python_type is date:
+                sort_value = date.fromisoformat(sort_value)
+            elif python_type is datetime:
+                sort_value = datetime.fromisoformat(sort_value)
+            else:
+                sort_value = python_type(sort_value)
+        return sort_value, UUID(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def keyset_order(
+    query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    descending: bool = False
+):
+    """
+    Apply the cursor filter, the (sort_column, id) order and limit + 1 to a
+    Query or a select(); run it and pass the rows to keyset_page().
+
+    NULLs in sort_column come last in both directions (Bill.due_date: uploads
+    still waiting for OCR show up at the end).
+    """
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort_column)
+        after = (lambda col, value: col < value) if descending else (lambda col, value: col > value)
+        if last_value is None:
+            query = query.filter(and_(sort_column.is_(None), after(id_column, last_id)))
+        else:
+            nullable = sort_column.expression.nullable
+            # Faixa simples na frente do OR para o planner usar o índice (user_id, sort_column)
+            reached = sort_column <= last_value if descending else sort_column >= last_value
+            later = [
+                after(sort_column, last_value),
+                and_(sort_column == last_value, after(id_column, last_id)),
+            ]
+            if nullable:
+                reached = or_(reached, sort_column.is_(None))
+                later.append(sort_column.is_(None))
+            query = query.filter(reached, or_(*later))
+
+    if descending:
+        order = sort_column.desc()
+        # NULLS LAST só quando a coluna aceita NULL: senão o índice serve a ordenação ao contrário
+        if sort_column.expression.nullable:
+            order = order.nulls_last()
+        query = query.order_by(order, id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+
+def keyset_page(rows: Sequence[Any], response: Response, sort_column, id_column, limit: Optional[int] = None) -> List[Any]:
+    """Drop the look-ahead row and set X-Next-Cursor when there is a next page."""
+    rows = list(rows)
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return rows
+
+
+def keyset_paginate(
+    query: Query,
+    response: Response,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    descending: bool = False
+) -> List[Any]:
+    """One page of a sync Query, ordered by (sort_column, id)."""
+    query = keyset_order(query, sort_column, id_column, cursor, limit, descending)
+    return keyset_page(query.all(), response, sort_column, id_column, limit)
+
+
+def serialize_rows(rows: Sequence[Any], available: Dict[str, ListField], names: Sequence[str]) -> List[Dict[str, Any]]:
+    return [{name: available[name].serialize(row) for name in names} for row in rows]
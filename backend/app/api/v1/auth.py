@@ -1,13 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from datetime import timedelta, datetime, timezone
 import logging
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.db.models import User
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     create_refresh_token,
     create_reset_token,
@@ -17,6 +16,7 @@ from app.core.security import (
 from app.core.config import settings
 from app.services.audit_service import audit_service
 from app.services.notification_service import notification_service
+from app.services.password_hasher import password_hasher, PasswordHashQueueFullError
 from app.api.dependencies import get_current_user
 from fastapi import Request
 
@@ -25,6 +25,26 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _first_user(db: AsyncSession, *criteria):
+    result = await db.execute(select(User).where(*criteria))
+    return result.scalars().first()
+
+
+def _hash_queue_full(error: PasswordHashQueueFullError) -> HTTPException:
+    logger.warning(f"🔐 {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Muitas requisições de autenticação no momento. Tente novamente em alguns segundos.",
+        headers={"Retry-After": "2"}
+    )
+
+
+def _issue_tokens(user: User):
+    """Access and refresh tokens carrying the user's current token version."""
+    claims = {"sub": str(user.id), "ver": user.token_version or 0}
+    return create_access_token(data=claims), create_refresh_token(data=claims)
+
+
 class UserRegister(BaseModel):
     name: str
     email: EmailStr
@@ -63,12 +83,12 @@ class VerifyEmailRequest(BaseModel):
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserRegister,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Register a new user. Sends verification email."""
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await _first_user(db, User.email == user_data.email)
     if existing_user:
         # Send informative email to user explaining the situation (não falha se email falhar)
         try:
@@ -91,17 +111,22 @@ async def register(
             detail="Email já cadastrado"
         )
     
+    try:
+        password_hash = await password_hasher.hash(user_data.password)
+    except PasswordHashQueueFullError as e:
+        raise _hash_queue_full(e)
+    
     # Create user (email not verified yet)
     user = User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=password_hash,
         phone=user_data.phone,
         email_verified=False
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Generate verification token
     verification_token = create_verification_token(data={"sub": str(user.id), "email": user.email})
@@ -110,10 +135,10 @@ async def register(
     # Save verification token
     user.verification_token = verification_token
     user.verification_token_expires = verification_token_expires
-    db.commit()
+    await db.commit()
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="user",
         action="create",
@@ -141,11 +166,11 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     credentials: UserLogin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Login and get JWT tokens."""
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await _first_user(db, User.email == credentials.email)
     
     # Verificar se o email existe primeiro
     if not user:
@@ -156,13 +181,26 @@ async def login(
         )
     
     # Se o usuário existe, verificar a senha
-    if not verify_password(credentials.password, user.password_hash):
+    try:
+        password_ok = await password_hasher.verify(credentials.password, user.password_hash)
+    except PasswordHashQueueFullError as e:
+        raise _hash_queue_full(e)
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Senha incorreta. Verifique sua senha e tente novamente.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Hash feito com parâmetros Argon2 antigos: atualizar agora que temos a senha
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await password_hasher.hash(credentials.password)
+            await db.commit()
+        except PasswordHashQueueFullError:
+            pass  # Fica para o próximo login
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -177,7 +215,7 @@ async def login(
         )
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="user",
         action="login",
@@ -186,8 +224,7 @@ async def login(
     )
     
     # Generate tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    access_token, refresh_token = _issue_tokens(user)
     
     return TokenResponse(
         access_token=access_token,
@@ -198,7 +235,7 @@ async def login(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     token_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Refresh access token using refresh token."""
     payload = decode_token(token_data.refresh_token)
@@ -210,7 +247,7 @@ async def refresh_token(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await _first_user(db, User.id == user_id, User.is_active == True)
     
     if not user:
         raise HTTPException(
@@ -218,9 +255,14 @@ async def refresh_token(
             detail="Usuário não encontrado ou inativo"
         )
     
+    if payload.get("ver", 0) != (user.token_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de atualização revogado. Faça login novamente."
+        )
+    
     # Generate new tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    access_token, refresh_token = _issue_tokens(user)
     
     return TokenResponse(
         access_token=access_token,
@@ -231,11 +273,11 @@ async def refresh_token(
 @router.post("/forgot-password")
 async def forgot_password(
     request_data: ForgotPasswordRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Request password reset. Sends email with reset link."""
-    user = db.query(User).filter(User.email == request_data.email).first()
+    user = await _first_user(db, User.email == request_data.email)
     
     # Always return success to prevent email enumeration
     if not user:
@@ -248,7 +290,7 @@ async def forgot_password(
     # Save token to user
     user.reset_token = reset_token
     user.reset_token_expires = reset_token_expires
-    db.commit()
+    await db.commit()
     
     # Send email with reset link
     reset_link = f"{settings.FRONTEND_URL or 'http://localhost:3000'}/reset-password?token={reset_token}"
@@ -375,7 +417,7 @@ Equipe EconomizeIA
         logger.warning(f"Reset link: {reset_link}")
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="user",
         action="password_reset_requested",
@@ -390,7 +432,7 @@ Equipe EconomizeIA
 @router.post("/reset-password")
 async def reset_password(
     reset_data: ResetPasswordRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Reset password using reset token."""
@@ -404,7 +446,7 @@ async def reset_password(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _first_user(db, User.id == user_id)
     
     if not user:
         raise HTTPException(
@@ -433,13 +475,18 @@ async def reset_password(
         )
     
     # Update password
-    user.password_hash = get_password_hash(reset_data.new_password)
+    try:
+        user.password_hash = await password_hasher.hash(reset_data.new_password)
+    except PasswordHashQueueFullError as e:
+        raise _hash_queue_full(e)
     user.reset_token = None
     user.reset_token_expires = None
-    db.commit()
+    # Revoga access/refresh tokens emitidos com a senha antiga
+    user.token_version = (user.token_version or 0) + 1
+    await db.commit()
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="user",
         action="password_reset",
@@ -454,7 +501,7 @@ async def reset_password(
 @router.post("/verify-email", status_code=status.HTTP_200_OK)
 async def verify_email(
     verify_data: VerifyEmailRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Verify user email using verification token."""
@@ -467,7 +514,7 @@ async def verify_email(
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _first_user(db, User.id == user_id)
     
     if not user:
         raise HTTPException(
@@ -492,10 +539,10 @@ async def verify_email(
     user.email_verified = True
     user.verification_token = None
     user.verification_token_expires = None
-    db.commit()
+    await db.commit()
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="user",
         action="email_verified",
@@ -516,11 +563,11 @@ async def verify_email(
 @router.post("/resend-verification", status_code=status.HTTP_200_OK)
 async def resend_verification(
     request_data: ForgotPasswordRequest,  # Reuse same model (just needs email)
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Resend verification email."""
-    user = db.query(User).filter(User.email == request_data.email).first()
+    user = await _first_user(db, User.email == request_data.email)
     
     if not user:
         # Return generic response to prevent email enumeration
@@ -536,7 +583,7 @@ async def resend_verification(
     # Save verification token
     user.verification_token = verification_token
     user.verification_token_expires = verification_token_expires
-    db.commit()
+    await db.commit()
     
     # Send verification email
     try:
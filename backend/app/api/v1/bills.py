@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import date, datetime
@@ -8,10 +8,14 @@ from uuid import UUID
 import uuid
 import logging
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.db.models import User, Bill, BillDocument, BillStatus, BillType
 from app.api.dependencies import get_current_user
-from app.services.ocr_service import ocr_service
+from app.api.pagination import ListField, column_field, iso, enum_value, parse_fields, select_columns, keyset_order, keyset_page, serialize_rows
+from app.core.config import settings
+from app.services.ocr_executor import ocr_executor, OCRQueueFullError
+from app.services.ocr_result_cache import ocr_result_cache
+from app.services.bill_processing import apply_cached_result
 from app.services.ollama_service import ollama_service
 from app.services.storage_service import storage_service
 from app.services.audit_service import audit_service
@@ -38,6 +42,7 @@ class BillUploadResponse(BaseModel):
     bill_id: str
     preview: BillPreview
     requires_manual_review: bool
+    job_id: Optional[str] = None  # Acompanhar em GET /bills/{bill_id}/processing-status
 
 
 class BillConfirmRequest(BaseModel):
@@ -64,12 +69,36 @@ class BillCreateRequest(BaseModel):
     is_bill: Optional[bool] = False  # False para transações manuais (não-boletos)
 
 
+async def _first(db: AsyncSession, statement):
+    result = await db.execute(statement)
+    return result.scalars().first()
+
+
+async def _get_user_bill(db: AsyncSession, bill_id: UUID, user_id) -> Optional[Bill]:
+    return await _first(db, select(Bill).where(and_(Bill.id == bill_id, Bill.user_id == user_id)))
+
+
+async def _log_upload(db: AsyncSession, user: User, bill: Bill, filename: Optional[str], request: Optional[Request]):
+    """Audit log for an upload; never breaks the upload itself."""
+    try:
+        await audit_service.log_action_async(
+            db=db,
+            entity="bill",
+            action="create",
+            user_id=user.id,
+            details={"bill_id": str(bill.id), "filename": filename},
+            request=request
+        )
+    except Exception as audit_error:
+        logger.warning(f"Erro ao criar audit log: {audit_error}")
+
+
 @router.post("/upload", response_model=BillUploadResponse, status_code=status.HTTP_201_CREATED)
 async def upload_bill(
     file: UploadFile = File(...),
     metadata: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Upload a bill document (PDF/IMG) for processing."""
@@ -103,8 +132,8 @@ async def upload_bill(
             issuer=None  # Será preenchido após OCR
         )
         db.add(bill)
-        db.commit()
-        db.refresh(bill)
+        await db.commit()
+        await db.refresh(bill)
         
         # Upload to storage
         object_name = f"bills/{current_user.id}/{bill.id}/{file.filename}"
@@ -116,184 +145,91 @@ async def upload_bill(
             s3_path = f"mock/{object_name}"
         
         # Create document record
+        content_hash = ocr_result_cache.content_hash(file_bytes)
         document = BillDocument(
             id=uuid.uuid4(),
             bill_id=bill.id,
-            s3_path=s3_path
+            s3_path=s3_path,
+            content_sha256=content_hash
         )
         db.add(document)
-        db.commit()
+        await db.commit()
+        
+        # Mesmo arquivo já processado: reaproveitar OCR/extração sem enfileirar nada
+        cached = await db.run_sync(ocr_result_cache.get, content_hash)
+        if cached:
+            apply_cached_result(bill, document, cached)
+            await db.commit()
+            logger.info(f"Boleto {bill.id} preenchido a partir do cache de OCR")
+            await _log_upload(db, current_user, bill, file.filename, request)
+            return BillUploadResponse(
+                bill_id=str(bill.id),
+                preview=BillPreview(
+                    issuer=bill.issuer,
+                    amount=bill.amount,
+                    currency=bill.currency or "BRL",
+                    due_date=bill.due_date.isoformat() if bill.due_date else None,
+                    barcode=bill.barcode,
+                    confidence=bill.confidence or 0.0,
+                    requires_manual_review=bill.status != BillStatus.CONFIRMED
+                ),
+                requires_manual_review=bill.status != BillStatus.CONFIRMED
+            )
         
         # Process asynchronously (opcional - não quebra se Celery não estiver rodando)
+        # O id do documento é o job_id nos dois caminhos (Celery ou executor local)
+        job_id = str(document.id)
         celery_available = False
         try:
             from app.tasks.bill_tasks import process_bill_upload
-            process_bill_upload.delay(str(bill.id), str(document.id))
+            process_bill_upload.apply_async(args=[str(bill.id), str(document.id)], task_id=job_id)
             logger.info(f"Tarefa de processamento agendada para boleto {bill.id}")
             celery_available = True
         except Exception as celery_error:
-            logger.warning(f"Celery não disponível, processando sincronamente: {celery_error}")
+            logger.warning(f"Celery não disponível, processando no executor de OCR local: {celery_error}")
             celery_available = False
         
-        # Se Celery não estiver disponível, processar sincronamente
+        # Se Celery não estiver disponível, OCR roda no pool de processos local (fora do event loop)
         if not celery_available:
             try:
-                logger.info(f"Processando OCR sincronamente para boleto {bill.id}")
-                # Processar OCR diretamente
-                ocr_text, ocr_confidence = ocr_service.extract_text(file_bytes, content_type)
-                document.ocr_text = ocr_text
-                document.ocr_confidence = ocr_confidence
-                db.commit()
-                
-                logger.info(f"OCR concluído para boleto {bill.id}. Texto extraído: {len(ocr_text)} caracteres, confiança: {ocr_confidence:.2f}")
-                
-                # Se houver texto extraído, tentar extrair campos
-                if ocr_text and len(ocr_text.strip()) > 10:
-                    try:
-                        # PRIMEIRO: Tentar extração com regex específico para boletos brasileiros (rápido e preciso)
-                        from app.services.bill_extractor import brazilian_bill_extractor
-                        regex_extracted = brazilian_bill_extractor.extract_fields(ocr_text)
-                        
-                        # Se regex extraiu campos essenciais com boa confiança, usar diretamente
-                        if regex_extracted.get("confidence", 0.0) >= 0.80:
-                            logger.info(f"Extraction via regex bem-sucedida (confiança: {regex_extracted['confidence']:.2f})")
-                            extracted = regex_extracted
-                        else:
-                            # Se regex não foi suficiente, usar AI (Ollama/Gemini) como fallback
-                            logger.info(f"Regex extraiu com confiança baixa ({regex_extracted.get('confidence', 0):.2f}), tentando AI...")
-                            import asyncio
-                            from app.services.ollama_service import ollama_service
-                            from app.services.gemini_service import get_gemini_service
-                            
-                            try:
-                                ai_service = ollama_service
-                                logger.info(f"Usando Ollama para extração de campos do boleto {bill.id}")
-                            except:
-                                gemini_service = get_gemini_service()
-                                if gemini_service:
-                                    ai_service = gemini_service
-                                    logger.info(f"Ollama não disponível, usando Gemini para extração de campos do boleto {bill.id}")
-                                else:
-                                    logger.warning(f"Nenhum serviço de IA disponível, usando resultado do regex")
-                                    extracted = regex_extracted
-                                    ai_service = None
-                            
-                            if ai_service:
-                                image_url = None
-                                try:
-                                    object_name_clean = s3_path.split("/", 1)[1] if "/" in s3_path else s3_path
-                                    image_url = storage_service.get_presigned_url(object_name_clean, expires_seconds=3600)
-                                except:
-                                    pass  # URL opcional
-                                
-                                ai_extracted = asyncio.run(
-                                    ai_service.extract_bill_fields(
-                                        ocr_text=ocr_text,
-                                        image_url=image_url,
-                                        metadata={"filename": file.filename}
-                                    )
-                                )
-                                
-                                # Combinar resultados: preferir regex para campos essenciais, AI para outros
-                                extracted = {
-                                    "issuer": regex_extracted.get("issuer") or ai_extracted.get("issuer"),
-                                    "amount": regex_extracted.get("amount") or ai_extracted.get("amount"),
-                                    "currency": "BRL",
-                                    "due_date": regex_extracted.get("due_date") or ai_extracted.get("due_date"),
-                                    "barcode": regex_extracted.get("barcode") or ai_extracted.get("barcode"),
-                                    "payment_place": None,
-                                    "confidence": max(regex_extracted.get("confidence", 0.0), ai_extracted.get("confidence", 0.0)),
-                                    "notes": ai_extracted.get("notes", "")
-                                }
-                            else:
-                                extracted = regex_extracted
-                        
-                        document.extracted_json = extracted
-                        
-                        # Update bill with extracted data
-                        if extracted.get("issuer"):
-                            bill.issuer = extracted["issuer"]
-                        if extracted.get("amount"):
-                            bill.amount = float(extracted["amount"])
-                        if extracted.get("due_date"):
-                            try:
-                                from datetime import datetime
-                                bill.due_date = datetime.fromisoformat(extracted["due_date"]).date()
-                            except:
-                                pass
-                        if extracted.get("barcode"):
-                            bill.barcode = extracted["barcode"]
-                        if extracted.get("currency"):
-                            bill.currency = extracted["currency"]
-                        
-                        # Calcular confiança: usar a do AI se fornecida e > 0, senão calcular baseado nos campos
-                        ai_confidence = extracted.get("confidence", 0.0)
-                        if ai_confidence > 0:
-                            bill.confidence = ai_confidence
-                        else:
-                            # Calcular confiança baseada nos campos extraídos
-                            has_amount = bill.amount is not None and bill.amount > 0
-                            has_due_date = bill.due_date is not None
-                            has_issuer = bill.issuer is not None and bill.issuer != ""
-                            has_barcode = bill.barcode is not None and bill.barcode != ""
-                            
-                            if has_amount and has_due_date:
-                                bill.confidence = 0.85
-                                if has_issuer:
-                                    bill.confidence += 0.05
-                                if has_barcode:
-                                    bill.confidence += 0.05
-                                bill.confidence = min(bill.confidence, 0.95)
-                            elif has_amount or has_due_date:
-                                bill.confidence = 0.65 if has_issuer else 0.55
-                            elif has_issuer:
-                                bill.confidence = 0.45
-                            else:
-                                bill.confidence = max(ocr_confidence, 0.3)  # Usar OCR confidence como mínimo
-                        
-                        # Set status based on confidence
-                        if bill.confidence >= 0.9:
-                            bill.status = BillStatus.CONFIRMED
-                        else:
-                            bill.status = BillStatus.PENDING
-                        
-                        db.commit()
-                        logger.info(f"Extraction concluída para boleto {bill.id}. Confiança: {bill.confidence:.2f}")
-                    except Exception as extraction_error:
-                        logger.warning(f"Erro na extração de campos (OCR foi feito): {extraction_error}")
-                        # OCR foi feito, mas extração falhou - boleto fica pendente para revisão manual
-                else:
-                    logger.warning(f"OCR retornou pouco ou nenhum texto para boleto {bill.id}")
-                    
-            except Exception as sync_error:
-                logger.error(f"Erro ao processar OCR sincronamente: {sync_error}", exc_info=True)
-                # Não quebra o upload, mas boleto fica pendente
+                ocr_executor.submit(
+                    job_id=job_id,
+                    bill_id=str(bill.id),
+                    user_id=str(current_user.id),
+                    file_bytes=file_bytes,
+                    content_type=content_type,
+                    filename=file.filename,
+                    s3_path=s3_path
+                )
+            except OCRQueueFullError as queue_error:
+                logger.warning(f"Upload recusado para boleto {bill.id}: {queue_error}")
+                # Desfazer o upload para o cliente poder reenviar sem duplicar o boleto
+                await db.delete(bill)
+                await db.commit()
+                try:
+                    storage_service.delete_file(object_name)
+                except Exception:
+                    pass
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Muitos boletos em processamento. Tente novamente em alguns segundos.",
+                    headers={"Retry-After": "10"}
+                )
         
-        # Audit log
-        try:
-            audit_service.log_action(
-                db=db,
-                entity="bill",
-                action="create",
-                user_id=current_user.id,
-                details={"bill_id": str(bill.id), "filename": file.filename},
-                request=request
-            )
-        except Exception as audit_error:
-            logger.warning(f"Erro ao criar audit log: {audit_error}")
-            # Não quebra o upload se audit falhar
+        await _log_upload(db, current_user, bill, file.filename, request)
         
         return BillUploadResponse(
             bill_id=str(bill.id),
             preview=BillPreview(confidence=0.0, requires_manual_review=True),
-            requires_manual_review=True
+            requires_manual_review=True,
+            job_id=job_id
         )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Erro inesperado ao fazer upload de boleto: {e}", exc_info=True)
         # Rollback se houver erro
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao processar upload: {str(e)}"
@@ -304,7 +240,7 @@ async def upload_bill(
 async def create_bill(
     bill_data: BillCreateRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Create a new bill/expense manually."""
@@ -360,11 +296,11 @@ async def create_bill(
     )
     
     db.add(bill)
-    db.commit()
-    db.refresh(bill)
+    await db.commit()
+    await db.refresh(bill)
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="bill",
         action="create_manual",
@@ -396,12 +332,10 @@ async def create_bill(
 async def get_bill(
     bill_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get bill details."""
-    bill = db.query(Bill).filter(
-        and_(Bill.id == bill_id, Bill.user_id == current_user.id)
-    ).first()
+    bill = await _get_user_bill(db, bill_id, current_user.id)
     
     if not bill:
         raise HTTPException(
@@ -409,7 +343,7 @@ async def get_bill(
             detail="Boleto não encontrado"
         )
     
-    document = db.query(BillDocument).filter(BillDocument.bill_id == bill.id).first()
+    document = await _first(db, select(BillDocument).where(BillDocument.bill_id == bill.id))
     
     # Mask sensitive data if configured
     ocr_text = document.ocr_text if document else None
@@ -441,24 +375,84 @@ async def get_bill(
         "confidence": bill.confidence,
         "category": bill.category,
         "ocr_text": ocr_text,
+        "ocr_method": document.ocr_method if document else None,
         "extracted_json": document.extracted_json if document else None,
         "image_url": image_url,  # URL da imagem do boleto
         "created_at": bill.created_at.isoformat() if bill.created_at else None
     }
 
 
+# Estados do Celery -> status do job exposto pela API
+CELERY_JOB_STATUS = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "STARTED": "processing",
+    "RETRY": "processing",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+}
+
+
+@router.get("/{bill_id}/processing-status")
+async def get_bill_processing_status(
+    bill_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the status of the OCR/extraction job started by an upload."""
+    bill = await _get_user_bill(db, bill_id, current_user.id)
+    
+    if not bill:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Boleto não encontrado"
+        )
+    
+    document = await _first(db, select(BillDocument).where(BillDocument.bill_id == bill.id))
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum documento enviado para este boleto"
+        )
+    
+    job_id = str(document.id)
+    error = None
+    job = await ocr_executor.aget_job(job_id)
+    if job:
+        job_status = job["status"]
+        error = job["error"]
+    elif bill.status == BillStatus.CANCELLED:
+        job_status = "failed"
+    elif document.ocr_text is not None:
+        job_status = "completed"
+    else:
+        try:
+            job_status = CELERY_JOB_STATUS.get(celery_app.AsyncResult(job_id).state, "processing")
+        except Exception as e:
+            logger.warning(f"Não foi possível consultar o Celery para o job {job_id}: {e}")
+            job_status = "unknown"
+    
+    return {
+        "bill_id": str(bill.id),
+        "job_id": job_id,
+        "status": job_status,
+        "error": error,
+        "ocr_method": document.ocr_method,
+        "bill_status": bill.status.value,
+        "confidence": bill.confidence
+    }
+
+
 @router.post("/{bill_id}/confirm")
 async def confirm_bill(
     bill_id: UUID,
     confirm_data: BillConfirmRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Confirm or correct bill data."""
-    bill = db.query(Bill).filter(
-        and_(Bill.id == bill_id, Bill.user_id == current_user.id)
-    ).first()
+    bill = await _get_user_bill(db, bill_id, current_user.id)
     
     if not bill:
         raise HTTPException(
@@ -483,10 +477,10 @@ async def confirm_bill(
     else:
         bill.status = BillStatus.CANCELLED
     
-    db.commit()
+    await db.commit()
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="bill",
         action="confirm" if confirm_data.confirm else "cancel",
@@ -503,16 +497,14 @@ async def schedule_payment(
     bill_id: UUID,
     schedule_data: BillScheduleRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Schedule a payment for a bill."""
     from app.db.models import Payment, PaymentMethod, PaymentStatus
     from datetime import datetime
     
-    bill = db.query(Bill).filter(
-        and_(Bill.id == bill_id, Bill.user_id == current_user.id)
-    ).first()
+    bill = await _get_user_bill(db, bill_id, current_user.id)
     
     if not bill:
         raise HTTPException(
@@ -539,7 +531,7 @@ async def schedule_payment(
     db.add(payment)
     
     bill.status = BillStatus.SCHEDULED
-    db.commit()
+    await db.commit()
     
     # Schedule notifications
     from app.services.notification_service import notification_service
@@ -554,7 +546,7 @@ async def schedule_payment(
     )
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="payment",
         action="schedule",
@@ -572,16 +564,14 @@ async def mark_paid(
     executed_date: str = Form(...),  # YYYY-MM-DD
     comprovante: Optional[UploadFile] = File(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Mark bill as paid and upload receipt."""
     from app.db.models import Payment, PaymentMethod, PaymentStatus
     from datetime import datetime
     
-    bill = db.query(Bill).filter(
-        and_(Bill.id == bill_id, Bill.user_id == current_user.id)
-    ).first()
+    bill = await _get_user_bill(db, bill_id, current_user.id)
     
     if not bill:
         raise HTTPException(
@@ -590,7 +580,7 @@ async def mark_paid(
         )
     
     # Find or create payment
-    payment = db.query(Payment).filter(Payment.bill_id == bill.id).first()
+    payment = await _first(db, select(Payment).where(Payment.bill_id == bill.id))
     if not payment:
         payment = Payment(
             id=uuid.uuid4(),
@@ -613,10 +603,10 @@ async def mark_paid(
         payment.comprovante_path = s3_path
     
     bill.status = BillStatus.PAID
-    db.commit()
+    await db.commit()
     
     # Audit log
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="payment",
         action="mark_paid",
@@ -628,69 +618,90 @@ async def mark_paid(
     return {"status": "paid", "payment_id": str(payment.id)}
 
 
-@router.get("")
-async def list_bills(
+BILL_LIST_FIELDS = {
+    "id": column_field(Bill.id, str),
+    "issuer": column_field(Bill.issuer),
+    "amount": column_field(Bill.amount),
+    "due_date": column_field(Bill.due_date, iso),
+    "status": column_field(Bill.status, enum_value),
+    "type": ListField((Bill.type,), lambda row: row.type.value if row.type else "expense"),
+    "is_bill": column_field(Bill.is_bill),
+    "category": column_field(Bill.category),
+    "confidence": column_field(Bill.confidence),
+}
+
+
+def bill_list_query(
+    user_id: UUID,
+    names: List[str],
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
     status: Optional[str] = None,
     issuer: Optional[str] = None,
-    is_bill: Optional[bool] = None,  # Novo filtro: True para boletos, False para finanças
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    is_bill: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
-    """List bills with filters. Use is_bill=True for boletos, is_bill=False for outras finanças."""
-    query = db.query(Bill).filter(Bill.user_id == current_user.id)
+    """select() behind GET /bills: the filters plus the (due_date, id) keyset order (also EXPLAINed by query_plans)."""
+    query = select(*select_columns(BILL_LIST_FIELDS, names, Bill.due_date, Bill.id)).where(
+        Bill.user_id == user_id
+    )
     
     if is_bill is not None:
-        query = query.filter(Bill.is_bill == is_bill)
+        query = query.where(Bill.is_bill == is_bill)
     
     if from_date:
-        query = query.filter(Bill.due_date >= datetime.fromisoformat(from_date).date())
+        query = query.where(Bill.due_date >= datetime.fromisoformat(from_date).date())
     if to_date:
-        query = query.filter(Bill.due_date <= datetime.fromisoformat(to_date).date())
+        query = query.where(Bill.due_date <= datetime.fromisoformat(to_date).date())
     if status:
-        query = query.filter(Bill.status == BillStatus(status))
+        query = query.where(Bill.status == BillStatus(status))
     if issuer:
-        query = query.filter(Bill.issuer.ilike(f"%{issuer}%"))
-    
-    bills = query.order_by(Bill.due_date).all()
-    
-    logger.info(f"Listando bills: is_bill={is_bill}, user_id={current_user.id}, total encontrado: {len(bills)}")
-    # Log detalhado para debug de receitas
-    income_count = sum(1 for b in bills if b.type == BillType.INCOME)
-    expense_count = sum(1 for b in bills if b.type == BillType.EXPENSE)
-    logger.info(f"  - Receitas (income): {income_count}, Despesas (expense): {expense_count}")
-    if logger.isEnabledFor(logging.DEBUG):
-        for bill in bills:
-            logger.debug(f"  - Bill ID: {bill.id}, Type: {bill.type.value if bill.type else 'None'}, Amount: {bill.amount}, IsBill: {bill.is_bill}, Status: {bill.status.value}")
-    
-    return [
-        {
-            "id": str(bill.id),
-            "issuer": bill.issuer,
-            "amount": bill.amount,
-            "due_date": bill.due_date.isoformat() if bill.due_date else None,
-            "status": bill.status.value,
-            "type": bill.type.value if bill.type else "expense",
-            "is_bill": bill.is_bill if hasattr(bill, 'is_bill') else True,  # Retrocompatibilidade
-            "category": bill.category,
-            "confidence": bill.confidence
-        }
-        for bill in bills
-    ]
+        query = query.where(Bill.issuer.ilike(f"%{issuer}%"))
+    
+    return keyset_order(query, Bill.due_date, Bill.id, cursor=cursor, limit=limit)
+
+
+@router.get("")
+async def list_bills(
+    response: Response,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    status: Optional[str] = None,
+    issuer: Optional[str] = None,
+    is_bill: Optional[bool] = None,  # Novo filtro: True para boletos, False para finanças
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List bills with filters. Use is_bill=True for boletos, is_bill=False for outras finanças.
+    Ordered by (due_date, id), LIST_DEFAULT_LIMIT rows unless ?limit= says otherwise; the next page cursor comes in X-Next-Cursor.
+    ?fields=id,amount,due_date selects only those columns.
+    """
+    names = parse_fields(fields, BILL_LIST_FIELDS)
+    query = bill_list_query(
+        current_user.id, names,
+        from_date=from_date, to_date=to_date, status=status, issuer=issuer, is_bill=is_bill,
+        cursor=cursor, limit=limit
+    )
+    rows = keyset_page((await db.execute(query)).all(), response, Bill.due_date, Bill.id, limit)
+    
+    logger.info(f"Listando bills: is_bill={is_bill}, user_id={current_user.id}, retornados: {len(rows)}, limit={limit}")
+    return serialize_rows(rows, BILL_LIST_FIELDS, names)
 
 
 @router.delete("/{bill_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_bill(
     bill_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """Delete a bill or financial transaction."""
-    bill = db.query(Bill).filter(
-        and_(Bill.id == bill_id, Bill.user_id == current_user.id)
-    ).first()
+    bill = await _get_user_bill(db, bill_id, current_user.id)
     
     if not bill:
         raise HTTPException(
@@ -699,7 +710,7 @@ async def delete_bill(
         )
     
     # Audit log antes de deletar
-    audit_service.log_action(
+    await audit_service.log_action_async(
         db=db,
         entity="bill",
         action="delete",
@@ -713,8 +724,8 @@ async def delete_bill(
         request=request
     )
     
-    db.delete(bill)
-    db.commit()
+    await db.delete(bill)
+    await db.commit()
     
     return None
 
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta  # type: ignore
 import uuid
 import logging
 import re
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.db.models import User, Bill, BillStatus, BillType
 from app.api.dependencies import get_current_user
 from app.services.ollama_service import ollama_service
 from app.services.gemini_service import get_gemini_service
 from app.services.cache_service import cache_service
+from app.services.chatbot_quota import chatbot_quota, ChatbotQuotaExceededError
+from app.services.chatbot_context import get_context
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -35,53 +37,22 @@ class ChatResponse(BaseModel):
 async def chat_with_assistant(
     chat_data: ChatMessage,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Chat with the AI assistant powered by Gemini (se configurado) ou Ollama.
     Can also create expenses/bills from natural language commands.
     """
     try:
-        # Verificar limite de uso do chatbot
-        notif_prefs = current_user.notif_prefs or {}
-        is_premium = notif_prefs.get("is_premium", False)
-        
-        # Limites: Free = 25 mensagens/mês, Premium = ilimitado
-        FREE_LIMIT = 25
-        PREMIUM_LIMIT = 1000  # Praticamente ilimitado
-        
-        # Obter contador atual e data de reset
-        chatbot_messages_this_month = notif_prefs.get("chatbot_messages_this_month", 0)
-        chatbot_month_reset_date = notif_prefs.get("chatbot_month_reset_date")
-        
-        # Verificar se precisa resetar o contador (novo mês)
-        today = date.today()
-        current_month = today.replace(day=1)  # Primeiro dia do mês atual
-        
-        if not chatbot_month_reset_date or datetime.fromisoformat(chatbot_month_reset_date).date().replace(day=1) < current_month:
-            # Resetar contador para novo mês
-            chatbot_messages_this_month = 0
-            chatbot_month_reset_date = current_month.isoformat()
-            notif_prefs["chatbot_messages_this_month"] = 0
-            notif_prefs["chatbot_month_reset_date"] = chatbot_month_reset_date
-            current_user.notif_prefs = notif_prefs
-            db.commit()
-        
-        # Verificar limite
-        limit = PREMIUM_LIMIT if is_premium else FREE_LIMIT
-        if chatbot_messages_this_month >= limit:
-            remaining_days = (current_month + relativedelta(months=1) - today).days
+        # Verificar e contar o uso do chatbot (INCR no Redis; banco só se o Redis estiver fora)
+        try:
+            await chatbot_quota.consume(current_user, db)
+        except ChatbotQuotaExceededError as e:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Limite de {limit} mensagens do chatbot atingido este mês. {'Faça upgrade para Premium para uso ilimitado.' if not is_premium else 'Limite mensal atingido.'} O limite será resetado em {remaining_days} dia(s)."
+                detail=f"Limite de {e.limit} mensagens do chatbot atingido este mês. {'Faça upgrade para Premium para uso ilimitado.' if not e.is_premium else 'Limite mensal atingido.'} O limite será resetado em {e.reset_in_days} dia(s)."
             )
         
-        # Incrementar contador
-        chatbot_messages_this_month += 1
-        notif_prefs["chatbot_messages_this_month"] = chatbot_messages_this_month
-        current_user.notif_prefs = notif_prefs
-        db.commit()
-        
         # Verificar se deve usar Gemini ou Ollama
         gemini_service = get_gemini_service()
         ai_service = gemini_service if gemini_service else ollama_service
@@ -487,9 +458,9 @@ async def chat_with_assistant(
                         db.add(bill)
                         created_bills.append(bill)
                     
-                    db.commit()
+                    await db.commit()
                     for bill in created_bills:
-                        db.refresh(bill)
+                        await db.refresh(bill)
                     
                     logger.info(f"✅ {final_installment_total} parcelas criadas no banco: Total R$ {final_amount:.2f}, Valor por parcela R$ {installment_amount:.2f}")
                     
@@ -524,8 +495,8 @@ async def chat_with_assistant(
                     )
                     
                     db.add(bill)
-                    db.commit()
-                    db.refresh(bill)
+                    await db.commit()
+                    await db.refresh(bill)
                     
                     logger.info(f"✅ Transação criada no banco: ID={bill.id}, Type={bill.type.value}, Amount={bill.amount}, IsBill={bill.is_bill}, Status={bill.status.value}")
                     
@@ -555,134 +526,23 @@ async def chat_with_assistant(
                 )
         
         # Se não for comando de criação, processar como chat normal
-        # Verificar cache primeiro (apenas para mensagens simples ou sem contexto crítico)
         message_lower = chat_data.message.lower().strip()
         is_simple_query = cache_service._is_simple_message(chat_data.message)
         
-        # Para mensagens simples, tentar cache antes de buscar dados
-        if is_simple_query:
-            cached_response = cache_service.get_cached_response(str(current_user.id), chat_data.message)
-            if cached_response:
-                logger.info(f"Cache hit for simple message from user {current_user.id}")
-                return ChatResponse(response=cached_response, action="chat")
-        
-        user_bills = db.query(Bill).filter(Bill.user_id == current_user.id).all()
-        
-        pending_bills = [b for b in user_bills if b.status in [BillStatus.PENDING, BillStatus.CONFIRMED]]
-        confirmed_bills = [b for b in user_bills if b.status == BillStatus.CONFIRMED]
-        scheduled_bills = [b for b in user_bills if b.status == BillStatus.SCHEDULED]
-        paid_bills = [b for b in user_bills if b.status == BillStatus.PAID]
-        
-        today = date.today()
-        overdue_bills = [b for b in user_bills if b.due_date and b.due_date < today and b.status != BillStatus.PAID]
+        # Contexto financeiro agregado no banco e cacheado por usuário (app.services.chatbot_context)
+        context = await get_context(db, current_user)
+        context_hash = cache_service.get_context_hash(context)
         
-        total_pending = sum(b.amount for b in pending_bills if b.amount) or 0.0
-        total_paid = sum(b.amount for b in paid_bills if b.amount) or 0.0
-        
-        # Calcular receitas e despesas do mês atual
-        current_month = today.month
-        current_year = today.year
-        monthly_expenses = sum(
-            b.amount for b in user_bills 
-            if b.due_date and b.due_date.month == current_month and b.due_date.year == current_year
-            and b.type == BillType.EXPENSE and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-        ) or 0.0
-        monthly_income = sum(
-            b.amount for b in user_bills 
-            if b.due_date and b.due_date.month == current_month and b.due_date.year == current_year
-            and b.type == BillType.INCOME and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-        ) or 0.0
-        monthly_balance = monthly_income - monthly_expenses
-        
-        # Agrupar por categoria com detalhes
-        categories = {}
-        for bill in user_bills:
-            cat = bill.category or "outras"
-            if cat not in categories:
-                categories[cat] = {"total": 0.0, "count": 0, "bills": []}
-            categories[cat]["total"] += (bill.amount or 0)
-            categories[cat]["count"] += 1
-            if len(categories[cat]["bills"]) < 5:  # Limitar a 5 boletos por categoria
-                categories[cat]["bills"].append({
-                    "issuer": bill.issuer,
-                    "amount": bill.amount,
-                    "due_date": bill.due_date.isoformat() if bill.due_date else None,
-                    "status": bill.status.value
-                })
-        
-        # Top emissores com detalhes
-        issuers = {}
-        for bill in user_bills:
-            issuer = bill.issuer or "Desconhecido"
-            if issuer not in issuers:
-                issuers[issuer] = {"total": 0.0, "count": 0, "bills": []}
-            issuers[issuer]["total"] += (bill.amount or 0)
-            issuers[issuer]["count"] += 1
-            if len(issuers[issuer]["bills"]) < 3:  # Limitar a 3 boletos por emissor
-                issuers[issuer]["bills"].append({
-                    "amount": bill.amount,
-                    "due_date": bill.due_date.isoformat() if bill.due_date else None,
-                    "status": bill.status.value,
-                    "category": bill.category
-                })
-        
-        # Lista detalhada de boletos pendentes (próximos 10)
-        next_bills = sorted(
-            [b for b in pending_bills if b.due_date],
-            key=lambda x: x.due_date or date.max
-        )[:10]
-        
-        # Lista detalhada de boletos vencidos
-        overdue_details = [
-            {
-                "issuer": b.issuer,
-                "amount": b.amount,
-                "due_date": b.due_date.isoformat() if b.due_date else None,
-                "days_overdue": (today - b.due_date).days if b.due_date else 0
-            }
-            for b in overdue_bills
-        ]
-        
-        context = {
-            "user_name": current_user.name,
-            "total_bills": len(user_bills),
-            "pending_bills": len(pending_bills),
-            "confirmed_bills": len(confirmed_bills),
-            "scheduled_bills": len(scheduled_bills),
-            "paid_bills": len(paid_bills),
-            "overdue_bills": len(overdue_bills),
-            "total_pending": total_pending,
-            "total_paid": total_paid,
-            "monthly_expenses": monthly_expenses,
-            "monthly_income": monthly_income,
-            "monthly_balance": monthly_balance,
-            "current_month": f"{current_month}/{current_year}",
-            "categories": categories,
-            "top_issuers": dict(sorted(issuers.items(), key=lambda x: x[1]["total"], reverse=True)[:5]),
-            "next_bills": [
-                {
-                    "issuer": b.issuer,
-                    "amount": b.amount,
-                    "due_date": b.due_date.isoformat() if b.due_date else None,
-                    "days_until": (b.due_date - today).days if b.due_date else None,
-                    "category": b.category
-                }
-                for b in next_bills
-            ],
-            "overdue_details": overdue_details,
-        }
-        
-        # Verificar cache com contexto (para mensagens mais complexas)
-        if not is_simple_query:
-            context_hash = cache_service.get_context_hash(context)
-            cached_response = cache_service.get_cached_response(
-                str(current_user.id), 
-                chat_data.message, 
-                context_hash
-            )
-            if cached_response:
-                logger.info(f"Cache hit for contextual message from user {current_user.id}")
-                return ChatResponse(response=cached_response, action="chat")
+        # Respostas em cache (simples e contextual) numa única ida ao Redis
+        simple_response, contextual_response = await cache_service.aget_cached_responses(
+            str(current_user.id),
+            chat_data.message,
+            context_hash
+        )
+        cached_response = simple_response if is_simple_query else contextual_response
+        if cached_response:
+            logger.info(f"Cache hit for {'simple' if is_simple_query else 'contextual'} message from user {current_user.id}")
+            return ChatResponse(response=cached_response, action="chat")
         
         # Chamar AI service (Gemini ou Ollama) para gerar resposta
         try:
@@ -696,7 +556,7 @@ async def chat_with_assistant(
             if response_text and not response_text.startswith("⚠️") and not response_text.startswith("❌"):
                 if is_simple_query:
                     # Mensagens simples: cache por 1 hora
-                    cache_service.set_cached_response(
+                    await cache_service.aset_cached_response(
                         str(current_user.id),
                         chat_data.message,
                         response_text,
@@ -704,8 +564,7 @@ async def chat_with_assistant(
                     )
                 else:
                     # Mensagens contextuais: cache por 5 minutos com hash do contexto
-                    context_hash = cache_service.get_context_hash(context)
-                    cache_service.set_cached_response(
+                    await cache_service.aset_cached_response(
                         str(current_user.id),
                         chat_data.message,
                         response_text,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from pydantic import BaseModel
@@ -10,6 +10,8 @@ import uuid
 from app.db.database import get_db
 from app.db.models import User, Investment, InvestmentType
 from app.api.dependencies import get_current_user
+from app.api.pagination import ListField, column_field, iso, enum_value, parse_fields, select_columns, keyset_paginate, serialize_rows
+from app.core.config import settings
 from app.services.audit_service import audit_service
 from fastapi import Request
 
@@ -102,14 +104,53 @@ async def create_investment(
     }
 
 
+def _profit_loss(row) -> float:
+    return (row.current_value or row.amount_invested) - row.amount_invested
+
+
+def _profit_loss_percentage(row) -> float:
+    return _profit_loss(row) / row.amount_invested * 100 if row.amount_invested > 0 else 0
+
+
+INVESTMENT_LIST_FIELDS = {
+    "id": column_field(Investment.id, str),
+    "name": column_field(Investment.name),
+    "type": column_field(Investment.type, enum_value),
+    "amount_invested": column_field(Investment.amount_invested),
+    "current_value": column_field(Investment.current_value),
+    "purchase_date": column_field(Investment.purchase_date, iso),
+    "sell_date": column_field(Investment.sell_date, iso),
+    "institution": column_field(Investment.institution),
+    "ticker": column_field(Investment.ticker),
+    "notes": column_field(Investment.notes),
+    "profit_loss": ListField(
+        (Investment.current_value, Investment.amount_invested),
+        lambda row: round(_profit_loss(row), 2)
+    ),
+    "profit_loss_percentage": ListField(
+        (Investment.current_value, Investment.amount_invested),
+        lambda row: round(_profit_loss_percentage(row), 2)
+    ),
+    "created_at": column_field(Investment.created_at, iso),
+    "updated_at": column_field(Investment.updated_at, iso),
+}
+
+
 @router.get("")
 async def list_investments(
+    response: Response,
     type_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Listar todos os investimentos do usuário."""
-    query = db.query(Investment).filter(Investment.user_id == current_user.id)
+    """Listar os investimentos do usuário (mais recentes primeiro). Aceita ?cursor=&limit= e ?fields=."""
+    names = parse_fields(fields, INVESTMENT_LIST_FIELDS)
+    query = db.query(
+        *select_columns(INVESTMENT_LIST_FIELDS, names, Investment.purchase_date, Investment.id)
+    ).filter(Investment.user_id == current_user.id)
     
     if type_filter:
         try:
@@ -121,31 +162,11 @@ async def list_investments(
                 detail=f"Tipo de investimento inválido"
             )
     
-    investments = query.order_by(Investment.purchase_date.desc()).all()
-    
-    result = []
-    for inv in investments:
-        profit_loss = (inv.current_value or inv.amount_invested) - inv.amount_invested
-        profit_loss_percentage = (profit_loss / inv.amount_invested * 100) if inv.amount_invested > 0 else 0
-        
-        result.append({
-            "id": str(inv.id),
-            "name": inv.name,
-            "type": inv.type.value,
-            "amount_invested": inv.amount_invested,
-            "current_value": inv.current_value,
-            "purchase_date": inv.purchase_date.isoformat(),
-            "sell_date": inv.sell_date.isoformat() if inv.sell_date else None,
-            "institution": inv.institution,
-            "ticker": inv.ticker,
-            "notes": inv.notes,
-            "profit_loss": round(profit_loss, 2),
-            "profit_loss_percentage": round(profit_loss_percentage, 2),
-            "created_at": inv.created_at.isoformat() if inv.created_at else None,
-            "updated_at": inv.updated_at.isoformat() if inv.updated_at else None
-        })
-    
-    return result
+    rows = keyset_paginate(
+        query, response, Investment.purchase_date, Investment.id,
+        cursor=cursor, limit=limit, descending=True
+    )
+    return serialize_rows(rows, INVESTMENT_LIST_FIELDS, names)
 
 
 @router.get("/{investment_id}")
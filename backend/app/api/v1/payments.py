@@ -1,45 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
 
 from app.db.database import get_db
 from app.db.models import User, Payment, Bill, PaymentStatus
 from app.api.dependencies import get_current_user
+from app.api.pagination import column_field, iso, enum_value, parse_fields, select_columns, keyset_order, keyset_page, serialize_rows
+from app.core.config import settings
 from app.services.audit_service import audit_service
 from fastapi import Request
 
 router = APIRouter()
 
 
-@router.get("")
-async def list_payments(
+PAYMENT_LIST_FIELDS = {
+    "id": column_field(Payment.id, str),
+    "bill_id": column_field(Payment.bill_id, str),
+    "scheduled_date": column_field(Payment.scheduled_date, iso),
+    "executed_date": column_field(Payment.executed_date, iso),
+    "method": column_field(Payment.method, enum_value),
+    "status": column_field(Payment.status, enum_value),
+    "amount": column_field(Bill.amount),
+}
+
+
+def payment_list_query(
+    db: Session,
+    user_id: UUID,
+    names: List[str],
     status: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
-    """List payments."""
-    query = db.query(Payment).filter(Payment.user_id == current_user.id)
+    """Query behind GET /payments, newest (scheduled_date, id) first (also EXPLAINed by query_plans)."""
+    query = db.query(
+        *select_columns(PAYMENT_LIST_FIELDS, names, Payment.scheduled_date, Payment.id)
+    ).select_from(Payment).filter(Payment.user_id == user_id)
+    
+    if "amount" in names:
+        query = query.outerjoin(Bill, Payment.bill_id == Bill.id)
     
     if status:
         query = query.filter(Payment.status == PaymentStatus(status))
     
-    payments = query.order_by(Payment.scheduled_date.desc()).all()
-    
-    return [
-        {
-            "id": str(payment.id),
-            "bill_id": str(payment.bill_id),
-            "scheduled_date": payment.scheduled_date.isoformat() if payment.scheduled_date else None,
-            "executed_date": payment.executed_date.isoformat() if payment.executed_date else None,
-            "method": payment.method.value,
-            "status": payment.status.value,
-            "amount": payment.bill.amount if payment.bill else None
-        }
-        for payment in payments
-    ]
+    return keyset_order(
+        query, Payment.scheduled_date, Payment.id,
+        cursor=cursor, limit=limit, descending=True
+    )
+
+
+@router.get("")
+async def list_payments(
+    response: Response,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List payments, newest scheduled first. Supports ?cursor=&limit= and ?fields=."""
+    names = parse_fields(fields, PAYMENT_LIST_FIELDS)
+    query = payment_list_query(db, current_user.id, names, status=status, cursor=cursor, limit=limit)
+    rows = keyset_page(query.all(), response, Payment.scheduled_date, Payment.id, limit)
+    return serialize_rows(rows, PAYMENT_LIST_FIELDS, names)
 
 
 @router.post("/{payment_id}/reconcile")
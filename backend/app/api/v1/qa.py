@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from pydantic import BaseModel
+from typing import List, Optional
 from uuid import UUID
 
 from app.db.database import get_db
 from app.db.models import User, Bill, BillStatus
 from app.api.dependencies import get_current_user
+from app.api.pagination import column_field, iso, enum_value, parse_fields, select_columns, keyset_order, keyset_page, serialize_rows
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -15,31 +18,51 @@ class QAResolutionRequest(BaseModel):
     resolution: dict  # Corrections to apply
 
 
-@router.get("/pending")
-async def get_pending_qa(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+QA_LIST_FIELDS = {
+    "id": column_field(Bill.id, str),
+    "issuer": column_field(Bill.issuer),
+    "amount": column_field(Bill.amount),
+    "due_date": column_field(Bill.due_date, iso),
+    "confidence": column_field(Bill.confidence),
+    "status": column_field(Bill.status, enum_value),
+}
+
+
+def pending_qa_query(
+    db: Session,
+    user_id: UUID,
+    names: List[str],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
 ):
-    """Get bills with low confidence requiring manual review."""
-    bills = db.query(Bill).filter(
+    """Query behind GET /qa/pending, in (confidence, id) keyset order (also EXPLAINed by query_plans)."""
+    query = db.query(*select_columns(QA_LIST_FIELDS, names, Bill.confidence, Bill.id)).filter(
         and_(
-            Bill.user_id == current_user.id,
+            Bill.user_id == user_id,
             Bill.confidence < 0.9,
             Bill.status == BillStatus.PENDING
         )
-    ).order_by(Bill.confidence.asc()).all()
-    
-    return [
-        {
-            "id": str(bill.id),
-            "issuer": bill.issuer,
-            "amount": bill.amount,
-            "due_date": bill.due_date.isoformat() if bill.due_date else None,
-            "confidence": bill.confidence,
-            "status": bill.status.value
-        }
-        for bill in bills
-    ]
+    )
+    return keyset_order(query, Bill.confidence, Bill.id, cursor=cursor, limit=limit)
+
+
+@router.get("/pending")
+async def get_pending_qa(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get bills with low confidence requiring manual review, lowest confidence first.
+    Keyset on (confidence, id): ?cursor=&limit= and ?fields= as in GET /bills.
+    """
+    names = parse_fields(fields, QA_LIST_FIELDS)
+    query = pending_qa_query(db, current_user.id, names, cursor=cursor, limit=limit)
+    rows = keyset_page(query.all(), response, Bill.confidence, Bill.id, limit)
+    return serialize_rows(rows, QA_LIST_FIELDS, names)
 
 
 @router.post("/{bill_id}/resolve")
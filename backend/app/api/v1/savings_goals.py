@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from pydantic import BaseModel
@@ -10,6 +10,8 @@ import uuid
 from app.db.database import get_db
 from app.db.models import User, SavingsGoal, SavingsGoalStatus
 from app.api.dependencies import get_current_user
+from app.api.pagination import ListField, column_field, iso, enum_value, parse_fields, select_columns, keyset_paginate, serialize_rows
+from app.core.config import settings
 from app.services.notification_service import notification_service
 from app.services.audit_service import audit_service
 from fastapi import Request
@@ -102,51 +104,69 @@ async def create_savings_goal(
     }
 
 
+def _progress_percentage(row) -> float:
+    return round((row.current_amount / row.target_amount * 100) if row.target_amount > 0 else 0, 2)
+
+
+SAVINGS_GOAL_LIST_FIELDS = {
+    "id": column_field(SavingsGoal.id, str),
+    "name": column_field(SavingsGoal.name),
+    "target_amount": column_field(SavingsGoal.target_amount),
+    "current_amount": column_field(SavingsGoal.current_amount),
+    "deadline": column_field(SavingsGoal.deadline, iso),
+    "description": column_field(SavingsGoal.description),
+    "status": column_field(SavingsGoal.status, enum_value),
+    "progress_percentage": ListField(
+        (SavingsGoal.current_amount, SavingsGoal.target_amount), _progress_percentage
+    ),
+    "days_remaining": ListField((SavingsGoal.deadline,), lambda row: (row.deadline - date.today()).days),
+    "notify_days_before": ListField(
+        (SavingsGoal.notify_days_before,), lambda row: row.notify_days_before or [30, 15, 7, 3, 1]
+    ),
+    "created_at": column_field(SavingsGoal.created_at, iso),
+    "updated_at": column_field(SavingsGoal.updated_at, iso),
+}
+
+
+def _refresh_goal_statuses(db: Session, user_id):
+    """Mark the user's active goals as completed/expired in SQL, before listing."""
+    active = db.query(SavingsGoal).filter(
+        SavingsGoal.user_id == user_id,
+        SavingsGoal.status == SavingsGoalStatus.ACTIVE
+    )
+    completed = active.filter(
+        SavingsGoal.current_amount >= SavingsGoal.target_amount
+    ).update({SavingsGoal.status: SavingsGoalStatus.COMPLETED}, synchronize_session=False)
+    expired = active.filter(
+        SavingsGoal.deadline < date.today()
+    ).update({SavingsGoal.status: SavingsGoalStatus.EXPIRED}, synchronize_session=False)
+    if completed or expired:
+        db.commit()
+
+
 @router.get("")
 async def list_savings_goals(
+    response: Response,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.LIST_DEFAULT_LIMIT, ge=1, le=settings.LIST_MAX_LIMIT),
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Listar todas as metas de economia do usuário."""
-    query = db.query(SavingsGoal).filter(SavingsGoal.user_id == current_user.id)
+    """Listar as metas de economia do usuário por prazo. Aceita ?cursor=&limit= e ?fields=."""
+    names = parse_fields(fields, SAVINGS_GOAL_LIST_FIELDS)
+    _refresh_goal_statuses(db, current_user.id)
+    
+    query = db.query(
+        *select_columns(SAVINGS_GOAL_LIST_FIELDS, names, SavingsGoal.deadline, SavingsGoal.id)
+    ).filter(SavingsGoal.user_id == current_user.id)
     
     if status_filter:
         query = query.filter(SavingsGoal.status == SavingsGoalStatus(status_filter))
     
-    goals = query.order_by(SavingsGoal.deadline).all()
-    
-    today = date.today()
-    result = []
-    
-    for goal in goals:
-        days_remaining = (goal.deadline - today).days
-        progress = (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
-        
-        # Atualizar status se necessário
-        if goal.status == SavingsGoalStatus.ACTIVE:
-            if goal.current_amount >= goal.target_amount:
-                goal.status = SavingsGoalStatus.COMPLETED
-            elif days_remaining < 0:
-                goal.status = SavingsGoalStatus.EXPIRED
-        
-        result.append({
-            "id": str(goal.id),
-            "name": goal.name,
-            "target_amount": goal.target_amount,
-            "current_amount": goal.current_amount,
-            "deadline": goal.deadline.isoformat(),
-            "description": goal.description,
-            "status": goal.status.value,
-            "progress_percentage": round(progress, 2),
-            "days_remaining": days_remaining,
-            "notify_days_before": goal.notify_days_before or [30, 15, 7, 3, 1],
-            "created_at": goal.created_at.isoformat() if goal.created_at else None,
-            "updated_at": goal.updated_at.isoformat() if goal.updated_at else None
-        })
-    
-    db.commit()
-    return result
+    rows = keyset_paginate(query, response, SavingsGoal.deadline, SavingsGoal.id, cursor=cursor, limit=limit)
+    return serialize_rows(rows, SAVINGS_GOAL_LIST_FIELDS, names)
 
 
 @router.get("/{goal_id}")
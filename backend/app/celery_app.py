@@ -1,13 +1,21 @@
 from celery import Celery  # type: ignore
 from celery.schedules import crontab  # type: ignore
 from app.core.config import settings
+import app.services.monthly_summary  # noqa: F401  (listener do rollup user_monthly_summary nos workers)
+import app.services.chatbot_context  # noqa: F401  (invalida o contexto do chatbot quando o OCR/tasks alteram bills)
 import os
 
 # Initialize Celery
 celery_app = Celery(
     "finguia",
     broker=settings.REDIS_URL,
-    backend=settings.REDIS_URL
+    backend=settings.REDIS_URL,
+    # autodiscover_tasks procura app.tasks.tasks, que não existe: os módulos precisam ser listados
+    include=[
+        "app.tasks.bill_tasks",
+        "app.tasks.notification_tasks",
+        "app.tasks.maintenance_tasks",
+    ],
 )
 
 celery_app.conf.update(
@@ -44,6 +52,18 @@ celery_app.conf.update(
             'task': 'send_daily_reports',
             'schedule': crontab(hour=9, minute=0),  # Run daily at 9:00 UTC (6:00 BRT) - apenas para premium
         },
+        'flush-chatbot-quota': {
+            'task': 'flush_chatbot_quota',
+            'schedule': 300.0,  # Contadores do chatbot (Redis) -> users.notif_prefs a cada 5 min
+        },
+        'reap-chatbot-cache-hourly': {
+            'task': 'reap_chatbot_cache',
+            'schedule': 3600.0,  # Respostas de gerações invalidadas (SCAN, nunca KEYS)
+        },
+        'maintain-partitions-daily': {
+            'task': 'maintain_partitions',
+            'schedule': crontab(hour=3, minute=30),  # Partições do próximo mês + retenção (DATA_RETENTION_DAYS)
+        },
     },
 )
 
@@ -35,12 +35,24 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6380/0"
+    CACHE_L1_SIZE: int = 5000  # Entradas do cache em memória (L1) por processo, na frente do Redis
+    CACHE_L1_TTL: int = 30  # Segundos máximos de uma entrada no L1 (rede de segurança do pub/sub)
+    CACHE_RECONNECT_MAX_BACKOFF: int = 60  # Teto (s) do backoff exponencial para reconectar ao Redis
     
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_USER_CACHE_TTL: int = 60  # Segundos que o usuário autenticado fica em cache (memória + Redis)
+    AUTH_USER_CACHE_SIZE: int = 10000  # Máximo de usuários no cache em memória (LRU) por processo
+    
+    # Hash de senha (Argon2id) - calibre com scripts/benchmark_password_hash.py
+    ARGON2_TIME_COST: int = 3  # Iterações
+    ARGON2_MEMORY_COST: int = 65536  # KiB por hash (64 MiB)
+    ARGON2_PARALLELISM: int = 4  # Lanes
+    PASSWORD_HASH_WORKERS: int = 2  # Threads dedicadas ao Argon2 (memória = workers x ARGON2_MEMORY_COST)
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # Logins aguardando além dos que já estão em processamento
     
     # Ollama
     OLLAMA_BASE_URL: str = "http://localhost:11434"
@@ -50,6 +62,7 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = ""
     USE_GEMINI: bool = False  # Se True, usa Gemini ao invés de Ollama
     GEMINI_MODEL: str = "gemini-2.0-flash"  # Modelo rápido do Gemini (mais rápido e disponível)
+    CHATBOT_CONTEXT_TTL: int = 600  # Segundos do contexto financeiro do chatbot em cache (invalidado a cada mudança em bills)
     
     # MinIO / S3
     MINIO_ENABLED: bool = False  # Desabilitado por padrão (não quebra se MinIO não estiver disponível)
@@ -59,17 +72,29 @@ class Settings(BaseSettings):
     MINIO_BUCKET_NAME: str = "economizeia-documents"
     MINIO_USE_SSL: bool = False
     
+    # OCR em processo (usado quando o Celery não está disponível)
+    OCR_WORKERS: int = 2  # Processos dedicados ao OCR
+    OCR_QUEUE_SIZE: int = 8  # Uploads aguardando além dos que já estão em processamento
+    OCR_JOB_STATUS_TTL: int = 24 * 3600  # Status dos jobs no Redis, visível para todos os workers do uvicorn
+    OCR_PAGE_WORKERS: int = 4  # Páginas de PDF processadas em paralelo por documento
+    OCR_CACHE_TTL: int = 7 * 24 * 3600  # Resultado de OCR por SHA-256 do arquivo (Redis)
+    OCR_ROI_ENABLED: bool = True  # OCR só nas regiões do boleto (linha digitável, valor, vencimento)
+    
     # SMTP (Gmail/Outlook)
     SMTP_HOST: str = ""
     SMTP_PORT: int = 587  # Porta 587 para TLS
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     SMTP_FROM: str = "noreply@economizeia.com"
+    SMTP_POOL_SIZE: int = 4  # Conexões SMTP persistentes por processo
     
     # Brevo (Sendinblue) API - alternativa mais confiável que SMTP
     BREVO_API_KEY: str = ""  # Se configurado, usa Brevo API ao invés de SMTP
     BREVO_FROM: str = ""  # Email de envio (pode ser qualquer email verificado)
     
+    # Envio em lote (Celery)
+    EMAIL_SEND_CONCURRENCY: int = 10  # Máximo de emails enviados em paralelo por worker
+    
     # SMS (Twilio)
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
@@ -79,15 +104,26 @@ class Settings(BaseSettings):
     FCM_SERVER_KEY: str = ""
     FCM_PROJECT_ID: str = ""
     
+    # Listagens (paginação por cursor)
+    LIST_MAX_LIMIT: int = 500  # Máximo de itens por página
+    LIST_DEFAULT_LIMIT: int = 500  # Página sem ?limit= (o frontend segue o X-Next-Cursor)
+    
     # Application
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
     
     # LGPD
-    DATA_RETENTION_DAYS: int = 365
+    DATA_RETENTION_DAYS: int = 365  # Partições de notifications/audit_logs mais antigas que isso são removidas
+    DATA_RETENTION_ARCHIVE: bool = False  # True: move as partições expiradas para o schema "archive" em vez de apagar
+    PARTITION_MONTHS_AHEAD: int = 3  # Meses futuros com partição já criada (folga se o beat parar)
     MASK_SENSITIVE_DATA: bool = True
     
+    # Audit log (gravação em lote em background)
+    AUDIT_BATCH_SIZE: int = 500  # Linhas por INSERT multi-row
+    AUDIT_FLUSH_INTERVAL: float = 2.0  # Segundos entre flushes do buffer
+    AUDIT_BUFFER_MAX: int = 50000  # Acima disso (banco fora do ar) os logs mais antigos são descartados
+    
     # CORS - aceita JSON ou string separada por vírgula
     CORS_ORIGINS: str = '["http://localhost:3000", "http://localhost:5173"]'
     
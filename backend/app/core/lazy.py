@@ -0,0 +1,49 @@
+"""
+Lazily-constructed service singletons.
+
+Services that import heavy libraries or talk to a backend (Redis, MinIO,
+Tesseract) are exposed as LazyService proxies: importing the module is cheap
+and the real instance is only built on first use, so API pods and Celery
+workers don't pay for (or block on) backends they never touch.
+"""
+import logging
+import threading
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyService(Generic[T]):
+    """Proxy that builds the wrapped service on first attribute access (thread-safe)."""
+
+    def __init__(self, factory: Callable[[], T], name: str = None):
+        self._factory = factory
+        self._name = name or getattr(factory, "__name__", "service")
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    logger.debug(f"Inicializando {self._name} sob demanda")
+                    self._instance = self._factory()
+        return self._instance
+
+    def reset(self):
+        """Drop the instance; the next access builds a new one."""
+        with self._lock:
+            self._instance = None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self.initialized else "not initialized"
+        return f"<LazyService {self._name} ({state})>"
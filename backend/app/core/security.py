@@ -5,8 +5,12 @@ from passlib.context import CryptContext
 from argon2 import PasswordHasher
 from app.core.config import settings
 
-# Argon2id for password hashing
-ph = PasswordHasher()
+# Argon2id for password hashing (parâmetros por deploy, ver scripts/benchmark_password_hash.py)
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM
+)
 
 # JWT
 SECRET_KEY = settings.SECRET_KEY
@@ -27,6 +31,14 @@ def get_password_hash(password: str) -> str:
     return ph.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with Argon2 parameters other than the current ones."""
+    try:
+        return ph.check_needs_rehash(hashed_password)
+    except Exception:
+        return False
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
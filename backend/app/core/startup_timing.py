@@ -0,0 +1,51 @@
+"""
+Startup timing: how long app.main takes to import and how long until the
+first request is served. Import this module first in app.main so the clock
+starts before the routers, models and services are loaded.
+"""
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Marks startup milestones relative to the start of the app import."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.import_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self.first_request_seconds: Optional[float] = None
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def imported(self):
+        self.import_seconds = self._elapsed()
+        logger.info(f"⏱️ app.main importado em {self.import_seconds * 1000:.0f}ms")
+
+    def started_up(self):
+        self.startup_seconds = self._elapsed()
+        logger.info(f"⏱️ Startup concluído em {self.startup_seconds * 1000:.0f}ms desde o import")
+
+    def first_request(self):
+        """Record the first served request (only once per process)."""
+        if self.first_request_seconds is not None:
+            return
+        self.first_request_seconds = self._elapsed()
+        logger.info(f"⏱️ Primeira requisição atendida {self.first_request_seconds * 1000:.0f}ms após o import")
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "import_ms": ms(self.import_seconds),
+            "startup_ms": ms(self.startup_seconds),
+            "first_request_ms": ms(self.first_request_seconds),
+        }
+
+
+startup_timer = StartupTimer()
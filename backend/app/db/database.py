@@ -1,8 +1,13 @@
+import asyncio
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+# Engine síncrono: tasks do Celery, scripts e routers ainda não migrados
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -15,6 +20,54 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _async_database_url():
+    """DATABASE_URL for asyncpg: swaps the driver and turns ?sslmode= into connect_args."""
+    url = make_url(settings.DATABASE_URL)
+    connect_args = {}
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"])
+        if sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    return url.set(drivername="postgresql+asyncpg"), connect_args
+
+
+_async_url, _async_connect_args = _async_database_url()
+
+# Engine assíncrono (asyncpg) para os endpoints: queries não bloqueiam o event loop
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20
+)
+
+# expire_on_commit=False: atributos continuam acessíveis após o commit sem novo I/O implícito
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+# Loop dono das conexões do pool assíncrono (conexões asyncpg só funcionam no loop que as abriu)
+_async_pool_loop = None
+
+
+async def _ensure_async_pool_loop():
+    """Start a fresh pool when running on a different event loop (TestClient, asyncio.run in scripts)."""
+    global _async_pool_loop
+    loop = asyncio.get_running_loop()
+    if _async_pool_loop is loop:
+        return
+    if _async_pool_loop is not None:
+        # close=False: as conexões antigas pertencem a outro loop e não podem ser fechadas daqui
+        await async_engine.dispose(close=False)
+    _async_pool_loop = loop
+
+
 def get_db():
     """Dependency for getting database session."""
     db = SessionLocal()
@@ -23,3 +76,9 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """Dependency for getting an async database session."""
+    await _ensure_async_pool_loop()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,83 @@
+"""
+Explicit schema migration entry point (replaces create_all + run_migrations
+that used to run on every import of app.main).
+
+Uso: python -m app.db.migrate   (deploy/release, antes de subir a API e os workers)
+
+Bancos criados antes do Alembic (tabelas existem, alembic_version não)
+recebem os ajustes que o antigo run_migrations() fazia e são marcados na
+0001; depois tudo segue com `alembic upgrade head`. Um advisory lock do
+Postgres garante que só um processo migra por vez.
+"""
+import logging
+import sys
+import time
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db.partitions import ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Chave arbitrária do pg_advisory_lock usada só pelas migrations
+MIGRATION_LOCK_ID = 7_342_001
+
+# O que o antigo run_migrations() aplicava em bancos criados pelo create_all
+LEGACY_FIXES = [
+    "ALTER TABLE bills ALTER COLUMN amount DROP NOT NULL",
+    "ALTER TABLE bills ALTER COLUMN due_date DROP NOT NULL",
+    "ALTER TABLE bill_documents ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64)",
+    "ALTER TABLE bill_documents ADD COLUMN IF NOT EXISTS ocr_method VARCHAR(20)",
+    "CREATE INDEX IF NOT EXISTS ix_bill_documents_content_sha256 ON bill_documents (content_sha256)",
+]
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def _adopt_legacy_schema(config: Config):
+    """Bring a pre-Alembic database to revision 0001 without recreating its tables."""
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" in tables or "bills" not in tables:
+        return
+
+    logger.info("🗄️ Banco criado antes do Alembic: aplicando ajustes legados e marcando revisão 0001")
+    with engine.begin() as conn:
+        for statement in LEGACY_FIXES:
+            conn.execute(text(statement))
+    command.stamp(config, "0001")
+
+
+def migrate(revision: str = "head"):
+    """Upgrade the database to `revision`, holding the migration advisory lock."""
+    started = time.perf_counter()
+    config = alembic_config()
+
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            _adopt_legacy_schema(config)
+            command.upgrade(config, revision)
+            if revision == "head":
+                # Deploy também garante as partições dos próximos meses, mesmo com o beat parado
+                ensure_partitions(engine, settings.PARTITION_MONTHS_AHEAD)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            lock_conn.commit()
+
+    logger.info(f"✅ Migrations aplicadas até {revision} em {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate(sys.argv[1] if len(sys.argv) > 1 else "head")
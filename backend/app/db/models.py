@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Boolean, Text, Enum, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, Numeric, Date, DateTime, Boolean, Text, Enum, ForeignKey, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -68,6 +68,7 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # Incrementar revoga os tokens emitidos
     notif_prefs = Column(JSONB, default={
         "email_enabled": True,
         "sms_enabled": False,
@@ -105,6 +106,10 @@ class Account(Base):
 
 class Bill(Base):
     __tablename__ = "bills"
+    __table_args__ = (
+        Index("ix_bills_user_id_due_date", "user_id", "due_date"),
+        Index("ix_bills_user_id_status", "user_id", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -126,14 +131,32 @@ class Bill(Base):
     payments = relationship("Payment", back_populates="bill", cascade="all, delete-orphan")
 
 
+class UserMonthlySummary(Base):
+    """
+    Rollup of bills per (user, month of due_date, type, category, status).
+    Kept up to date by app.services.monthly_summary on every bill flush.
+    """
+    __tablename__ = "user_monthly_summary"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)  # Primeiro dia do mês do vencimento
+    type = Column(Enum(BillType), primary_key=True)
+    category = Column(String(50), primary_key=True, default="")  # "" = sem categoria
+    status = Column(Enum(BillStatus), primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
 class BillDocument(Base):
     __tablename__ = "bill_documents"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bill_id = Column(UUID(as_uuid=True), ForeignKey("bills.id"), nullable=False)
     s3_path = Column(String(500), nullable=False)
+    content_sha256 = Column(String(64), nullable=True, index=True)  # Chave do cache de OCR
     ocr_text = Column(Text, nullable=True)
     ocr_confidence = Column(Float, default=0.0)
+    ocr_method = Column(String(20), nullable=True)  # text_layer, mixed, ocr, ocrmypdf ou cache
     extracted_json = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -142,6 +165,9 @@ class BillDocument(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_user_id_scheduled_date", "user_id", "scheduled_date"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bill_id = Column(UUID(as_uuid=True), ForeignKey("bills.id"), nullable=False)
@@ -161,6 +187,9 @@ class Payment(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_type_sent_at", "user_id", "type", "sent_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -169,7 +198,8 @@ class Notification(Base):
     sent_at = Column(DateTime(timezone=True), nullable=True)
     payload = Column(JSONB, nullable=True)
     status = Column(String(50), default="pending")  # pending, sent, failed
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Chave das partições mensais (migration 0005): no banco a PK é (id, created_at)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user = relationship("User", back_populates="notifications")
 
@@ -236,7 +266,8 @@ class AuditLog(Base):
     entity = Column(String(100), nullable=False)  # bill, payment, user, etc
     action = Column(String(50), nullable=False)  # create, update, delete, confirm, etc
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Chave das partições mensais (migration 0005): no banco a PK é (id, timestamp)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     details = Column(JSONB, nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
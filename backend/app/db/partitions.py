@@ -0,0 +1,141 @@
+"""
+Partições mensais (PARTITION BY RANGE) de notifications e audit_logs.
+
+As duas tabelas só recebem INSERT e crescem para sempre; com uma partição por
+mês a retenção (DATA_RETENTION_DAYS) vira DETACH + DROP de partições inteiras
+em vez de DELETE linha a linha, e as consultas com limite de data só leem os
+meses que interessam. A conversão das tabelas é a migration 0005; daqui em
+diante a task maintain_partitions cria os próximos meses e remove os expirados.
+"""
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import and_, text
+
+from app.db.models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Tabela particionada -> coluna da chave de partição
+PARTITIONED_TABLES: Dict[str, str] = {
+    "notifications": "created_at",
+    "audit_logs": "timestamp",
+}
+
+# Schema que recebe as partições expiradas quando DATA_RETENTION_ARCHIVE está ligado
+ARCHIVE_SCHEMA = "archive"
+
+# sent_at é preenchido junto com o INSERT, mas created_at (now() da transação) pode ser um pouco anterior
+PRUNING_SLACK = timedelta(days=1)
+
+_PARTITION_RE = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+class Partition(NamedTuple):
+    table: str
+    name: str
+    month: date
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def parse_partition(name: str) -> Optional[Partition]:
+    """Partition for a `<table>_pYYYY_MM` relation name, None for anything else."""
+    match = _PARTITION_RE.match(name)
+    if not match or match.group("table") not in PARTITIONED_TABLES:
+        return None
+    return Partition(match.group("table"), name, date(int(match.group("year")), int(match.group("month")), 1))
+
+
+def parent_table(relation: str) -> str:
+    """notifications_p2025_11 -> notifications (EXPLAIN mostra o nome da partição)."""
+    partition = parse_partition(relation)
+    return partition.table if partition else relation
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    # Limites em UTC explícito: o timezone da sessão não pode mudar a fronteira do mês
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def expired(partitions: List[Partition], retention_days: int, today: date = None) -> List[Partition]:
+    """Partitions whose whole month is older than retention_days."""
+    cutoff = (today or date.today()) - timedelta(days=retention_days)
+    return [p for p in partitions if add_months(p.month, 1) <= cutoff]
+
+
+def list_partitions(conn, table: str) -> List[Partition]:
+    rows = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+    ), {"table": table}).scalars()
+    partitions = [parse_partition(name) for name in rows]
+    return sorted((p for p in partitions if p and p.table == table), key=lambda p: p.month)
+
+
+def ensure_partitions(engine, months_ahead: int, today: date = None) -> List[str]:
+    """Create the partitions for the current month and the next months_ahead. Returns the new ones."""
+    current = month_start(today or date.today())
+    created = []
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            existing = {p.name for p in list_partitions(conn, table)}
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                if partition_name(table, month) not in existing:
+                    conn.execute(text(create_partition_sql(table, month)))
+                    created.append(partition_name(table, month))
+    if created:
+        logger.info(f"🗂️ Partições criadas: {', '.join(created)}")
+    return created
+
+
+def drop_expired_partitions(engine, retention_days: int, archive: bool = False, today: date = None) -> List[str]:
+    """
+    Detach the partitions past retention_days and drop them (or move them to
+    the archive schema). One transaction per partition keeps the ACCESS
+    EXCLUSIVE lock of DETACH short.
+    """
+    removed = []
+    with engine.connect() as conn:
+        partitions = [p for table in PARTITIONED_TABLES for p in list_partitions(conn, table)]
+
+    for partition in expired(partitions, retention_days, today):
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {partition.table} DETACH PARTITION {partition.name}"))
+            if archive:
+                conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+                conn.execute(text(f"ALTER TABLE {partition.name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            else:
+                conn.execute(text(f"DROP TABLE {partition.name}"))
+        removed.append(partition.name)
+
+    if removed:
+        action = f"arquivadas em {ARCHIVE_SCHEMA}" if archive else "removidas"
+        logger.info(f"🧹 Partições expiradas {action}: {', '.join(removed)}")
+    return removed
+
+
+def sent_since(since: datetime):
+    """
+    Notification.sent_at >= since plus a created_at bound, so the dedup queries
+    of the Celery sweeps only read the last partitions instead of all of them.
+    """
+    return and_(Notification.sent_at >= since, Notification.created_at >= since - PRUNING_SLACK)
@@ -0,0 +1,116 @@
+"""
+EXPLAIN das consultas por usuário mais frequentes (GET /bills, fila de QA,
+varreduras do Celery) para garantir que usam os índices compostos e não
+voltem a fazer Seq Scan em bills/notifications/payments.
+"""
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.partitions import parent_table
+
+logger = logging.getLogger(__name__)
+
+# Tabelas que não podem aparecer com Seq Scan nos planos
+INDEXED_TABLES = {"bills", "notifications", "payments", "user_monthly_summary"}
+
+
+def representative_queries(db: Session, user_id: UUID = None) -> Dict[str, Any]:
+    """
+    The queries behind list_bills, get_pending_qa, list_payments, the chatbot
+    context and the Celery sweeps, built by the same functions the endpoints and
+    tasks call (so a change there changes the plan checked here).
+    """
+    # Imports tardios: routers e tasks importam app.db, não o contrário
+    from app.api.pagination import encode_cursor
+    from app.api.v1.bills import BILL_LIST_FIELDS, bill_list_query
+    from app.api.v1.payments import PAYMENT_LIST_FIELDS, payment_list_query
+    from app.api.v1.qa import QA_LIST_FIELDS, pending_qa_query
+    from app.core.config import settings
+    from app.services.chatbot_context import next_bills_query, overdue_bills_query
+    from app.services.monthly_summary import range_query, summary_query
+    from app.tasks.notification_tasks import (
+        budget_alert_query, reminder_sent_query, report_sent_query, upcoming_bills_query
+    )
+
+    user_id = user_id or uuid4()
+    today = date.today()
+    today_start = datetime.combine(today, datetime.min.time())
+    limit = settings.LIST_DEFAULT_LIMIT
+
+    return {
+        "list_bills": bill_list_query(
+            user_id, list(BILL_LIST_FIELDS),
+            from_date=(today - timedelta(days=30)).isoformat(),
+            to_date=(today + timedelta(days=30)).isoformat(),
+            limit=limit
+        ),
+        "list_bills_by_status": bill_list_query(user_id, list(BILL_LIST_FIELDS), status="scheduled", limit=limit),
+        "list_bills_next_page": bill_list_query(
+            user_id, list(BILL_LIST_FIELDS), cursor=encode_cursor(today, uuid4()), limit=limit
+        ),
+        "get_pending_qa": pending_qa_query(db, user_id, list(QA_LIST_FIELDS), limit=limit),
+        "list_payments": payment_list_query(db, user_id, list(PAYMENT_LIST_FIELDS), limit=limit),
+        "chatbot_next_bills": next_bills_query(user_id),
+        "chatbot_overdue_bills": overdue_bills_query(user_id, today),
+        "monthly_summary": summary_query(user_id, today.replace(day=1), today.replace(day=1)),
+        "weekly_report_range": range_query(user_id, today - timedelta(days=7), today),
+        "upcoming_bills_sweep": upcoming_bills_query(db, user_id, today),
+        "reminder_already_sent": reminder_sent_query(db, user_id, today_start),
+        "report_already_sent": report_sent_query(
+            db, user_id, today_start - timedelta(days=7),
+            report_type="weekly", week_start=(today - timedelta(days=today.weekday())).isoformat()
+        ),
+        "budget_alert_candidates": budget_alert_query(db, today),
+    }
+
+
+def _plan_nodes(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain(db: Session, query) -> Dict[str, Any]:
+    """EXPLAIN (FORMAT JSON) of an ORM Query or a select(), with bound values inlined."""
+    statement = getattr(query, "statement", query)
+    sql = statement.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True}
+    )
+    raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return plan[0]["Plan"]
+
+
+def find_seq_scans(db: Session, user_id: UUID = None) -> Dict[str, List[str]]:
+    """
+    Seq Scans on indexed tables per query. Empty dict means every query uses an index.
+
+    enable_seqscan fica desligado na transação: em tabelas pequenas (teste/dev)
+    o planner prefere Seq Scan mesmo com índice; assim só sobra Seq Scan quando
+    não existe índice utilizável.
+    """
+    offenders: Dict[str, List[str]] = {}
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    try:
+        for name, query in representative_queries(db, user_id).items():
+            plan = explain(db, query)
+            tables = [
+                node.get("Relation Name")
+                for node in _plan_nodes(plan)
+                # notifications é particionada: o plano mostra notifications_pYYYY_MM
+                if node.get("Node Type") == "Seq Scan" and parent_table(node.get("Relation Name", "")) in INDEXED_TABLES
+            ]
+            if tables:
+                offenders[name] = tables
+                logger.warning(f"⚠️ Seq Scan em {name}: {', '.join(tables)}")
+    finally:
+        db.rollback()
+    return offenders
@@ -1,51 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from app.core.startup_timing import startup_timer  # primeiro import: inicia o relógio do startup
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 
 from app.core.config import settings
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.v1 import auth, bills, payments, notifications, qa, chatbot, savings_goals, investments
-from app.db.database import engine, Base
 
 # Importar modelos para garantir que sejam registrados no Base.metadata
 from app.db.models import SavingsGoal, Investment, User  # noqa: F401
+# Listener que mantém user_monthly_summary em dia a cada flush de bills
+import app.services.monthly_summary  # noqa: F401
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Executar migrations necessárias
-def run_migrations():
-    """Executa migrations SQL necessárias."""
-    from sqlalchemy import text
-    from app.db.database import engine
-    
-    try:
-        with engine.connect() as conn:
-            # Verificar se a coluna amount ainda tem NOT NULL
-            result = conn.execute(text("""
-                SELECT is_nullable 
-                FROM information_schema.columns 
-                WHERE table_name = 'bills' AND column_name = 'amount'
-            """))
-            row = result.fetchone()
-            
-            if row and row[0] == 'NO':
-                logger.info("Executando migration: tornar amount e due_date nullable")
-                conn.execute(text("ALTER TABLE bills ALTER COLUMN amount DROP NOT NULL"))
-                conn.execute(text("ALTER TABLE bills ALTER COLUMN due_date DROP NOT NULL"))
-                conn.commit()
-                logger.info("Migration executada com sucesso")
-            else:
-                logger.info("Migration já aplicada ou coluna já é nullable")
-    except Exception as e:
-        logger.warning(f"Erro ao executar migration (pode ser que já esteja aplicada): {e}")
-
-# Executar migrations na inicialização
-run_migrations()
+# O schema é gerenciado pelo Alembic: rode `python -m app.db.migrate` no deploy
 
 app = FastAPI(
     title="EconomizeIA API",
@@ -65,7 +39,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # "*" não vale com allow_credentials: o navegador só expõe os headers listados
+    expose_headers=[NEXT_CURSOR_HEADER, "Retry-After"],
 )
 
 # Include routers
@@ -79,6 +54,37 @@ app.include_router(savings_goals.router, prefix="/api/v1/savings-goals", tags=["
 app.include_router(investments.router, prefix="/api/v1/investments", tags=["Investimentos"])
 
 
+@app.middleware("http")
+async def record_first_request(request: Request, call_next):
+    response = await call_next(request)
+    startup_timer.first_request()
+    return response
+
+
+@app.on_event("startup")
+async def report_startup_time():
+    startup_timer.started_up()
+
+
+@app.on_event("shutdown")
+async def close_shared_clients():
+    """Close pooled HTTP/DB connections and worker pools held by long-lived services."""
+    from app.db.database import async_engine
+    from app.services.notification_service import notification_service
+    from app.services.ocr_executor import ocr_executor
+    from app.services.password_hasher import password_hasher
+    from app.services.audit_buffer import audit_buffer
+    from app.services.cache_service import cache_service
+    await notification_service.aclose()
+    ocr_executor.shutdown()
+    password_hasher.shutdown()
+    # Garante que os audit logs ainda no buffer sejam gravados antes de sair
+    await asyncio.get_running_loop().run_in_executor(None, audit_buffer.close)
+    if cache_service.initialized:
+        await cache_service.aclose()
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     return {"message": "EconomizeIA API", "version": "1.0.0"}
@@ -86,7 +92,24 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    from app.services.ocr_executor import ocr_executor
+    from app.services.ocr_result_cache import ocr_result_cache
+    from app.services.password_hasher import password_hasher
+    from app.services.user_cache import user_cache
+    from app.services.audit_buffer import audit_buffer
+    from app.services.cache_service import cache_service
+    from app.services.chatbot_context import context_cache
+    return {
+        "status": "healthy",
+        "ocr_queue": ocr_executor.stats(),
+        "ocr_cache": ocr_result_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "cache": cache_service.stats(),
+        "chatbot_context": context_cache.stats(),
+        "password_hash": password_hasher.stats(),
+        "audit_log": audit_buffer.stats(),
+        "startup": startup_timer.stats(),
+    }
 
 
 @app.exception_handler(Exception)
@@ -97,3 +120,5 @@ async def global_exception_handler(request, exc):
         content={"detail": "Internal server error"}
     )
 
+
+startup_timer.imported()
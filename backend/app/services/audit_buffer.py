@@ -0,0 +1,183 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+    In-memory audit sink flushed in batches by a background thread.
+
+    log_action only appends to a deque, so audit logging costs the request no
+    extra commit. Every AUDIT_FLUSH_INTERVAL seconds (or as soon as
+    AUDIT_BATCH_SIZE entries are waiting) the entries go to audit_logs in one
+    executemany, which SQLAlchemy sends as multi-row INSERT ... VALUES.
+    close() (API shutdown, atexit in Celery/scripts) flushes what is left; only
+    a hard kill can lose the last interval of entries. add() never touches the
+    database while the thread runs: with AUDIT_BUFFER_MAX entries waiting (the
+    database is down) the oldest entries are dropped instead.
+    """
+
+    def __init__(self, bind=None, batch_size: int = None, flush_interval: float = None, max_entries: int = None):
+        self._bind = bind
+        self.batch_size = max(batch_size or settings.AUDIT_BATCH_SIZE, 1)
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL
+        self.max_entries = max(max_entries or settings.AUDIT_BUFFER_MAX, self.batch_size)
+        self.flushed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+        self._reset_process_state()
+
+    def _reset_process_state(self):
+        """Fresh queue/lock/thread (also after a fork: Celery prefork workers)."""
+        self._pid = os.getpid()
+        self._entries: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def bind(self):
+        if self._bind is None:
+            from app.db.database import engine
+            self._bind = engine
+        return self._bind
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-buffer", daemon=True)
+            self._thread.start()
+
+    def add(self, entry: Dict[str, Any]):
+        if self._pid != os.getpid():
+            self._reset_process_state()
+
+        with self._lock:
+            self._entries.append(entry)
+            self._trim()
+            pending = len(self._entries)
+            if not self._stopped:
+                self._ensure_thread()
+
+        if self._stopped:
+            # Depois do close() não há thread: grava na hora
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _trim(self):
+        """Drop the oldest entries above max_entries (caller holds the lock)."""
+        while len(self._entries) > self.max_entries:
+            self._entries.popleft()
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Buffer de audit logs cheio: {self.dropped} entradas antigas descartadas até agora")
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Erro no flush do audit log: {e}", exc_info=True)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(len(self._entries), self.batch_size)
+            return [self._entries.popleft() for _ in range(count)]
+
+    def _requeue(self, rows: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries.extendleft(reversed(rows))
+            self._trim()
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        with self.bind.begin() as conn:
+            conn.execute(insert(AuditLog.__table__), rows)
+
+    def _insert_one_by_one(self, rows: List[Dict[str, Any]]) -> int:
+        """A bad row (e.g. user deleted meanwhile) must not take the whole batch with it."""
+        written = 0
+        for row in rows:
+            try:
+                self._insert([row])
+                written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Audit log descartado ({row.get('entity')}/{row.get('action')}): {e}")
+        self.flushed += written
+        return written
+
+    def flush(self) -> int:
+        """Write every buffered entry now. Returns how many were written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._take()
+                if not rows:
+                    break
+                started = time.perf_counter()
+                try:
+                    self._insert(rows)
+                except Exception as e:
+                    if self._can_reach_database():
+                        # Erro da própria linha (FK, constraint): repetir não resolve, então grava as boas e descarta o resto
+                        logger.warning(f"Falha no lote de {len(rows)} audit logs, gravando um a um: {e}")
+                        written += self._insert_one_by_one(rows)
+                        continue
+                    # Banco indisponível: devolve para a fila e tenta no próximo ciclo
+                    self._requeue(rows)
+                    logger.error(f"Banco indisponível para audit logs ({len(rows)} na fila): {e}")
+                    break
+                written += len(rows)
+                self.flushed += len(rows)
+                self.batches += 1
+                logger.debug(f"📝 {len(rows)} audit logs gravados em {(time.perf_counter() - started) * 1000:.1f}ms")
+        return written
+
+    def _can_reach_database(self) -> bool:
+        try:
+            with self.bind.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        """Stop the background thread and flush what is left (shutdown)."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        written = self.flush()
+        if written:
+            logger.info(f"📝 {written} audit logs gravados no encerramento")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._entries),
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+
+audit_buffer = AuditBuffer()
+
+# Celery workers e scripts não têm evento de shutdown do FastAPI
+atexit.register(audit_buffer.close)
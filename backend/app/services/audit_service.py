@@ -1,23 +1,29 @@
 from sqlalchemy.orm import Session
-from app.db.models import AuditLog
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.audit_buffer import audit_buffer
 import uuid
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from fastapi import Request
 
 
 class AuditService:
-    """Service for creating immutable audit logs."""
+    """
+    Service for creating immutable audit logs.
+
+    Entries go to audit_buffer and are written in batches in the background,
+    so logging adds no commit to the request. `db` is kept in the signatures
+    for the existing callers; the caller's transaction is not touched.
+    """
     
     @staticmethod
-    def log_action(
-        db: Session,
+    def _build_entry(
         entity: str,
         action: str,
         user_id: Optional[uuid.UUID] = None,
         details: Optional[Dict[str, Any]] = None,
         request: Optional[Request] = None
-    ):
-        """Create an audit log entry."""
+    ) -> Dict[str, Any]:
         ip_address = None
         user_agent = None
         
@@ -25,21 +31,43 @@ class AuditService:
             ip_address = request.client.host if request.client else None
             user_agent = request.headers.get("user-agent")
         
-        audit_log = AuditLog(
-            id=uuid.uuid4(),
-            entity=entity,
-            action=action,
-            user_id=user_id,
-            details=details or {},
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        
-        db.add(audit_log)
-        db.commit()
-        
-        return audit_log
+        return {
+            "id": uuid.uuid4(),
+            "entity": entity,
+            "action": action,
+            "user_id": user_id,
+            # Horário da ação, não do flush do buffer
+            "timestamp": datetime.now(timezone.utc),
+            "details": details or {},
+            "ip_address": ip_address,
+            "user_agent": user_agent[:500] if user_agent else None
+        }
+    
+    @staticmethod
+    def log_action(
+        db: Session,
+        entity: str,
+        action: str,
+        user_id: Optional[uuid.UUID] = None,
+        details: Optional[Dict[str, Any]] = None,
+        request: Optional[Request] = None
+    ):
+        """Queue an audit log entry."""
+        entry = AuditService._build_entry(entity, action, user_id, details, request)
+        audit_buffer.add(entry)
+        return entry
+    
+    @staticmethod
+    async def log_action_async(
+        db: AsyncSession,
+        entity: str,
+        action: str,
+        user_id: Optional[uuid.UUID] = None,
+        details: Optional[Dict[str, Any]] = None,
+        request: Optional[Request] = None
+    ):
+        """Queue an audit log entry (async callers)."""
+        return AuditService.log_action(db, entity, action, user_id, details, request)
 
 
 audit_service = AuditService()
-
@@ -0,0 +1,114 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.db.models import Bill, BillDocument, BillStatus
+from app.services.bill_extractor import brazilian_bill_extractor
+from app.services.ollama_service import ollama_service
+
+logger = logging.getLogger(__name__)
+
+
+async def extract_bill_fields(
+    ocr_text: str,
+    image_url: Optional[str] = None,
+    filename: Optional[str] = None,
+    bill_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Extract bill fields from OCR text: regex first (fast), AI as fallback.
+    Shared by the Celery task and the in-process OCR executor.
+    """
+    # PRIMEIRO: Tentar extração com regex específico para boletos brasileiros
+    regex_extracted = brazilian_bill_extractor.extract_fields(ocr_text)
+
+    # Se regex extraiu com boa confiança, usar diretamente
+    if regex_extracted.get("confidence", 0.0) >= 0.80:
+        logger.info(f"Extraction via regex bem-sucedida (confiança: {regex_extracted['confidence']:.2f})")
+        return regex_extracted
+
+    # Se regex não foi suficiente, usar AI como fallback
+    logger.info(f"Regex extraiu com confiança baixa ({regex_extracted.get('confidence', 0):.2f}), tentando AI...")
+    ai_service = ollama_service
+    if ai_service is None:
+        from app.services.gemini_service import get_gemini_service
+        ai_service = get_gemini_service()
+        if ai_service is None:
+            logger.warning(f"Nenhum serviço de IA disponível, usando resultado do regex")
+            return regex_extracted
+        logger.info(f"Ollama não disponível, usando Gemini para extração de campos do boleto {bill_id}")
+
+    ai_extracted = await ai_service.extract_bill_fields(
+        ocr_text=ocr_text,
+        image_url=image_url,
+        metadata={"filename": filename}
+    )
+
+    # Combinar resultados: preferir regex para campos essenciais, AI para outros
+    return {
+        "issuer": regex_extracted.get("issuer") or ai_extracted.get("issuer"),
+        "amount": regex_extracted.get("amount") or ai_extracted.get("amount"),
+        "currency": "BRL",
+        "due_date": regex_extracted.get("due_date") or ai_extracted.get("due_date"),
+        "barcode": regex_extracted.get("barcode") or ai_extracted.get("barcode"),
+        "payment_place": None,
+        "confidence": max(regex_extracted.get("confidence", 0.0), ai_extracted.get("confidence", 0.0)),
+        "notes": ai_extracted.get("notes", "")
+    }
+
+
+def apply_extracted_fields(bill: Bill, extracted: Dict[str, Any], ocr_confidence: float):
+    """Copy extracted fields to the bill and set its confidence and review status."""
+    if extracted.get("issuer"):
+        bill.issuer = extracted["issuer"]
+    if extracted.get("amount"):
+        bill.amount = float(extracted["amount"])
+    if extracted.get("due_date"):
+        try:
+            bill.due_date = datetime.fromisoformat(extracted["due_date"]).date()
+        except (TypeError, ValueError):
+            pass
+    if extracted.get("barcode"):
+        bill.barcode = extracted["barcode"]
+    if extracted.get("currency"):
+        bill.currency = extracted["currency"]
+
+    # Calcular confiança: usar a do AI se fornecida e > 0, senão calcular baseado nos campos
+    ai_confidence = extracted.get("confidence", 0.0)
+    if ai_confidence > 0:
+        bill.confidence = ai_confidence
+    else:
+        # Calcular confiança baseada nos campos extraídos
+        has_amount = bill.amount is not None and bill.amount > 0
+        has_due_date = bill.due_date is not None
+        has_issuer = bill.issuer is not None and bill.issuer != ""
+        has_barcode = bill.barcode is not None and bill.barcode != ""
+
+        if has_amount and has_due_date:
+            bill.confidence = 0.85
+            if has_issuer:
+                bill.confidence += 0.05
+            if has_barcode:
+                bill.confidence += 0.05
+            bill.confidence = min(bill.confidence, 0.95)
+        elif has_amount or has_due_date:
+            bill.confidence = 0.65 if has_issuer else 0.55
+        elif has_issuer:
+            bill.confidence = 0.45
+        else:
+            bill.confidence = max(ocr_confidence, 0.3)  # Usar OCR confidence como mínimo
+
+    # Set status based on confidence
+    if bill.confidence >= 0.9:
+        bill.status = BillStatus.CONFIRMED
+    else:
+        bill.status = BillStatus.PENDING  # Requires manual review
+
+
+def apply_cached_result(bill: Bill, document: BillDocument, cached: Dict[str, Any]):
+    """Fill a new upload from the OCR cache instead of running OCR and extraction again."""
+    document.ocr_text = cached.get("ocr_text")
+    document.ocr_confidence = cached.get("ocr_confidence") or 0.0
+    document.ocr_method = "cache"
+    document.extracted_json = cached.get("extracted_json")
+    apply_extracted_fields(bill, document.extracted_json or {}, document.ocr_confidence)
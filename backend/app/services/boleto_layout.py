@@ -0,0 +1,107 @@
+"""
+Detecção de layout da ficha de compensação (boleto FEBRABAN).
+Localiza, pelas linhas da grade, as regiões onde ficam a linha digitável,
+vencimento/valor (coluna da direita) e beneficiário, para o OCR rodar só nelas.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]  # x, y, largura, altura
+
+# Mínimo de linhas horizontais para considerar que a grade da ficha foi encontrada
+MIN_GRID_LINES = 4
+# Coluna da direita (vencimento, valor...) no layout FEBRABAN, se a linha vertical não for achada
+DEFAULT_RIGHT_COLUMN_RATIO = 0.72
+# Espaço vertical (fração da altura) que separa o recibo do pagador da ficha de compensação
+BLOCK_GAP_RATIO = 0.12
+
+
+def _boxes(mask) -> List[Tuple[int, int, int, int]]:
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [cv2.boundingRect(c) for c in contours]
+
+
+def _horizontal_lines(inverted) -> List[int]:
+    """Y of every horizontal line spanning at least half the page width."""
+    height, width = inverted.shape
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(width // 3, 1), 1))
+    mask = cv2.morphologyEx(inverted, cv2.MORPH_OPEN, kernel)
+    ys = sorted(y + h // 2 for x, y, w, h in _boxes(mask) if w >= width * 0.5)
+
+    # Bordas duplas viram uma linha só
+    merged: List[int] = []
+    for y in ys:
+        if not merged or y - merged[-1] > height * 0.005:
+            merged.append(y)
+    return merged
+
+
+def _grid_block(ys: List[int], height: int) -> List[int]:
+    """The group of lines with the most rows: the ficha de compensação."""
+    groups = [[ys[0]]]
+    for y in ys[1:]:
+        if y - groups[-1][-1] > height * BLOCK_GAP_RATIO:
+            groups.append([y])
+        else:
+            groups[-1].append(y)
+    return max(groups, key=len)
+
+
+def _right_column_x(inverted, top: int, bottom: int) -> int:
+    height, width = inverted.shape
+    band = inverted[top:bottom, :]
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max((bottom - top) // 10, 1)))
+    mask = cv2.morphologyEx(band, cv2.MORPH_OPEN, kernel)
+    xs = [x for x, y, w, h in _boxes(mask) if width * 0.55 < x < width * 0.9]
+    if not xs:
+        return int(width * DEFAULT_RIGHT_COLUMN_RATIO)
+    return int(np.median(xs))
+
+
+def detect_boleto_regions(binary) -> Optional[Dict[str, Region]]:
+    """
+    Find the boleto regions in a binarized page (dark text on a light background).
+    Returns None when the ficha grid is not found, so the caller OCRs the whole page.
+    """
+    if not CV2_AVAILABLE or binary is None or len(binary.shape) != 2:
+        return None
+
+    height, width = binary.shape
+    _, inverted = cv2.threshold(binary, 127, 255, cv2.THRESH_BINARY_INV)
+
+    ys = _horizontal_lines(inverted)
+    if len(ys) < MIN_GRID_LINES:
+        return None
+
+    block = _grid_block(ys, height)
+    if len(block) < MIN_GRID_LINES:
+        return None
+
+    top, bottom = block[0], block[-1]
+    row_height = int(np.median(np.diff(block)))
+    column_x = _right_column_x(inverted, top, bottom)
+    pad = max(row_height // 6, 2)
+
+    # Linha digitável: acima da primeira linha da ficha, à direita do logo do banco
+    strip_top = max(top - int(row_height * 1.3), 0)
+    regions = {
+        "linha_digitavel": (int(width * 0.3), strip_top, width - int(width * 0.3), top - strip_top),
+        # Vencimento, agência, nosso número, valor do documento...
+        "campos": (column_x + pad, top, width - column_x - pad, bottom - top),
+        # Local de pagamento e beneficiário: primeiras linhas à esquerda
+        "beneficiario": (0, top, column_x - pad, min(row_height * 3, bottom - top)),
+    }
+
+    regions = {name: region for name, region in regions.items() if region[2] > 0 and region[3] > 0}
+    logger.info(f"Layout de boleto detectado: {len(block)} linhas de grade, coluna direita em x={column_x}")
+    return regions or None
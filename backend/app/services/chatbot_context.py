@@ -0,0 +1,272 @@
+"""
+Financial context sent to the chatbot with every contextual message.
+
+Built with a few aggregate queries (GROUP BY status, window functions for the
+sample bills per category/issuer, LIMIT for next/overdue bills) instead of
+loading every bill of the user, and cached per user (memory + Redis). Any
+committed Bill change drops the user's snapshot; the snapshot is also dated,
+so the "days until"/"days overdue" fields never survive midnight.
+"""
+import json
+import logging
+from datetime import date
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Bill, BillStatus, User
+from app.services.cache_service import cache_service
+from app.services.monthly_summary import summarize, summary_query
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATUSES = (BillStatus.PENDING, BillStatus.CONFIRMED)
+CATEGORY_SAMPLE_SIZE = 5
+ISSUER_SAMPLE_SIZE = 3
+TOP_ISSUERS = 5
+NEXT_BILLS = 10
+OVERDUE_DETAILS = 20  # A contagem continua exata; só a lista detalhada é limitada
+
+_category = func.coalesce(Bill.category, "outras")
+_issuer = func.coalesce(Bill.issuer, "Desconhecido")
+
+
+def _iso(value: Optional[date]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+async def _status_counts(db: AsyncSession, user_id: UUID, today: date) -> Dict[str, Any]:
+    rows = (await db.execute(
+        select(
+            Bill.status,
+            func.count().label("count"),
+            func.coalesce(func.sum(Bill.amount), 0.0).label("total"),
+            func.count().filter(and_(Bill.due_date < today, Bill.status != BillStatus.PAID)).label("overdue"),
+        ).where(Bill.user_id == user_id).group_by(Bill.status)
+    )).all()
+
+    counts = {row.status: row.count for row in rows}
+    totals = {row.status: float(row.total) for row in rows}
+    return {
+        "total_bills": sum(counts.values()),
+        "pending_bills": sum(counts.get(s, 0) for s in PENDING_STATUSES),
+        "confirmed_bills": counts.get(BillStatus.CONFIRMED, 0),
+        "scheduled_bills": counts.get(BillStatus.SCHEDULED, 0),
+        "paid_bills": counts.get(BillStatus.PAID, 0),
+        "overdue_bills": sum(row.overdue for row in rows),
+        "total_pending": sum(totals.get(s, 0.0) for s in PENDING_STATUSES),
+        "total_paid": totals.get(BillStatus.PAID, 0.0),
+    }
+
+
+async def _categories(db: AsyncSession, user_id: UUID) -> Dict[str, Any]:
+    """Total/count per category plus its latest bills, in one pass with window functions."""
+    ranked = select(
+        _category.label("category"),
+        Bill.issuer,
+        Bill.amount,
+        Bill.due_date,
+        Bill.status,
+        func.count().over(partition_by=_category).label("count"),
+        func.coalesce(func.sum(Bill.amount).over(partition_by=_category), 0.0).label("total"),
+        func.row_number().over(partition_by=_category, order_by=Bill.created_at.desc()).label("rank"),
+    ).where(Bill.user_id == user_id).subquery()
+    rows = (await db.execute(
+        select(ranked).where(ranked.c.rank <= CATEGORY_SAMPLE_SIZE).order_by(ranked.c.total.desc(), ranked.c.rank)
+    )).all()
+
+    categories: Dict[str, Any] = {}
+    for row in rows:
+        category = categories.setdefault(row.category, {"total": float(row.total), "count": row.count, "bills": []})
+        category["bills"].append({
+            "issuer": row.issuer,
+            "amount": row.amount,
+            "due_date": _iso(row.due_date),
+            "status": row.status.value if row.status else None,
+        })
+    return categories
+
+
+async def _top_issuers(db: AsyncSession, user_id: UUID) -> Dict[str, Any]:
+    top = select(
+        _issuer.label("issuer"),
+        func.count().label("count"),
+        func.coalesce(func.sum(Bill.amount), 0.0).label("total"),
+    ).where(Bill.user_id == user_id).group_by(_issuer).order_by(func.sum(Bill.amount).desc().nulls_last()).limit(TOP_ISSUERS)
+    issuers = {
+        row.issuer: {"total": float(row.total), "count": row.count, "bills": []}
+        for row in (await db.execute(top)).all()
+    }
+    if not issuers:
+        return issuers
+
+    ranked = select(
+        _issuer.label("issuer"),
+        Bill.amount,
+        Bill.due_date,
+        Bill.status,
+        Bill.category,
+        func.row_number().over(partition_by=_issuer, order_by=Bill.created_at.desc()).label("rank"),
+    ).where(Bill.user_id == user_id, _issuer.in_(list(issuers))).subquery()
+    for row in (await db.execute(select(ranked).where(ranked.c.rank <= ISSUER_SAMPLE_SIZE).order_by(ranked.c.rank))).all():
+        issuers[row.issuer]["bills"].append({
+            "amount": row.amount,
+            "due_date": _iso(row.due_date),
+            "status": row.status.value if row.status else None,
+            "category": row.category,
+        })
+    return issuers
+
+
+def next_bills_query(user_id: UUID):
+    return select(Bill.issuer, Bill.amount, Bill.due_date, Bill.category).where(
+        Bill.user_id == user_id,
+        Bill.status.in_(PENDING_STATUSES),
+        Bill.due_date.isnot(None),
+    ).order_by(Bill.due_date).limit(NEXT_BILLS)
+
+
+def overdue_bills_query(user_id: UUID, today: date):
+    return select(Bill.issuer, Bill.amount, Bill.due_date).where(
+        Bill.user_id == user_id,
+        Bill.due_date < today,
+        Bill.status != BillStatus.PAID,
+    ).order_by(Bill.due_date).limit(OVERDUE_DETAILS)
+
+
+async def _next_bills(db: AsyncSession, user_id: UUID, today: date):
+    rows = (await db.execute(next_bills_query(user_id))).all()
+    return [
+        {
+            "issuer": row.issuer,
+            "amount": row.amount,
+            "due_date": _iso(row.due_date),
+            "days_until": (row.due_date - today).days,
+            "category": row.category,
+        }
+        for row in rows
+    ]
+
+
+async def _overdue_details(db: AsyncSession, user_id: UUID, today: date):
+    rows = (await db.execute(overdue_bills_query(user_id, today))).all()
+    return [
+        {
+            "issuer": row.issuer,
+            "amount": row.amount,
+            "due_date": _iso(row.due_date),
+            "days_overdue": (today - row.due_date).days,
+        }
+        for row in rows
+    ]
+
+
+async def build_snapshot(db: AsyncSession, user_id: UUID, today: date = None) -> Dict[str, Any]:
+    """Everything in the chatbot context except the user name, straight from the database."""
+    today = today or date.today()
+    month_summary = summarize((await db.execute(summary_query(user_id, today, today))).all())
+
+    snapshot = {"as_of": today.isoformat()}
+    snapshot.update(await _status_counts(db, user_id, today))
+    snapshot.update({
+        "monthly_expenses": month_summary["expenses"],
+        "monthly_income": month_summary["income"],
+        "monthly_balance": month_summary["income"] - month_summary["expenses"],
+        "current_month": f"{today.month}/{today.year}",
+        "categories": await _categories(db, user_id),
+        "top_issuers": await _top_issuers(db, user_id),
+        "next_bills": await _next_bills(db, user_id, today),
+        "overdue_details": await _overdue_details(db, user_id, today),
+    })
+    return snapshot
+
+
+class ChatbotContextCache:
+    """Per-user context snapshots in the two-tier cache (memory + Redis)."""
+
+    KEY_PREFIX = "chatbot:context:"
+
+    def __init__(self, ttl: int = None, cache=None):
+        self.ttl = ttl or settings.CHATBOT_CONTEXT_TTL
+        self._cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else cache_service
+
+    def _parse(self, raw: Optional[str], today: date) -> Optional[Dict[str, Any]]:
+        try:
+            snapshot = json.loads(raw) if raw else None
+            if snapshot and snapshot.get("as_of") == today.isoformat():
+                self.hits += 1
+                return snapshot
+        except Exception as e:
+            logger.warning(f"Erro ao ler contexto do chatbot em cache: {e}")
+        self.misses += 1
+        return None
+
+    async def aget(self, user_id, today: date) -> Optional[Dict[str, Any]]:
+        return self._parse(await self.cache.aget(f"{self.KEY_PREFIX}{user_id}"), today)
+
+    async def aset(self, user_id, snapshot: Dict[str, Any]):
+        await self.cache.aset(f"{self.KEY_PREFIX}{user_id}", json.dumps(snapshot), self.ttl)
+
+    def invalidate(self, user_id):
+        self.cache.delete(f"{self.KEY_PREFIX}{user_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+context_cache = ChatbotContextCache()
+
+
+async def get_context(db: AsyncSession, user: User, today: date = None) -> Dict[str, Any]:
+    """Chatbot context for `user`: cached snapshot when there is one for today, else built and cached."""
+    today = today or date.today()
+    snapshot = await context_cache.aget(user.id, today)
+    if snapshot is None:
+        snapshot = await build_snapshot(db, user.id, today)
+        await context_cache.aset(user.id, snapshot)
+    context = {"user_name": user.name}
+    context.update((key, value) for key, value in snapshot.items() if key != "as_of")
+    return context
+
+
+def _changed_bill_users(session: Session) -> Set[UUID]:
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Bill) and obj.user_id is not None:
+            user_ids.add(obj.user_id)
+    return user_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_bills(session: Session, flush_context, instances):
+    user_ids = _changed_bill_users(session)
+    if user_ids:
+        session.info.setdefault("chatbot_context_invalidate", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_contexts(session: Session):
+    for user_id in session.info.pop("chatbot_context_invalidate", ()):
+        context_cache.invalidate(user_id)
+        # Respostas contextuais em cache também (o hash do contexto só cobre as métricas principais)
+        cache_service.invalidate_user_cache(str(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_contexts(session: Session):
+    session.info.pop("chatbot_context_invalidate", None)
@@ -0,0 +1,229 @@
+import logging
+from datetime import date, datetime, time, timezone
+from typing import Dict, List
+from uuid import UUID
+
+from dateutil.relativedelta import relativedelta  # type: ignore
+from sqlalchemy import text
+
+from app.db.models import User
+from app.services.cache_service import cache_service
+from app.services.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+# Limites: Free = 25 mensagens/mês, Premium = praticamente ilimitado
+FREE_LIMIT = 25
+PREMIUM_LIMIT = 1000
+
+# Dias que a chave do mês sobrevive depois da virada (tempo para o último flush)
+EXPIRY_GRACE_DAYS = 7
+FLUSH_BATCH_SIZE = 500
+
+# Incremento atômico no banco, usado só com o Redis fora do ar.
+# Não atualiza (nenhuma linha volta) quando o limite já foi atingido.
+_DB_CONSUME_SQL = text("""
+    WITH counted AS (
+        SELECT id, CASE
+            WHEN notif_prefs->>'chatbot_month_reset_date' = CAST(:month AS text)
+            THEN COALESCE(CAST(notif_prefs->>'chatbot_messages_this_month' AS integer), 0) + 1
+            ELSE 1
+        END AS used
+        FROM users WHERE id = :user_id
+        FOR UPDATE  -- mensagens simultâneas esperam e leem o valor já incrementado
+    )
+    UPDATE users SET notif_prefs = COALESCE(users.notif_prefs, '{}'::jsonb) || jsonb_build_object(
+        'chatbot_messages_this_month', counted.used,
+        'chatbot_month_reset_date', CAST(:month AS text)
+    )
+    FROM counted
+    WHERE users.id = counted.id AND counted.used <= CAST(:limit AS integer)
+    RETURNING counted.used
+""")
+
+# Flush do Redis para users.notif_prefs; nunca diminui o contador nem volta para um mês anterior
+_FLUSH_SQL = text("""
+    UPDATE users SET notif_prefs = COALESCE(notif_prefs, '{}'::jsonb) || jsonb_build_object(
+        'chatbot_messages_this_month', CASE
+            WHEN notif_prefs->>'chatbot_month_reset_date' = CAST(:month AS text)
+            THEN GREATEST(COALESCE(CAST(notif_prefs->>'chatbot_messages_this_month' AS integer), 0), CAST(:used AS integer))
+            ELSE CAST(:used AS integer)
+        END,
+        'chatbot_month_reset_date', CAST(:month AS text)
+    )
+    WHERE id = :user_id
+      AND COALESCE(notif_prefs->>'chatbot_month_reset_date', '') <= CAST(:month AS text)
+""")
+
+
+class ChatbotQuotaExceededError(Exception):
+    """Raised when the user already sent every chatbot message of the month."""
+
+    def __init__(self, limit: int, is_premium: bool, reset_in_days: int):
+        super().__init__(f"Chatbot quota of {limit} messages reached")
+        self.limit = limit
+        self.is_premium = is_premium
+        self.reset_in_days = reset_in_days
+
+
+class ChatbotQuota:
+    """
+    Monthly chatbot message counter.
+
+    Each message is one pipelined INCR on chatbot:quota:<YYYY-MM>:<user_id>
+    (atomic, so concurrent messages can't both slip under the limit), sent on
+    the redis.asyncio client so the chat path never blocks the event loop; the
+    key expires a few days after the month ends. Users touched in the month go
+    into a dirty set that flush() copies to users.notif_prefs periodically, so
+    the chat path makes no DB write just for accounting. With Redis down the
+    counter is incremented in the database with a single UPDATE.
+    """
+
+    KEY_PREFIX = "chatbot:quota:"
+    DIRTY_PREFIX = "chatbot:quota:dirty:"
+
+    def __init__(self, redis_client=None, async_redis_client=None):
+        self._redis_client = redis_client
+        self._async_redis_client = async_redis_client
+
+    @property
+    def _redis(self):
+        """Sync client for flush() (Celery)."""
+        if self._redis_client is not None:
+            return self._redis_client
+        return cache_service.redis_client if cache_service.enabled else None
+
+    def _async_redis(self):
+        """Async client for consume(); None while Redis is in backoff (never pings)."""
+        if self._async_redis_client is not None:
+            return self._async_redis_client
+        return cache_service._get_async_client()
+
+    @staticmethod
+    def current_month(today: date = None) -> date:
+        return (today or date.today()).replace(day=1)
+
+    def _key(self, user_id, month: date) -> str:
+        return f"{self.KEY_PREFIX}{month:%Y-%m}:{user_id}"
+
+    def _dirty_key(self, month: date) -> str:
+        return f"{self.DIRTY_PREFIX}{month:%Y-%m}"
+
+    @staticmethod
+    def _expire_at(month: date) -> datetime:
+        return datetime.combine(month + relativedelta(months=1, days=EXPIRY_GRACE_DAYS), time.min, tzinfo=timezone.utc)
+
+    @staticmethod
+    def limit_for(user: User) -> int:
+        return PREMIUM_LIMIT if (user.notif_prefs or {}).get("is_premium", False) else FREE_LIMIT
+
+    @staticmethod
+    def stored_count(user: User, month: date) -> int:
+        """Counter last flushed to notif_prefs, if it belongs to `month`."""
+        prefs = user.notif_prefs or {}
+        if prefs.get("chatbot_month_reset_date") != month.isoformat():
+            return 0
+        return int(prefs.get("chatbot_messages_this_month") or 0)
+
+    def _exceeded(self, limit: int, month: date, today: date) -> ChatbotQuotaExceededError:
+        return ChatbotQuotaExceededError(
+            limit=limit,
+            is_premium=limit == PREMIUM_LIMIT,
+            reset_in_days=(month + relativedelta(months=1) - today).days,
+        )
+
+    async def _consume_redis(self, redis_client, user: User, limit: int, month: date, today: date) -> int:
+        key, dirty_key = self._key(user.id, month), self._dirty_key(month)
+        expire_at = self._expire_at(month)
+
+        async with redis_client.pipeline() as pipe:
+            pipe.incr(key)
+            pipe.expireat(key, expire_at)
+            pipe.sadd(dirty_key, str(user.id))
+            pipe.expireat(dirty_key, expire_at)
+            used = (await pipe.execute())[0]
+
+        if used == 1:
+            # Chave nova (primeira mensagem do mês ou Redis reiniciado): parte do que já foi gravado no banco
+            stored = self.stored_count(user, month)
+            if stored:
+                used = await redis_client.incrby(key, stored)
+
+        if used > limit:
+            await redis_client.decr(key)  # Mensagem recusada não conta
+            raise self._exceeded(limit, month, today)
+        return used
+
+    async def _consume_db(self, db, user: User, limit: int, month: date, today: date) -> int:
+        result = await db.execute(_DB_CONSUME_SQL, {"user_id": user.id, "month": month.isoformat(), "limit": limit})
+        used = result.scalar()
+        await db.commit()
+        if used is None:
+            raise self._exceeded(limit, month, today)
+
+        # UPDATE direto não passa pelos listeners do ORM
+        await user_cache.ainvalidate(user.id)
+        return used
+
+    async def consume(self, user: User, db, today: date = None) -> int:
+        """
+        Count one chatbot message for `user`. Returns the messages used this
+        month, or raises ChatbotQuotaExceededError (the message is not counted).
+        """
+        today = today or date.today()
+        month = self.current_month(today)
+        limit = self.limit_for(user)
+
+        redis_client = self._async_redis()
+        if redis_client is not None:
+            try:
+                return await self._consume_redis(redis_client, user, limit, month, today)
+            except ChatbotQuotaExceededError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis indisponível para a cota do chatbot, usando o banco: {e}")
+                if self._async_redis_client is None:
+                    # Backoff compartilhado: as próximas mensagens vão direto para o banco
+                    cache_service._handle_error("counting chatbot quota in", e)
+        return await self._consume_db(db, user, limit, month, today)
+
+    def _counters(self, redis_client, user_ids: List[str], month: date) -> List[Dict]:
+        counts = redis_client.mget([self._key(user_id, month) for user_id in user_ids])
+        return [
+            {"user_id": UUID(user_id), "used": int(used), "month": month.isoformat()}
+            for user_id, used in zip(user_ids, counts)
+            if used is not None  # Chave já expirou: o último flush do mês já gravou
+        ]
+
+    def flush(self, bind, today: date = None) -> int:
+        """Copy the Redis counters of the previous and current month to users.notif_prefs."""
+        redis_client = self._redis
+        if redis_client is None:
+            return 0
+
+        month = self.current_month(today)
+        flushed = 0
+        for pending_month in (month - relativedelta(months=1), month):
+            dirty_key = self._dirty_key(pending_month)
+            while True:
+                user_ids = redis_client.spop(dirty_key, FLUSH_BATCH_SIZE)
+                if not user_ids:
+                    break
+                rows = self._counters(redis_client, user_ids, pending_month)
+                if not rows:
+                    continue
+                try:
+                    with bind.begin() as conn:
+                        conn.execute(_FLUSH_SQL, rows)
+                except Exception:
+                    # Devolve os usuários para o próximo flush
+                    redis_client.sadd(dirty_key, *user_ids)
+                    raise
+                flushed += len(rows)
+
+        if flushed:
+            logger.info(f"💬 Cota do chatbot gravada no banco para {flushed} usuário(s)")
+        return flushed
+
+
+chatbot_quota = ChatbotQuota()
@@ -0,0 +1,113 @@
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+
+# Placeholders no formato {{nome}} (mesmo formato já usado nos templates HTML)
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class CompiledTemplate:
+    """
+    Template parsed once into static chunks and placeholder names.
+
+    Rendering is a single join over precomputed pieces, so the large static
+    layout is never re-scanned or re-formatted per recipient.
+    """
+
+    __slots__ = ("name", "fields", "_static")
+
+    def __init__(self, name: str, source: str):
+        pieces = _PLACEHOLDER_RE.split(source)
+        self.name = name
+        self._static: List[str] = pieces[0::2]
+        self.fields: List[str] = pieces[1::2]
+
+    def render(self, context: Dict[str, Any]) -> str:
+        parts = [self._static[0]]
+        for field, static in zip(self.fields, self._static[1:]):
+            value = context.get(field)
+            parts.append("" if value is None else str(value))
+            parts.append(static)
+        return "".join(parts)
+
+
+class EmailTemplateEngine:
+    """Loads and compiles the HTML email templates once per process and caches them."""
+
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR):
+        self.templates_dir = templates_dir
+        self._cache: Dict[str, CompiledTemplate] = {}
+
+    def _path(self, name: str) -> Path:
+        return self.templates_dir / f"{name}.html"
+
+    def exists(self, name: str) -> bool:
+        return name in self._cache or self._path(name).exists()
+
+    def get(self, name: str) -> CompiledTemplate:
+        """Return the compiled template, reading it from disk only on first use."""
+        template = self._cache.get(name)
+        if template is None:
+            source = self._path(name).read_text(encoding="utf-8")
+            template = CompiledTemplate(name, source)
+            self._cache[name] = template
+        return template
+
+    def precompile(self) -> int:
+        """Compile every template under templates_dir (layouts and partials/)."""
+        count = 0
+        for path in sorted(self.templates_dir.rglob("*.html")):
+            name = path.relative_to(self.templates_dir).with_suffix("").as_posix()
+            try:
+                self.get(name)
+                count += 1
+            except OSError as e:
+                logger.warning(f"⚠️ Could not compile email template {name}: {e}")
+        logger.info(f"✅ {count} email templates precompiled")
+        return count
+
+    def render(self, template_name: str, /, **context: Any) -> str:
+        return self.get(template_name).render(context)
+
+    def clear(self):
+        self._cache.clear()
+
+    def benchmark(self, name: str, context: Dict[str, Any], iterations: int = 1000,
+                  legacy_render: Optional[Any] = None) -> Dict[str, float]:
+        """
+        Time compile and per-render cost of a template (microseconds).
+        If legacy_render (a callable taking context) is given, it is timed too for comparison.
+        """
+        source = self._path(name).read_text(encoding="utf-8")
+
+        start = time.perf_counter()
+        template = CompiledTemplate(name, source)
+        compile_us = (time.perf_counter() - start) * 1_000_000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            template.render(context)
+        render_us = (time.perf_counter() - start) * 1_000_000 / iterations
+
+        result = {
+            "iterations": iterations,
+            "compile_us": round(compile_us, 2),
+            "render_us": round(render_us, 2),
+        }
+
+        if legacy_render is not None:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                legacy_render(context)
+            result["legacy_render_us"] = round((time.perf_counter() - start) * 1_000_000 / iterations, 2)
+
+        return result
+
+
+email_templates = EmailTemplateEngine()
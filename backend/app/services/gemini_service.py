@@ -1,3 +1,4 @@
+import importlib.util
 import json
 import logging
 from typing import Dict, Optional, Any, List
@@ -5,13 +6,17 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Import condicional do Gemini
-try:
-    import google.generativeai as genai  # type: ignore
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    genai = None
+
+def _gemini_installed() -> bool:
+    try:
+        return importlib.util.find_spec("google.generativeai") is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Import condicional do Gemini: google.generativeai é pesado, então só é
+# importado quando o serviço é criado (USE_GEMINI ligado e chave configurada)
+GEMINI_AVAILABLE = _gemini_installed()
 
 
 class GeminiService:
@@ -21,6 +26,8 @@ class GeminiService:
         if not settings.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY não configurada. Configure no .env")
         
+        import google.generativeai as genai  # type: ignore
+        
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
         self.timeout = 10.0  # Gemini é muito rápido, 10s é suficiente
@@ -0,0 +1,241 @@
+"""
+Per-user monthly rollup of bills (user_monthly_summary).
+
+Every flush that creates, changes or deletes a Bill applies the matching
++/- deltas to the rollup in the same transaction, so the chatbot context,
+budget alerts and reports read a few summary rows instead of the whole bill
+history. Bills without due_date (upload still waiting for OCR) are left out
+until they get one. rebuild() recomputes the rollup from bills.
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, event, func, inspect, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Bill, BillStatus, BillType, UserMonthlySummary
+
+logger = logging.getLogger(__name__)
+
+PAID_OR_CONFIRMED = (BillStatus.PAID, BillStatus.CONFIRMED)
+
+# Atributos da Bill que mudam a linha/valor do rollup
+TRACKED_ATTRIBUTES = ("user_id", "due_date", "type", "category", "status", "amount")
+
+SummaryKey = Tuple[UUID, date, BillType, str, BillStatus]
+
+
+def _summary_key(user_id, due_date, bill_type, category, bill_status) -> Optional[SummaryKey]:
+    """Rollup row for a bill; NULL type/status count as the column defaults (EXPENSE/PENDING)."""
+    if user_id is None or due_date is None:
+        return None
+    return (
+        user_id,
+        due_date.replace(day=1),
+        bill_type or BillType.EXPENSE,
+        category or "",
+        bill_status or BillStatus.PENDING,
+    )
+
+
+def _current(bill: Bill) -> Tuple[Optional[SummaryKey], float]:
+    return (
+        _summary_key(bill.user_id, bill.due_date, bill.type, bill.category, bill.status),
+        float(bill.amount or 0),
+    )
+
+
+def _previous(bill: Bill) -> Tuple[Optional[SummaryKey], float]:
+    """Key and amount of a dirty bill as they are in the database."""
+    state = inspect(bill)
+    values = {}
+    for name in TRACKED_ATTRIBUTES:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(bill, name)
+    return (
+        _summary_key(values["user_id"], values["due_date"], values["type"], values["category"], values["status"]),
+        float(values["amount"] or 0),
+    )
+
+
+def _collect_deltas(session: Session) -> Dict[SummaryKey, List[float]]:
+    deltas: Dict[SummaryKey, List[float]] = defaultdict(lambda: [0.0, 0])
+
+    def add(key: Optional[SummaryKey], amount: float, sign: int):
+        if key is not None:
+            deltas[key][0] += sign * amount
+            deltas[key][1] += sign
+
+    for obj in session.new:
+        if isinstance(obj, Bill):
+            add(*_current(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Bill) and inspect(obj).has_identity:
+            add(*_current(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Bill) and session.is_modified(obj, include_collections=False):
+            old_key, old_amount = _previous(obj)
+            new_key, new_amount = _current(obj)
+            if (old_key, old_amount) != (new_key, new_amount):
+                add(old_key, old_amount, -1)
+                add(new_key, new_amount, 1)
+
+    return {key: delta for key, delta in deltas.items() if delta[1] != 0 or round(delta[0], 2) != 0}
+
+
+def apply_deltas(connection, deltas: Dict[SummaryKey, List[float]]):
+    """Add the deltas to the rollup (UPSERT) and drop rows left with no bills."""
+    if not deltas:
+        return
+
+    table = UserMonthlySummary.__table__
+    rows = [
+        {
+            "user_id": user_id, "month": month, "type": bill_type, "category": category,
+            "status": bill_status, "total": round(total, 2), "count": count,
+        }
+        for (user_id, month, bill_type, category, bill_status), (total, count) in deltas.items()
+    ]
+    stmt = insert(table).values(rows)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.month, table.c.type, table.c.category, table.c.status],
+        set_={
+            "total": table.c.total + stmt.excluded.total,
+            "count": table.c.count + stmt.excluded.count,
+        }
+    ))
+    connection.execute(delete(table).where(
+        table.c.user_id.in_({row["user_id"] for row in rows}),
+        table.c.count <= 0
+    ))
+
+
+@event.listens_for(Session, "before_flush")
+def _update_monthly_summary(session: Session, flush_context, instances):
+    """Keep user_monthly_summary in step with bill writes, in the same transaction."""
+    deltas = _collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history: carrega o valor antigo ao atribuir, mesmo com o atributo expirado após commit
+for _name in TRACKED_ATTRIBUTES:
+    event.listen(getattr(Bill, _name), "set", _keep_previous_value, active_history=True)
+
+
+def rebuild(db: Session, user_id: Optional[UUID] = None) -> int:
+    """Recompute the rollup from bills (all users or one). Returns the number of rows written."""
+    table = UserMonthlySummary.__table__
+    month = func.date_trunc("month", Bill.due_date).cast(table.c.month.type)
+    bill_type = func.coalesce(Bill.type, literal(BillType.EXPENSE.name).cast(table.c.type.type))
+    bill_status = func.coalesce(Bill.status, literal(BillStatus.PENDING.name).cast(table.c.status.type))
+    category = func.coalesce(Bill.category, "")
+
+    source = (
+        select(
+            Bill.user_id, month, bill_type, category, bill_status,
+            func.round(func.coalesce(func.sum(Bill.amount), 0).cast(table.c.total.type), 2),
+            func.count(),
+        )
+        .where(Bill.due_date.isnot(None))
+        .group_by(Bill.user_id, month, bill_type, category, bill_status)
+    )
+    clear = delete(table)
+    if user_id is not None:
+        source = source.where(Bill.user_id == user_id)
+        clear = clear.where(table.c.user_id == user_id)
+
+    db.execute(clear)
+    result = db.execute(insert(table).from_select(
+        ["user_id", "month", "type", "category", "status", "total", "count"], source
+    ))
+    db.commit()
+    logger.info(f"📊 user_monthly_summary reconstruído ({result.rowcount} linhas{f', usuário {user_id}' if user_id else ''})")
+    return result.rowcount
+
+
+def summary_query(user_id: UUID, month_from: Optional[date] = None, month_to: Optional[date] = None):
+    """select() of (type, category, status, total, count) for a user and month range (inclusive)."""
+    query = select(
+        UserMonthlySummary.type,
+        UserMonthlySummary.category,
+        UserMonthlySummary.status,
+        func.sum(UserMonthlySummary.total).label("total"),
+        func.sum(UserMonthlySummary.count).label("count"),
+    ).where(UserMonthlySummary.user_id == user_id)
+    if month_from is not None:
+        query = query.where(UserMonthlySummary.month >= month_from.replace(day=1))
+    if month_to is not None:
+        query = query.where(UserMonthlySummary.month <= month_to.replace(day=1))
+    return query.group_by(UserMonthlySummary.type, UserMonthlySummary.category, UserMonthlySummary.status)
+
+
+def range_query(user_id: UUID, start: date, end: date):
+    """Same row shape as summary_query, aggregated live from bills for a day range (weekly/daily reports)."""
+    bill_type = func.coalesce(Bill.type, literal(BillType.EXPENSE.name).cast(Bill.type.type))
+    bill_status = func.coalesce(Bill.status, literal(BillStatus.PENDING.name).cast(Bill.status.type))
+    category = func.coalesce(Bill.category, "")
+    return select(
+        bill_type.label("type"),
+        category.label("category"),
+        bill_status.label("status"),
+        func.coalesce(func.sum(Bill.amount), 0).label("total"),
+        func.count().label("count"),
+    ).where(
+        Bill.user_id == user_id,
+        Bill.due_date >= start,
+        Bill.due_date <= end
+    ).group_by(bill_type, category, bill_status)
+
+
+def summarize(rows: Iterable[Any]) -> Dict[str, Any]:
+    """Fold (type, category, status, total, count) rows into the totals the consumers use."""
+    summary = {
+        "income": 0.0,  # receitas pagas/confirmadas
+        "expenses": 0.0,  # despesas pagas/confirmadas
+        "count": 0,
+        "status_counts": defaultdict(int),
+        "status_totals": defaultdict(float),
+        "categories": {},  # todas as categorias/tipos ("outras" = sem categoria)
+        "expense_categories": defaultdict(float),  # despesas com categoria
+    }
+    for row in rows:
+        total = float(row.total or 0)
+        count = int(row.count or 0)
+        summary["count"] += count
+        summary["status_counts"][row.status] += count
+        summary["status_totals"][row.status] += total
+
+        if row.status in PAID_OR_CONFIRMED:
+            if row.type == BillType.INCOME:
+                summary["income"] += total
+            elif row.type == BillType.EXPENSE:
+                summary["expenses"] += total
+
+        category = summary["categories"].setdefault(row.category or "outras", {"total": 0.0, "count": 0})
+        category["total"] += total
+        category["count"] += count
+
+        if row.type == BillType.EXPENSE and row.category:
+            summary["expense_categories"][row.category] += total
+    return summary
+
+
+def top_expense_categories(summary: Dict[str, Any], limit: int = 5) -> List[Dict[str, Any]]:
+    return [
+        {"name": name, "total": total}
+        for name, total in sorted(summary["expense_categories"].items(), key=lambda x: x[1], reverse=True)[:limit]
+    ]
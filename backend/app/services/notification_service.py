@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import Notification, NotificationChannel, NotificationType, User
 from app.core.config import settings
 import smtplib
@@ -9,11 +10,16 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta, date
 import uuid
 import os
-from pathlib import Path
+import asyncio
 import httpx
+from app.services.smtp_pool import SMTPConnectionPool
+from app.services.email_templates import email_templates
 
 logger = logging.getLogger(__name__)
 
+# Brevo aceita até 1000 messageVersions por requisição; usamos lotes menores
+BREVO_BATCH_SIZE = 500
+
 
 class NotificationService:
     """Service for sending notifications via email, SMS, and push."""
@@ -28,6 +34,59 @@ class NotificationService:
         # Brevo API (prioridade sobre SMTP)
         self.brevo_api_key = settings.BREVO_API_KEY
         self.brevo_from = settings.BREVO_FROM or settings.SMTP_FROM
+        
+        # Cliente HTTP compartilhado (pool de conexões keep-alive), criado por event loop
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Pool de conexões SMTP persistentes (criado no primeiro envio)
+        self._smtp_pool: Optional[SMTPConnectionPool] = None
+        
+        # Templates HTML compilados uma vez por processo
+        email_templates.precompile()
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared AsyncClient for the running event loop.
+        Consecutive sends reuse pooled keep-alive connections instead of paying a
+        new TCP/TLS handshake per email. A client is bound to the loop it was
+        created on, so a new one is built if the loop changed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._http_client.is_closed or self._http_client_loop is not loop:
+            concurrency = max(settings.EMAIL_SEND_CONCURRENCY, 1)
+            self._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+            )
+            self._http_client_loop = loop
+        return self._http_client
+    
+    def _get_smtp_pool(self) -> SMTPConnectionPool:
+        """Return the persistent SMTP connection pool, creating it on first use."""
+        if self._smtp_pool is None:
+            self._smtp_pool = SMTPConnectionPool(
+                host=self.smtp_host,
+                port=self.smtp_port,
+                user=self.smtp_user,
+                password=self.smtp_password,
+                size=settings.SMTP_POOL_SIZE
+            )
+        return self._smtp_pool
+    
+    def _smtp_configured(self) -> bool:
+        return bool(self.smtp_host and self.smtp_user and self.smtp_password)
+    
+    async def aclose(self):
+        """Close the shared HTTP client and SMTP connections (worker/app shutdown)."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._http_client_loop = None
+        
+        if self._smtp_pool is not None:
+            pool, self._smtp_pool = self._smtp_pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.close)
     
     async def send_email(self, to: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
         """Send email notification. Uses Brevo API if configured, otherwise falls back to SMTP."""
@@ -36,7 +95,7 @@ class NotificationService:
         if self.brevo_api_key:
             result = await self._send_via_brevo(to, subject, body, html_body)
             # Se Brevo falhar, tenta SMTP como fallback
-            if not result and self.smtp_host and self.smtp_user and self.smtp_password:
+            if not result and self._smtp_configured():
                 logger.info(f"⚠️ Brevo falhou, tentando SMTP como fallback para {to}")
                 return await self._send_via_smtp(to, subject, body, html_body)
             return result
@@ -55,6 +114,115 @@ class NotificationService:
         
         return await self._send_via_smtp(to, subject, body, html_body)
     
+    async def send_emails_bulk(self, messages: List[Dict[str, Any]]) -> List[Optional[bool]]:
+        """
+        Send many emails at once. Each message is a dict with the send_email
+        arguments (to, subject, body, optional html_body); other keys, like the
+        payload of the build_*_report messages, are ignored.
+        Uses Brevo's batch endpoint when configured; only the batches Brevo
+        definitely refused go through the pooled SMTP transport (at most
+        EMAIL_SEND_CONCURRENCY at a time). Returns one flag per message: True
+        sent, False not sent, None unknown (Brevo timed out after the request
+        went out, so it may have been delivered and must not be sent again).
+        """
+        from app.tasks.event_loop import gather_bounded
+        
+        results: List[Optional[bool]] = [False] * len(messages)
+        if not messages:
+            return results
+        
+        if self.brevo_api_key:
+            for start in range(0, len(messages), BREVO_BATCH_SIZE):
+                batch = messages[start:start + BREVO_BATCH_SIZE]
+                accepted = await self._send_batch_via_brevo(batch)
+                if accepted is not False:
+                    results[start:start + len(batch)] = [accepted] * len(batch)
+        
+        pending = [i for i, sent in enumerate(results) if sent is False]
+        if pending and self._smtp_configured():
+            if self.brevo_api_key:
+                logger.info(f"⚠️ Brevo recusou {len(pending)} emails, tentando SMTP como fallback")
+            sent_flags = await gather_bounded(
+                self._send_via_smtp(
+                    messages[i]["to"],
+                    messages[i]["subject"],
+                    messages[i]["body"],
+                    messages[i].get("html_body")
+                )
+                for i in pending
+            )
+            for i, sent in zip(pending, sent_flags):
+                results[i] = sent is True
+        elif pending and not self.brevo_api_key:
+            logger.warning(f"❌ Email not configured (nem Brevo nem SMTP), skipping {len(pending)} emails")
+        
+        unknown = sum(1 for sent in results if sent is None)
+        logger.info(f"📧 Bulk send: {sum(1 for sent in results if sent)}/{len(messages)} emails sent, {unknown} unconfirmed")
+        return results
+    
+    async def _send_batch_via_brevo(self, messages: List[Dict[str, Any]]) -> Optional[bool]:
+        """
+        Send a batch of emails in a single Brevo request using messageVersions.
+        True when accepted, False when it definitely was not (error response,
+        no connection), None when the request may have reached Brevo (timeout
+        or dropped connection while waiting for the answer).
+        """
+        try:
+            logger.info(f"📧 Sending {len(messages)} emails via Brevo batch API")
+            
+            url = "https://api.brevo.com/v3/smtp/email"
+            headers = {
+                "api-key": self.brevo_api_key,
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            }
+            
+            versions = []
+            for message in messages:
+                version = {
+                    "to": [{"email": message["to"]}],
+                    "subject": message["subject"],
+                    "textContent": message["body"]
+                }
+                if message.get("html_body"):
+                    version["htmlContent"] = message["html_body"]
+                versions.append(version)
+            
+            # Conteúdo base é obrigatório; cada versão sobrescreve com o seu
+            payload = {
+                "sender": {
+                    "name": "EconomizeIA",
+                    "email": self.brevo_from
+                },
+                "subject": messages[0]["subject"],
+                "textContent": messages[0]["body"],
+                "messageVersions": versions
+            }
+            
+            client = self._get_http_client()
+            response = await client.post(url, json=payload, headers=headers)
+            
+            if response.status_code == 201:
+                logger.info(f"✅ Brevo batch accepted {len(messages)} emails")
+                return True
+            
+            logger.error(f"❌ Brevo batch API error ({response.status_code}): {response.text}")
+            return False
+            
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            # A requisição não saiu: seguro tentar pelo SMTP
+            logger.error(f"❌ Brevo batch API unreachable ({len(messages)} emails): {e!r}")
+            return False
+        except httpx.TimeoutException:
+            logger.error(f"❌ Brevo batch API timeout ({len(messages)} emails), entrega não confirmada")
+            return None
+        except httpx.RequestError as e:
+            logger.error(f"❌ Brevo batch API request error, entrega não confirmada: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Unexpected error sending batch via Brevo: {e}", exc_info=True)
+            return False
+    
     async def _send_via_brevo(self, to: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
         """Send email via Brevo (Sendinblue) API."""
         try:
@@ -85,19 +253,19 @@ class NotificationService:
             if html_body:
                 payload["htmlContent"] = html_body
             
-            # Enviar requisição
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                
-                if response.status_code == 201:
-                    response_data = response.json()
-                    message_id = response_data.get("messageId", "unknown")
-                    logger.info(f"✅ Email sent successfully via Brevo to {to} (ID: {message_id})")
-                    return True
-                else:
-                    error_msg = response.text
-                    logger.error(f"❌ Brevo API error ({response.status_code}): {error_msg}")
-                    return False
+            # Enviar requisição (reutiliza conexões do pool)
+            client = self._get_http_client()
+            response = await client.post(url, json=payload, headers=headers)
+            
+            if response.status_code == 201:
+                response_data = response.json()
+                message_id = response_data.get("messageId", "unknown")
+                logger.info(f"✅ Email sent successfully via Brevo to {to} (ID: {message_id})")
+                return True
+            else:
+                error_msg = response.text
+                logger.error(f"❌ Brevo API error ({response.status_code}): {error_msg}")
+                return False
                     
         except httpx.TimeoutException:
             logger.error(f"❌ Brevo API timeout sending email to {to}")
@@ -110,7 +278,7 @@ class NotificationService:
             return False
     
     async def _send_via_smtp(self, to: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
-        """Send email via SMTP."""
+        """Send email via SMTP using the persistent connection pool."""
         try:
             logger.info(f"📧 Preparing email to {to} via SMTP {self.smtp_host}:{self.smtp_port}")
             
@@ -123,22 +291,9 @@ class NotificationService:
             if html_body:
                 msg.attach(MIMEText(html_body, 'html', 'utf-8'))
             
-            logger.info(f"Connecting to SMTP server {self.smtp_host}:{self.smtp_port} (timeout=60s)")
-            # Aumentar timeout para 60s para dar mais tempo em conexões lentas
-            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=60) as server:
-                logger.info("✅ SMTP connection established successfully")
-                
-                # Habilitar debug se necessário (comentar em produção se muito verboso)
-                # server.set_debuglevel(1)
-                
-                logger.info("Starting TLS...")
-                server.starttls()
-                
-                logger.info(f"Logging in as {self.smtp_user}")
-                server.login(self.smtp_user, self.smtp_password)
-                
-                logger.info(f"Sending message to {to}...")
-                server.send_message(msg)
+            # Conexão persistente do pool (connect/STARTTLS/login uma vez por thread)
+            logger.info(f"Sending message to {to}...")
+            await self._get_smtp_pool().send_async(msg)
             
             logger.info(f"✅ Email sent successfully via SMTP to {to}")
             return True
@@ -366,11 +521,8 @@ class NotificationService:
     async def send_welcome_email(self, user: User) -> bool:
         """Send welcome email to newly registered user."""
         try:
-            # Load HTML template
-            template_path = Path(__file__).parent.parent / "templates" / "email_welcome.html"
-            
-            if not template_path.exists():
-                logger.warning(f"Welcome email template not found at {template_path}")
+            if not email_templates.exists("email_welcome"):
+                logger.warning(f"Welcome email template not found in {email_templates.templates_dir}")
                 # Fallback to simple text email
                 return await self.send_email(
                     to=user.email,
@@ -388,13 +540,11 @@ Equipe EconomizeIA
 """
                 )
             
-            # Read template
-            with open(template_path, 'r', encoding='utf-8') as f:
-                html_template = f.read()
-            
-            # Replace variables
-            html_body = html_template.replace('{{name}}', user.name)
-            html_body = html_body.replace('{{frontend_url}}', settings.FRONTEND_URL or 'http://localhost:3000')
+            html_body = email_templates.render(
+                "email_welcome",
+                name=user.name,
+                frontend_url=settings.FRONTEND_URL or 'http://localhost:3000'
+            )
             
             # Plain text version
             text_body = f"""
@@ -454,19 +604,16 @@ Este é um email automático, por favor não responda.
             if len(verification_link) > 2000:
                 logger.warning(f"Verification link is very long ({len(verification_link)} chars), may cause issues")
             
-            # Load HTML template
-            template_path = Path(__file__).parent.parent / "templates" / "email_verification.html"
-            
-            if template_path.exists():
-                logger.info(f"Loading email template from {template_path}")
-                with open(template_path, 'r', encoding='utf-8') as f:
-                    html_template = f.read()
-                
-                # Replace variables - escape HTML special characters in name
+            if email_templates.exists("email_verification"):
+                # Escape HTML special characters in name
                 from html import escape
                 safe_name = escape(user.name) if user.name else "Usuário"
-                html_body = html_template.replace('{{name}}', safe_name)
-                html_body = html_body.replace('{{verification_link}}', verification_link)
+                html_body = email_templates.render(
+                    "email_verification",
+                    name=safe_name,
+                    verification_link=verification_link,
+                    frontend_url=frontend_url
+                )
                 logger.info(f"Email template processed for {user.email}")
             else:
                 # Fallback HTML
@@ -586,7 +733,7 @@ Equipe EconomizeIA
             logger.error(f"❌ Exception sending verification email to {user.email}: {e}", exc_info=True)
             return False
 
-    async def send_email_already_registered(self, user: User, db: Session, resend_verification: bool = False) -> bool:
+    async def send_email_already_registered(self, user: User, db: AsyncSession, resend_verification: bool = False) -> bool:
         """Send email when user tries to register with an email that already exists."""
         try:
             frontend_url = (settings.FRONTEND_URL or 'https://economizeia.vercel.app').rstrip('/')
@@ -603,8 +750,8 @@ Equipe EconomizeIA
                 # Update user's verification token
                 user.verification_token = verification_token
                 user.verification_token_expires = datetime.now(timezone.utc) + timedelta(hours=24)
-                db.commit()
-                db.refresh(user)
+                await db.commit()
+                await db.refresh(user)
             
             user_name = user.name if user.name else "Usuário"
             
@@ -1238,6 +1385,73 @@ Equipe EconomizeIA
         
         return sent
     
+    @staticmethod
+    def _report_context(user: User, total_income: float, total_expenses: float, balance: float) -> Dict[str, Any]:
+        """Placeholders shared by the monthly, weekly and daily report layouts."""
+        return {
+            "frontend_url": settings.FRONTEND_URL or 'http://localhost:3000',
+            "name": user.name,
+            "total_income": f"{total_income:,.2f}",
+            "total_expenses": f"{total_expenses:,.2f}",
+            "balance_abs": f"{abs(balance):,.2f}",
+        }
+    
+    @staticmethod
+    def _render_category_rows(top_categories: List[Dict[str, Any]], total_expenses: float) -> str:
+        rows = []
+        for i, cat in enumerate(top_categories[:5]):
+            width_percent = min(100, (cat.get("total", 0) / total_expenses * 100) if total_expenses > 0 else 0)
+            rows.append(email_templates.render(
+                "partials/report_category_row",
+                margin_bottom="16px" if i < len(top_categories) - 1 else "0px",
+                name=cat.get("name", "Sem categoria"),
+                total=f'{cat.get("total", 0):,.2f}',
+                width_percent=f"{width_percent:.1f}"
+            ))
+        return "".join(rows)
+    
+    @staticmethod
+    def _render_goal_rows(savings_goals_progress: List[Dict[str, Any]]) -> str:
+        rows = []
+        for i, goal in enumerate(savings_goals_progress[:3]):
+            rows.append(email_templates.render(
+                "partials/report_goal_row",
+                margin_bottom="24px" if i < len(savings_goals_progress) - 1 else "0px",
+                name=goal.get("name", "Meta"),
+                progress=f'{goal.get("progress", 0):.1f}',
+                progress_width=f'{min(100, goal.get("progress", 0)):.1f}',
+                current=f'{goal.get("current", 0):,.2f}',
+                target=f'{goal.get("target", 0):,.2f}'
+            ))
+        return "".join(rows)
+    
+    @staticmethod
+    def report_notification(user: User, payload: Dict[str, Any], status: str = "sent") -> Notification:
+        """
+        Notification row that marks a report as sent (checked before sending it
+        again). Report chunks commit it as "pending" before sending, as a claim.
+        """
+        return Notification(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            type=NotificationType.RECONCILIATION,
+            channel=NotificationChannel.EMAIL,
+            sent_at=datetime.utcnow(),
+            payload=payload,
+            status=status
+        )
+    
+    async def send_report(self, db: Session, user: User, message: Optional[Dict[str, Any]]) -> bool:
+        """Send a message built by one of the build_*_report methods and log it as a notification."""
+        if message is None:
+            return False
+        
+        sent = await self.send_email(message["to"], message["subject"], message["body"], message["html_body"])
+        if sent:
+            db.add(self.report_notification(user, message["payload"]))
+            db.commit()
+        return sent
+    
     async def send_monthly_report(
         self,
         db: Session,
@@ -1247,8 +1461,22 @@ Equipe EconomizeIA
         monthly_data: Dict[str, Any]
     ) -> bool:
         """Send monthly financial report to user."""
+        message = self.build_monthly_report(user, report_month, report_year, monthly_data)
+        return await self.send_report(db, user, message)
+    
+    def build_monthly_report(
+        self,
+        user: User,
+        report_month: int,
+        report_year: int,
+        monthly_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Monthly report email for user: send_email arguments plus the payload of
+        its notification. None when the user turned email off.
+        """
         if not user.notif_prefs.get("email_enabled", True):
-            return False
+            return None
         
         # Format month name
         month_names = [
@@ -1279,256 +1507,60 @@ Equipe EconomizeIA
         balance_icon = "📈" if balance >= 0 else "📉"
         balance_text = "Superávit" if balance >= 0 else "Déficit"
         
-        # Build categories HTML
-        categories_html = ""
+        # Layout pré-compilado; por usuário só montamos os fragmentos variáveis
+        categories_section = ""
         if top_categories:
-            for i, cat in enumerate(top_categories[:5]):
-                margin_bottom = "16px" if i < len(top_categories) - 1 else "0px"
-                width_percent = min(100, (cat.get("total", 0) / total_expenses * 100) if total_expenses > 0 else 0)
-                categories_html += f'''
-                                        <div style="margin-bottom: {margin_bottom};">
-                                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-                                                <span style="color: #374151; font-size: 15px; font-weight: 600;">{cat.get("name", "Sem categoria")}</span>
-                                                <span style="color: #111827; font-size: 16px; font-weight: 700;">R$ {cat.get("total", 0):,.2f}</span>
-                                            </div>
-                                            <div style="background-color: #e5e7eb; border-radius: 4px; height: 8px; overflow: hidden;">
-                                                <div style="background: linear-gradient(90deg, #dc2626 0%, #ef4444 100%); height: 100%; width: {width_percent:.1f}%; border-radius: 4px;"></div>
-                                            </div>
-                                        </div>
-                                        '''
+            categories_section = email_templates.render(
+                "partials/report_monthly_categories_section",
+                rows=self._render_category_rows(top_categories, total_expenses)
+            )
         
-        # Build savings goals HTML
-        savings_goals_html = ""
+        goals_section = ""
         if savings_goals_progress:
-            for i, goal in enumerate(savings_goals_progress[:3]):
-                margin_bottom = "24px" if i < len(savings_goals_progress) - 1 else "0px"
-                progress = min(100, goal.get("progress", 0))
-                savings_goals_html += f'''
-                                        <div style="margin-bottom: {margin_bottom};">
-                                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-                                                <span style="color: #0c4a6e; font-size: 15px; font-weight: 600;">{goal.get("name", "Meta")}</span>
-                                                <span style="color: #0369a1; font-size: 14px; font-weight: 600;">{goal.get("progress", 0):.1f}%</span>
-                                            </div>
-                                            <div style="background-color: #e0f2fe; border-radius: 4px; height: 10px; overflow: hidden;">
-                                                <div style="background: linear-gradient(90deg, #0284c7 0%, #0ea5e9 100%); height: 100%; width: {progress:.1f}%; border-radius: 4px;"></div>
-                                            </div>
-                                            <p style="margin: 8px 0 0 0; color: #075985; font-size: 13px;">
-                                                R$ {goal.get("current", 0):,.2f} / R$ {goal.get("target", 0):,.2f}
-                                            </p>
-                                        </div>
-                                        '''
+            goals_section = email_templates.render(
+                "partials/report_monthly_goals_section",
+                rows=self._render_goal_rows(savings_goals_progress)
+            )
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html lang="pt-BR">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <meta name="color-scheme" content="light dark">
-            <meta name="supported-color-schemes" content="light dark">
-        </head>
-        <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f3f4f6; line-height: 1.6;">
-            <table role="presentation" style="width: 100%; border-collapse: collapse; background-color: #f3f4f6; padding: 20px 0;">
-                <tr>
-                    <td align="center" style="padding: 40px 20px;">
-                        <table role="presentation" style="max-width: 650px; width: 100%; border-collapse: collapse; background-color: #ffffff; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); overflow: hidden;">
-                            
-                            <!-- Header -->
-                            <tr>
-                                <td style="background: linear-gradient(135deg, #1f2937 0%, #374151 100%); padding: 50px 40px; text-align: center;">
-                                    <img src="{settings.FRONTEND_URL or 'http://localhost:3000'}/logo.png" alt="EconomizeIA" style="max-width: 120px; height: auto; margin-bottom: 16px;" />
-                                    <h1 style="margin: 0 0 8px 0; color: #ffffff; font-size: 32px; font-weight: 700; letter-spacing: -0.5px; line-height: 1.2;">
-                                        📊 Relatório Mensal
-                                    </h1>
-                                    <p style="margin: 0; color: #d1d5db; font-size: 18px; font-weight: 400; line-height: 1.5;">
-                                        {month_name} de {report_year}
-                                    </p>
-                                </td>
-                            </tr>
-                            
-                            <!-- Greeting -->
-                            <tr>
-                                <td style="padding: 40px 40px 30px 40px;">
-                                    <h2 style="margin: 0 0 12px 0; color: #111827; font-size: 24px; font-weight: 600; line-height: 1.3;">
-                                        Olá, {user.name}! 👋
-                                    </h2>
-                                    <p style="margin: 0; color: #4b5563; font-size: 16px; line-height: 1.7;">
-                                        Aqui está o resumo completo das suas finanças em {month_name}/{report_year}. 
-                                        Veja como você está se saindo e o que pode melhorar!
-                                    </p>
-                                </td>
-                            </tr>
-                            
-                            <!-- Balance Summary Card -->
-                            <tr>
-                                <td style="padding: 0 40px 30px 40px;">
-                                    <div style="background: linear-gradient(135deg, {balance_color}15 0%, {balance_color}08 100%); border-radius: 12px; padding: 30px; border: 2px solid {balance_color}40; text-align: center;">
-                                        <p style="margin: 0 0 8px 0; color: #6b7280; font-size: 14px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;">
-                                            Saldo do Mês
-                                        </p>
-                                        <p style="margin: 0; color: {balance_color}; font-size: 42px; font-weight: 700; line-height: 1.2;">
-                                            {balance_icon} R$ {abs(balance):,.2f}
-                                        </p>
-                                        <p style="margin: 8px 0 0 0; color: {balance_color}; font-size: 16px; font-weight: 600;">
-                                            {balance_text}
-                                        </p>
-                                    </div>
-                                </td>
-                            </tr>
-                            
-                            <!-- Income vs Expenses -->
-                            <tr>
-                                <td style="padding: 0 40px 30px 40px;">
-                                    <table role="presentation" style="width: 100%; border-collapse: collapse;">
-                                        <tr>
-                                            <td style="width: 50%; padding-right: 12px; vertical-align: top;">
-                                                <div style="background-color: #ecfdf5; border-radius: 10px; padding: 24px; border-left: 4px solid #059669;">
-                                                    <p style="margin: 0 0 8px 0; color: #065f46; font-size: 13px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;">
-                                                        💰 Receitas
-                                                    </p>
-                                                    <p style="margin: 0 0 4px 0; color: #059669; font-size: 28px; font-weight: 700; line-height: 1.2;">
-                                                        R$ {total_income:,.2f}
-                                                    </p>
-                                                    {f'<p style="margin: 4px 0 0 0; color: {"#059669" if income_change >= 0 else "#dc2626"}; font-size: 13px; font-weight: 600;">{"+" if income_change >= 0 else ""}{income_change:.1f}% vs mês anterior</p>' if income_change != 0 else '<p style="margin: 4px 0 0 0; color: #6b7280; font-size: 13px;">Sem variação</p>'}
-                                                </div>
-                                            </td>
-                                            <td style="width: 50%; padding-left: 12px; vertical-align: top;">
-                                                <div style="background-color: #fef2f2; border-radius: 10px; padding: 24px; border-left: 4px solid #dc2626;">
-                                                    <p style="margin: 0 0 8px 0; color: #991b1b; font-size: 13px; font-weight: 600; text-transform: uppercase; letter-spacing: 0.5px;">
-                                                        💸 Despesas
-                                                    </p>
-                                                    <p style="margin: 0 0 4px 0; color: #dc2626; font-size: 28px; font-weight: 700; line-height: 1.2;">
-                                                        R$ {total_expenses:,.2f}
-                                                    </p>
-                                                    {f'<p style="margin: 4px 0 0 0; color: {"#059669" if expenses_change <= 0 else "#dc2626"}; font-size: 13px; font-weight: 600;">{"+" if expenses_change >= 0 else ""}{expenses_change:.1f}% vs mês anterior</p>' if expenses_change != 0 else '<p style="margin: 4px 0 0 0; color: #6b7280; font-size: 13px;">Sem variação</p>'}
-                                                </div>
-                                            </td>
-                                        </tr>
-                                    </table>
-                                </td>
-                            </tr>
-                            
-                            <!-- Bills Status -->
-                            <tr>
-                                <td style="padding: 0 40px 30px 40px;">
-                                    <h3 style="margin: 0 0 20px 0; color: #111827; font-size: 20px; font-weight: 600; line-height: 1.3;">
-                                        📋 Status dos Boletos
-                                    </h3>
-                                    <table role="presentation" style="width: 100%; border-collapse: collapse;">
-                                        <tr>
-                                            <td style="width: 33.33%; padding-right: 8px; vertical-align: top;">
-                                                <div style="background-color: #ecfdf5; border-radius: 8px; padding: 20px; text-align: center; border: 1px solid #a7f3d0;">
-                                                    <p style="margin: 0 0 6px 0; color: #065f46; font-size: 12px; font-weight: 600; text-transform: uppercase;">
-                                                        ✅ Pagos
-                                                    </p>
-                                                    <p style="margin: 0; color: #059669; font-size: 24px; font-weight: 700;">
-                                                        {bills_paid}
-                                                    </p>
-                                                </div>
-                                            </td>
-                                            <td style="width: 33.33%; padding: 0 8px; vertical-align: top;">
-                                                <div style="background-color: #fef3c7; border-radius: 8px; padding: 20px; text-align: center; border: 1px solid #fde68a;">
-                                                    <p style="margin: 0 0 6px 0; color: #92400e; font-size: 12px; font-weight: 600; text-transform: uppercase;">
-                                                        ⏳ Pendentes
-                                                    </p>
-                                                    <p style="margin: 0; color: #f59e0b; font-size: 24px; font-weight: 700;">
-                                                        {bills_pending}
-                                                    </p>
-                                                </div>
-                                            </td>
-                                            <td style="width: 33.33%; padding-left: 8px; vertical-align: top;">
-                                                <div style="background-color: #fef2f2; border-radius: 8px; padding: 20px; text-align: center; border: 1px solid #fecaca;">
-                                                    <p style="margin: 0 0 6px 0; color: #991b1b; font-size: 12px; font-weight: 600; text-transform: uppercase;">
-                                                        ⚠️ Vencidos
-                                                    </p>
-                                                    <p style="margin: 0; color: #dc2626; font-size: 24px; font-weight: 700;">
-                                                        {bills_overdue}
-                                                    </p>
-                                                </div>
-                                            </td>
-                                        </tr>
-                                    </table>
-                                </td>
-                            </tr>
-                            
-                            <!-- Top Categories -->
-                            {f'''
-                            <tr>
-                                <td style="padding: 0 40px 30px 40px;">
-                                    <h3 style="margin: 0 0 20px 0; color: #111827; font-size: 20px; font-weight: 600; line-height: 1.3;">
-                                        🏆 Top Categorias de Gastos
-                                    </h3>
-                                    <div style="background-color: #f9fafb; border-radius: 10px; padding: 24px;">
-                                        {categories_html}
-                                    </div>
-                                </td>
-                            </tr>
-                            ''' if top_categories else ''}
-                            
-                            <!-- Savings Goals Progress -->
-                            {f'''
-                            <tr>
-                                <td style="padding: 0 40px 30px 40px;">
-                                    <h3 style="margin: 0 0 20px 0; color: #111827; font-size: 20px; font-weight: 600; line-height: 1.3;">
-                                        🎯 Metas de Economia
-                                    </h3>
-                                    <div style="background-color: #f0f9ff; border-radius: 10px; padding: 24px; border: 1px solid #bae6fd;">
-                                        {savings_goals_html}
-                                    </div>
-                                </td>
-                            </tr>
-                            ''' if savings_goals_progress else ''}
-                            
-                            <!-- Insights -->
-                            <tr>
-                                <td style="padding: 0 40px 30px 40px;">
-                                    <div style="background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%); border-radius: 10px; padding: 24px; border-left: 4px solid #f59e0b;">
-                                        <p style="margin: 0 0 12px 0; color: #92400e; font-size: 16px; font-weight: 600; line-height: 1.6;">
-                                            💡 Insights do Mês
-                                        </p>
-                                        <ul style="margin: 0; padding-left: 20px; color: #78350f; font-size: 14px; line-height: 1.8;">
-                                            {f'<li>Você economizou <strong>R$ {abs(balance):,.2f}</strong> este mês! Continue assim! 🎉</li>' if balance > 0 else f'<li>Você gastou <strong>R$ {abs(balance):,.2f}</strong> a mais do que recebeu. Revise seus gastos para melhorar no próximo mês.</li>'}
-                                            {f'<li>Você pagou <strong>{bills_paid}</strong> boletos com sucesso! ✅</li>' if bills_paid > 0 else ''}
-                                            {f'<li>Atenção: Você tem <strong>{bills_overdue}</strong> boletos vencidos. Priorize o pagamento! ⚠️</li>' if bills_overdue > 0 else ''}
-                                            {f'<li>Sua maior categoria de gastos foi <strong>{top_categories[0].get("name", "N/A")}</strong> com R$ {top_categories[0].get("total", 0):,.2f}.</li>' if top_categories else ''}
-                                        </ul>
-                                    </div>
-                                </td>
-                            </tr>
-                            
-                            <!-- CTA Button -->
-                            <tr>
-                                <td style="padding: 0 40px 40px 40px;">
-                                    <table role="presentation" style="width: 100%; border-collapse: collapse;">
-                                        <tr>
-                                            <td align="center" style="padding: 0;">
-                                                <a href="{settings.FRONTEND_URL or 'http://localhost:3000'}/app/dashboard" target="_blank" style="display: inline-block; padding: 16px 32px; background: linear-gradient(135deg, #1f2937 0%, #374151 100%); color: #ffffff; font-size: 16px; font-weight: 600; text-decoration: none; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
-                                                    Ver Dashboard Completo
-                                                </a>
-                                            </td>
-                                        </tr>
-                                    </table>
-                                </td>
-                            </tr>
-                            
-                            <!-- Footer -->
-                            <tr>
-                                <td style="padding: 30px 40px; text-align: center; background-color: #f9fafb; border-top: 1px solid #e5e7eb;">
-                                    <p style="margin: 0 0 8px 0; color: #6b7280; font-size: 13px; line-height: 1.6;">
-                                        © 2025 EconomizeIA. Todos os direitos reservados.
-                                    </p>
-                                    <p style="margin: 0; color: #9ca3af; font-size: 12px; line-height: 1.6;">
-                                        Este é um relatório automático gerado mensalmente. Você pode desativar nas configurações.
-                                    </p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
+        if income_change != 0:
+            income_change_html = f'<p style="margin: 4px 0 0 0; color: {"#059669" if income_change >= 0 else "#dc2626"}; font-size: 13px; font-weight: 600;">{"+" if income_change >= 0 else ""}{income_change:.1f}% vs mês anterior</p>'
+        else:
+            income_change_html = '<p style="margin: 4px 0 0 0; color: #6b7280; font-size: 13px;">Sem variação</p>'
+        
+        if expenses_change != 0:
+            expenses_change_html = f'<p style="margin: 4px 0 0 0; color: {"#059669" if expenses_change <= 0 else "#dc2626"}; font-size: 13px; font-weight: 600;">{"+" if expenses_change >= 0 else ""}{expenses_change:.1f}% vs mês anterior</p>'
+        else:
+            expenses_change_html = '<p style="margin: 4px 0 0 0; color: #6b7280; font-size: 13px;">Sem variação</p>'
+        
+        insights = []
+        if balance > 0:
+            insights.append(f'<li>Você economizou <strong>R$ {abs(balance):,.2f}</strong> este mês! Continue assim! 🎉</li>')
+        else:
+            insights.append(f'<li>Você gastou <strong>R$ {abs(balance):,.2f}</strong> a mais do que recebeu. Revise seus gastos para melhorar no próximo mês.</li>')
+        if bills_paid > 0:
+            insights.append(f'<li>Você pagou <strong>{bills_paid}</strong> boletos com sucesso! ✅</li>')
+        if bills_overdue > 0:
+            insights.append(f'<li>Atenção: Você tem <strong>{bills_overdue}</strong> boletos vencidos. Priorize o pagamento! ⚠️</li>')
+        if top_categories:
+            insights.append(f'<li>Sua maior categoria de gastos foi <strong>{top_categories[0].get("name", "N/A")}</strong> com R$ {top_categories[0].get("total", 0):,.2f}.</li>')
+        
+        html_body = email_templates.render(
+            "report_monthly",
+            **self._report_context(user, total_income, total_expenses, balance),
+            balance_color=balance_color,
+            balance_icon=balance_icon,
+            balance_text=balance_text,
+            month_name=month_name,
+            report_year=report_year,
+            bills_paid=bills_paid,
+            bills_pending=bills_pending,
+            bills_overdue=bills_overdue,
+            income_change=income_change_html,
+            expenses_change=expenses_change_html,
+            categories_section=categories_section,
+            goals_section=goals_section,
+            insights="\n".join(insights)
+        )
         
         text_body = f"""
 Olá {user.name}!
@@ -1569,27 +1601,17 @@ Atenciosamente,
 Equipe EconomizeIA
 """
         
-        sent = await self.send_email(user.email, subject, text_body, html_body)
-        
-        if sent:
-            # Log notification
-            notification = Notification(
-                id=uuid.uuid4(),
-                user_id=user.id,
-                type=NotificationType.RECONCILIATION,
-                channel=NotificationChannel.EMAIL,
-                sent_at=datetime.utcnow(),
-                payload={
-                    "report_month": report_month,
-                    "report_year": report_year,
-                    "monthly_data": monthly_data
-                },
-                status="sent"
-            )
-            db.add(notification)
-            db.commit()
-        
-        return sent
+        return {
+            "to": user.email,
+            "subject": subject,
+            "body": text_body,
+            "html_body": html_body,
+            "payload": {
+                "report_month": report_month,
+                "report_year": report_year,
+                "monthly_data": monthly_data
+            }
+        }
     
     async def send_spending_alert(
         self,
@@ -1801,8 +1823,19 @@ Equipe EconomizeIA
         weekly_data: Dict[str, Any]
     ) -> bool:
         """Send weekly financial report to user."""
+        message = self.build_weekly_report(user, week_start, week_end, weekly_data)
+        return await self.send_report(db, user, message)
+    
+    def build_weekly_report(
+        self,
+        user: User,
+        week_start: date,
+        week_end: date,
+        weekly_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Weekly report email for user (see build_monthly_report)."""
         if not user.notif_prefs.get("email_enabled", True):
-            return False
+            return None
         
         subject = f"📅 Seu Relatório Semanal ({week_start.strftime('%d/%m')} a {week_end.strftime('%d/%m')}) - EconomizeIA"
         
@@ -1822,124 +1855,33 @@ Equipe EconomizeIA
         balance_icon = "📈" if balance >= 0 else "📉"
         balance_text = "Superávit" if balance >= 0 else "Déficit"
         
-        # Build categories HTML
-        categories_html = ""
+        # Layout pré-compilado; por usuário só montamos os fragmentos variáveis
+        categories_section = ""
         if top_categories:
-            for i, cat in enumerate(top_categories[:5]):
-                margin_bottom = "16px" if i < len(top_categories) - 1 else "0px"
-                width_percent = min(100, (cat.get("total", 0) / total_expenses * 100) if total_expenses > 0 else 0)
-                categories_html += f'''
-                                        <div style="margin-bottom: {margin_bottom};">
-                                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-                                                <span style="color: #374151; font-size: 15px; font-weight: 600;">{cat.get("name", "Sem categoria")}</span>
-                                                <span style="color: #111827; font-size: 16px; font-weight: 700;">R$ {cat.get("total", 0):,.2f}</span>
-                                            </div>
-                                            <div style="background-color: #e5e7eb; border-radius: 4px; height: 8px; overflow: hidden;">
-                                                <div style="background: linear-gradient(90deg, #dc2626 0%, #ef4444 100%); height: 100%; width: {width_percent:.1f}%; border-radius: 4px;"></div>
-                                            </div>
-                                        </div>
-                                        '''
+            categories_section = email_templates.render(
+                "partials/report_weekly_categories_section",
+                rows=self._render_category_rows(top_categories, total_expenses)
+            )
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html lang="pt-BR">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <meta name="color-scheme" content="light dark">
-            <meta name="supported-color-schemes" content="light dark">
-        </head>
-        <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f3f4f6; line-height: 1.6;">
-            <table role="presentation" style="width: 100%; border-collapse: collapse; background-color: #f3f4f6; padding: 20px 0;">
-                <tr>
-                    <td align="center" style="padding: 40px 20px;">
-                        <table role="presentation" style="max-width: 650px; width: 100%; border-collapse: collapse; background-color: #ffffff; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); overflow: hidden;">
-                            
-                            <!-- Header -->
-                            <tr>
-                                <td style="background: linear-gradient(135deg, #1f2937 0%, #374151 100%); padding: 50px 40px; text-align: center;">
-                                    <img src="{settings.FRONTEND_URL or 'http://localhost:3000'}/logo.png" alt="EconomizeIA" style="max-width: 120px; height: auto; margin-bottom: 16px;" />
-                                    <h1 style="color: #ffffff; font-size: 28px; font-weight: 700; margin: 0; text-shadow: 0 2px 4px rgba(0,0,0,0.2);">
-                                        📅 Relatório Semanal
-                                    </h1>
-                                    <p style="color: #d1d5db; font-size: 16px; margin: 8px 0 0 0;">
-                                        {week_start.strftime('%d/%m/%Y')} a {week_end.strftime('%d/%m/%Y')}
-                                    </p>
-                                </td>
-                            </tr>
-                            
-                            <!-- Content -->
-                            <tr>
-                                <td style="padding: 40px;">
-                                    <p style="color: #374151; font-size: 18px; font-weight: 600; margin: 0 0 24px 0;">
-                                        Olá, {user.name}!
-                                    </p>
-                                    
-                                    <p style="color: #6b7280; font-size: 16px; margin: 0 0 32px 0;">
-                                        Aqui está um resumo das suas finanças desta semana:
-                                    </p>
-                                    
-                                    <!-- Stats Cards -->
-                                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 16px; margin-bottom: 32px;">
-                                        <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); border-radius: 8px; padding: 24px; text-align: center;">
-                                            <p style="color: #ffffff; font-size: 14px; font-weight: 600; margin: 0 0 8px 0; opacity: 0.9;">Receitas</p>
-                                            <p style="color: #ffffff; font-size: 24px; font-weight: 700; margin: 0;">R$ {total_income:,.2f}</p>
-                                            {f'<p style="color: #ffffff; font-size: 12px; margin: 8px 0 0 0; opacity: 0.8;">{"+" if income_change >= 0 else ""}{income_change:.1f}% vs semana anterior</p>' if income_change != 0 else ''}
-                                        </div>
-                                        <div style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%); border-radius: 8px; padding: 24px; text-align: center;">
-                                            <p style="color: #ffffff; font-size: 14px; font-weight: 600; margin: 0 0 8px 0; opacity: 0.9;">Despesas</p>
-                                            <p style="color: #ffffff; font-size: 24px; font-weight: 700; margin: 0;">R$ {total_expenses:,.2f}</p>
-                                            {f'<p style="color: #ffffff; font-size: 12px; margin: 8px 0 0 0; opacity: 0.8;">{"+" if expenses_change >= 0 else ""}{expenses_change:.1f}% vs semana anterior</p>' if expenses_change != 0 else ''}
-                                        </div>
-                                    </div>
-                                    
-                                    <!-- Balance -->
-                                    <div style="background-color: #f9fafb; border-radius: 8px; padding: 24px; margin-bottom: 32px; text-align: center; border: 2px solid {balance_color};">
-                                        <p style="color: #6b7280; font-size: 14px; font-weight: 600; margin: 0 0 8px 0;">Saldo da Semana</p>
-                                        <p style="color: {balance_color}; font-size: 32px; font-weight: 700; margin: 0;">
-                                            {balance_icon} {balance_text}
-                                        </p>
-                                        <p style="color: {balance_color}; font-size: 28px; font-weight: 700; margin: 8px 0 0 0;">
-                                            R$ {abs(balance):,.2f}
-                                        </p>
-                                    </div>
-                                    
-                                    <!-- Top Categories -->
-                                    {f'''
-                                    <div style="background-color: #f9fafb; border-radius: 8px; padding: 24px; margin-bottom: 32px;">
-                                        <h3 style="color: #111827; font-size: 18px; font-weight: 700; margin: 0 0 20px 0;">Principais Categorias</h3>
-                                        {categories_html}
-                                    </div>
-                                    ''' if top_categories else ''}
-                                    
-                                    <!-- CTA -->
-                                    <div style="text-align: center; margin-top: 32px;">
-                                        <a href="{settings.FRONTEND_URL or 'http://localhost:3000'}/app/dashboard" 
-                                           style="display: inline-block; background: linear-gradient(135deg, #1f2937 0%, #374151 100%); color: #ffffff; text-decoration: none; padding: 16px 32px; border-radius: 8px; font-weight: 600; font-size: 16px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-                                            Ver Dashboard Completo →
-                                        </a>
-                                    </div>
-                                </td>
-                            </tr>
-                            
-                            <!-- Footer -->
-                            <tr>
-                                <td style="background-color: #f9fafb; padding: 30px 40px; text-align: center; border-top: 1px solid #e5e7eb;">
-                                    <p style="color: #6b7280; font-size: 13px; margin: 0 0 8px 0;">
-                                        Este é um relatório automático semanal do EconomizeIA
-                                    </p>
-                                    <p style="color: #9ca3af; font-size: 12px; margin: 0;">
-                                        Você receberá este relatório toda segunda-feira
-                                    </p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
+        income_change_html = ""
+        if income_change != 0:
+            income_change_html = f'<p style="color: #ffffff; font-size: 12px; margin: 8px 0 0 0; opacity: 0.8;">{"+" if income_change >= 0 else ""}{income_change:.1f}% vs semana anterior</p>'
+        
+        expenses_change_html = ""
+        if expenses_change != 0:
+            expenses_change_html = f'<p style="color: #ffffff; font-size: 12px; margin: 8px 0 0 0; opacity: 0.8;">{"+" if expenses_change >= 0 else ""}{expenses_change:.1f}% vs semana anterior</p>'
+        
+        html_body = email_templates.render(
+            "report_weekly",
+            **self._report_context(user, total_income, total_expenses, balance),
+            balance_color=balance_color,
+            balance_icon=balance_icon,
+            balance_text=balance_text,
+            period=f"{week_start.strftime('%d/%m/%Y')} a {week_end.strftime('%d/%m/%Y')}",
+            income_change=income_change_html,
+            expenses_change=expenses_change_html,
+            categories_section=categories_section
+        )
         
         text_body = f"""
         Olá, {user.name}!
@@ -1954,28 +1896,18 @@ Equipe EconomizeIA
         Acesse seu dashboard: {settings.FRONTEND_URL or 'http://localhost:3000'}/app/dashboard
         """
         
-        sent = await self.send_email(user.email, subject, text_body, html_body)
-        
-        if sent:
-            # Log notification
-            notification = Notification(
-                id=uuid.uuid4(),
-                user_id=user.id,
-                type=NotificationType.RECONCILIATION,
-                channel=NotificationChannel.EMAIL,
-                sent_at=datetime.utcnow(),
-                payload={
-                    "report_type": "weekly",
-                    "week_start": week_start.isoformat(),
-                    "week_end": week_end.isoformat(),
-                    "weekly_data": weekly_data
-                },
-                status="sent"
-            )
-            db.add(notification)
-            db.commit()
-        
-        return sent
+        return {
+            "to": user.email,
+            "subject": subject,
+            "body": text_body,
+            "html_body": html_body,
+            "payload": {
+                "report_type": "weekly",
+                "week_start": week_start.isoformat(),
+                "week_end": week_end.isoformat(),
+                "weekly_data": weekly_data
+            }
+        }
     
     async def send_daily_report(
         self,
@@ -1985,17 +1917,27 @@ Equipe EconomizeIA
         daily_data: Dict[str, Any]
     ) -> bool:
         """Send daily financial report to user (PREMIUM ONLY)."""
+        message = self.build_daily_report(user, report_date, daily_data)
+        return await self.send_report(db, user, message)
+    
+    def build_daily_report(
+        self,
+        user: User,
+        report_date: date,
+        daily_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Daily report email for user (see build_monthly_report); None for non-premium users."""
         # Verificar se é premium
         if not user.notif_prefs.get("is_premium", False):
             logger.info(f"⏭️ User {user.id} não é premium, pulando relatório diário")
-            return False
+            return None
         
         if not user.notif_prefs.get("daily_report_enabled", False):
             logger.info(f"⏭️ Relatório diário desabilitado para user {user.id}")
-            return False
+            return None
         
         if not user.notif_prefs.get("email_enabled", True):
-            return False
+            return None
         
         subject = f"📊 Seu Relatório Diário ({report_date.strftime('%d/%m/%Y')}) - EconomizeIA Premium"
         
@@ -2010,128 +1952,23 @@ Equipe EconomizeIA
         balance_color = "#059669" if balance >= 0 else "#dc2626"
         balance_icon = "📈" if balance >= 0 else "📉"
         
-        # Build categories HTML
-        categories_html = ""
+        # Layout pré-compilado; por usuário só montamos os fragmentos variáveis
+        categories_section = ""
         if top_categories:
-            for i, cat in enumerate(top_categories[:5]):
-                margin_bottom = "16px" if i < len(top_categories) - 1 else "0px"
-                width_percent = min(100, (cat.get("total", 0) / total_expenses * 100) if total_expenses > 0 else 0)
-                categories_html += f'''
-                                        <div style="margin-bottom: {margin_bottom};">
-                                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-                                                <span style="color: #374151; font-size: 15px; font-weight: 600;">{cat.get("name", "Sem categoria")}</span>
-                                                <span style="color: #111827; font-size: 16px; font-weight: 700;">R$ {cat.get("total", 0):,.2f}</span>
-                                            </div>
-                                            <div style="background-color: #e5e7eb; border-radius: 4px; height: 8px; overflow: hidden;">
-                                                <div style="background: linear-gradient(90deg, #dc2626 0%, #ef4444 100%); height: 100%; width: {width_percent:.1f}%; border-radius: 4px;"></div>
-                                            </div>
-                                        </div>
-                                        '''
+            categories_section = email_templates.render(
+                "partials/report_daily_categories_section",
+                rows=self._render_category_rows(top_categories, total_expenses)
+            )
         
-        html_body = f"""
-        <!DOCTYPE html>
-        <html lang="pt-BR">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <meta name="color-scheme" content="light dark">
-            <meta name="supported-color-schemes" content="light dark">
-        </head>
-        <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f3f4f6; line-height: 1.6;">
-            <table role="presentation" style="width: 100%; border-collapse: collapse; background-color: #f3f4f6; padding: 20px 0;">
-                <tr>
-                    <td align="center" style="padding: 40px 20px;">
-                        <table role="presentation" style="max-width: 650px; width: 100%; border-collapse: collapse; background-color: #ffffff; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); overflow: hidden;">
-                            
-                            <!-- Header Premium -->
-                            <tr>
-                                <td style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); padding: 50px 40px; text-align: center;">
-                                    <img src="{settings.FRONTEND_URL or 'http://localhost:3000'}/logo.png" alt="EconomizeIA" style="max-width: 120px; height: auto; margin-bottom: 16px;" />
-                                    <div style="background-color: rgba(255,255,255,0.2); border-radius: 6px; padding: 6px 12px; display: inline-block; margin-bottom: 12px;">
-                                        <span style="color: #ffffff; font-size: 12px; font-weight: 700; text-transform: uppercase; letter-spacing: 1px;">⭐ Premium</span>
-                                    </div>
-                                    <h1 style="color: #ffffff; font-size: 28px; font-weight: 700; margin: 0; text-shadow: 0 2px 4px rgba(0,0,0,0.2);">
-                                        📊 Relatório Diário
-                                    </h1>
-                                    <p style="color: #fef3c7; font-size: 16px; margin: 8px 0 0 0;">
-                                        {report_date.strftime('%d/%m/%Y')}
-                                    </p>
-                                </td>
-                            </tr>
-                            
-                            <!-- Content -->
-                            <tr>
-                                <td style="padding: 40px;">
-                                    <p style="color: #374151; font-size: 18px; font-weight: 600; margin: 0 0 24px 0;">
-                                        Olá, {user.name}!
-                                    </p>
-                                    
-                                    <p style="color: #6b7280; font-size: 16px; margin: 0 0 32px 0;">
-                                        Aqui está um resumo das suas finanças de hoje:
-                                    </p>
-                                    
-                                    <!-- Stats Cards -->
-                                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 16px; margin-bottom: 24px;">
-                                        <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); border-radius: 8px; padding: 20px; text-align: center;">
-                                            <p style="color: #ffffff; font-size: 13px; font-weight: 600; margin: 0 0 8px 0; opacity: 0.9;">Receitas Hoje</p>
-                                            <p style="color: #ffffff; font-size: 22px; font-weight: 700; margin: 0;">R$ {total_income:,.2f}</p>
-                                        </div>
-                                        <div style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%); border-radius: 8px; padding: 20px; text-align: center;">
-                                            <p style="color: #ffffff; font-size: 13px; font-weight: 600; margin: 0 0 8px 0; opacity: 0.9;">Despesas Hoje</p>
-                                            <p style="color: #ffffff; font-size: 22px; font-weight: 700; margin: 0;">R$ {total_expenses:,.2f}</p>
-                                        </div>
-                                    </div>
-                                    
-                                    <!-- Balance -->
-                                    <div style="background-color: #f9fafb; border-radius: 8px; padding: 24px; margin-bottom: 24px; text-align: center; border: 2px solid {balance_color};">
-                                        <p style="color: #6b7280; font-size: 14px; font-weight: 600; margin: 0 0 8px 0;">Saldo do Dia</p>
-                                        <p style="color: {balance_color}; font-size: 32px; font-weight: 700; margin: 0;">
-                                            {balance_icon} R$ {abs(balance):,.2f}
-                                        </p>
-                                    </div>
-                                    
-                                    <!-- Transactions Count -->
-                                    <div style="background-color: #eff6ff; border-radius: 8px; padding: 20px; margin-bottom: 32px; text-align: center;">
-                                        <p style="color: #1e40af; font-size: 14px; font-weight: 600; margin: 0 0 8px 0;">Transações Registradas</p>
-                                        <p style="color: #1e3a8a; font-size: 24px; font-weight: 700; margin: 0;">{transactions_count}</p>
-                                    </div>
-                                    
-                                    <!-- Top Categories -->
-                                    {f'''
-                                    <div style="background-color: #f9fafb; border-radius: 8px; padding: 24px; margin-bottom: 32px;">
-                                        <h3 style="color: #111827; font-size: 18px; font-weight: 700; margin: 0 0 20px 0;">Categorias de Hoje</h3>
-                                        {categories_html if top_categories else '<p style="color: #6b7280; font-size: 14px; margin: 0;">Nenhuma categoria registrada hoje.</p>'}
-                                    </div>
-                                    ''' if top_categories else ''}
-                                    
-                                    <!-- CTA -->
-                                    <div style="text-align: center; margin-top: 32px;">
-                                        <a href="{settings.FRONTEND_URL or 'http://localhost:3000'}/app/dashboard" 
-                                           style="display: inline-block; background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); color: #ffffff; text-decoration: none; padding: 16px 32px; border-radius: 8px; font-weight: 600; font-size: 16px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-                                            Ver Dashboard Completo →
-                                        </a>
-                                    </div>
-                                </td>
-                            </tr>
-                            
-                            <!-- Footer -->
-                            <tr>
-                                <td style="background-color: #f9fafb; padding: 30px 40px; text-align: center; border-top: 1px solid #e5e7eb;">
-                                    <p style="color: #6b7280; font-size: 13px; margin: 0 0 8px 0;">
-                                        ⭐ Este é um benefício exclusivo do plano Premium
-                                    </p>
-                                    <p style="color: #9ca3af; font-size: 12px; margin: 0;">
-                                        Você receberá este relatório todos os dias às 9:00
-                                    </p>
-                                </td>
-                            </tr>
-                        </table>
-                    </td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
+        html_body = email_templates.render(
+            "report_daily",
+            **self._report_context(user, total_income, total_expenses, balance),
+            balance_color=balance_color,
+            balance_icon=balance_icon,
+            report_date=report_date.strftime('%d/%m/%Y'),
+            transactions_count=transactions_count,
+            categories_section=categories_section
+        )
         
         text_body = f"""
         Olá, {user.name}!
@@ -2149,27 +1986,17 @@ Equipe EconomizeIA
         Acesse seu dashboard: {settings.FRONTEND_URL or 'http://localhost:3000'}/app/dashboard
         """
         
-        sent = await self.send_email(user.email, subject, text_body, html_body)
-        
-        if sent:
-            # Log notification
-            notification = Notification(
-                id=uuid.uuid4(),
-                user_id=user.id,
-                type=NotificationType.RECONCILIATION,
-                channel=NotificationChannel.EMAIL,
-                sent_at=datetime.utcnow(),
-                payload={
-                    "report_type": "daily",
-                    "report_date": report_date.isoformat(),
-                    "daily_data": daily_data
-                },
-                status="sent"
-            )
-            db.add(notification)
-            db.commit()
-        
-        return sent
+        return {
+            "to": user.email,
+            "subject": subject,
+            "body": text_body,
+            "html_body": html_body,
+            "payload": {
+                "report_type": "daily",
+                "report_date": report_date.isoformat(),
+                "daily_data": daily_data
+            }
+        }
 
 
 notification_service = NotificationService()
@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+# Quantos jobs finalizados manter em memória para consulta de status
+MAX_FINISHED_JOBS = 1000
+
+
+class OCRQueueFullError(Exception):
+    """Raised when the in-process OCR queue is at capacity."""
+
+
+def _run_ocr(file_bytes: bytes, content_type: str) -> Tuple[str, float, str]:
+    """Runs in a pool process: Tesseract/OpenCV work never touches the API event loop."""
+    from app.services.ocr_service import ocr_service
+    return ocr_service.extract_text_with_method(file_bytes, content_type)
+
+
+class OCRExecutor:
+    """
+    In-process OCR for bill uploads when Celery is unavailable.
+
+    OCR runs in a small process pool; afterwards the extraction runs on the
+    event loop and the DB update in a thread. At most OCR_WORKERS + OCR_QUEUE_SIZE jobs are in
+    flight; beyond that submit() raises OCRQueueFullError so the API can
+    answer 429 instead of piling work up.
+
+    Job status lives in this process and is copied to Redis at every change
+    (ocr:job:<job_id>), so GET /processing-status works on any uvicorn worker.
+    """
+
+    KEY_PREFIX = "ocr:job:"
+
+    def __init__(self, workers: int = None, queue_size: int = None):
+        self.workers = max(workers or settings.OCR_WORKERS, 1)
+        self.capacity = self.workers + max(queue_size if queue_size is not None else settings.OCR_QUEUE_SIZE, 0)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: não herdar threads/conexões do processo do uvicorn
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """One slot per pool process, so a job only counts as processing once a process is free."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def has_capacity(self) -> bool:
+        return self._in_flight < self.capacity
+
+    def submit(
+        self,
+        job_id: str,
+        bill_id: str,
+        user_id: str,
+        file_bytes: bytes,
+        content_type: str,
+        filename: Optional[str] = None,
+        s3_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Queue OCR + extraction for a bill document. Must be called from the event loop."""
+        if not self.has_capacity():
+            raise OCRQueueFullError(f"OCR queue full ({self._in_flight}/{self.capacity})")
+
+        job = {
+            "job_id": job_id,
+            "bill_id": bill_id,
+            "user_id": user_id,
+            "status": "queued",
+            "error": None,
+            "ocr_method": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+        }
+        self._jobs[job_id] = job
+        self._in_flight += 1
+
+        task = asyncio.get_running_loop().create_task(
+            self._run_job(job, file_bytes, content_type, filename, s3_path)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"📥 OCR job {job_id} enfileirado ({self._in_flight}/{self.capacity})")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    async def aget_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job submitted by any worker: this process first, then Redis."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        client = cache_service._get_async_client()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(self.KEY_PREFIX + job_id)
+        except Exception as e:
+            cache_service._handle_error("reading OCR job", e)
+            return None
+        return json.loads(raw) if raw else None
+
+    async def _publish(self, job: Dict[str, Any]):
+        client = cache_service._get_async_client()
+        if client is None:
+            return
+        try:
+            await client.setex(self.KEY_PREFIX + job["job_id"], settings.OCR_JOB_STATUS_TTL, json.dumps(job))
+        except Exception as e:
+            cache_service._handle_error("writing OCR job", e)
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "capacity": self.capacity, "in_flight": self._in_flight}
+
+    async def _run_job(
+        self,
+        job: Dict[str, Any],
+        file_bytes: bytes,
+        content_type: str,
+        filename: Optional[str],
+        s3_path: Optional[str]
+    ):
+        try:
+            await self._publish(job)
+            async with self._get_slots():
+                job["status"] = "processing"
+                await self._publish(job)
+                loop = asyncio.get_running_loop()
+                ocr_text, ocr_confidence, ocr_method = await loop.run_in_executor(
+                    self._get_pool(), _run_ocr, file_bytes, content_type
+                )
+            job["ocr_method"] = ocr_method
+            await self._store_result(job["bill_id"], job["job_id"], ocr_text, ocr_confidence, ocr_method, filename, s3_path)
+            job["status"] = "completed"
+        except Exception as e:
+            logger.error(f"Erro no OCR job {job['job_id']}: {e}", exc_info=True)
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            self._in_flight -= 1
+            job["finished_at"] = datetime.utcnow().isoformat()
+            self._trim_finished()
+            await self._publish(job)
+
+    async def _store_result(
+        self,
+        bill_id: str,
+        document_id: str,
+        ocr_text: str,
+        ocr_confidence: float,
+        ocr_method: str,
+        filename: Optional[str],
+        s3_path: Optional[str]
+    ):
+        """
+        Save OCR output, extract fields and update the bill. The sync database,
+        MinIO and Redis calls run in the default thread pool; only the
+        extraction (async HTTP to the LLM) runs on the event loop.
+        """
+        from app.services.bill_processing import extract_bill_fields
+
+        loop = asyncio.get_running_loop()
+        saved = await loop.run_in_executor(
+            None, self._save_ocr, bill_id, document_id, ocr_text, ocr_confidence, ocr_method
+        )
+        if not saved:
+            return
+
+        image_url = await loop.run_in_executor(None, self._image_url, s3_path) if s3_path else None
+        extracted = await extract_bill_fields(
+            ocr_text=ocr_text,
+            image_url=image_url,
+            filename=filename,
+            bill_id=bill_id
+        )
+        await loop.run_in_executor(None, self._save_extraction, bill_id, document_id, ocr_confidence, extracted)
+
+    @staticmethod
+    def _save_ocr(bill_id: str, document_id: str, ocr_text: str, ocr_confidence: float, ocr_method: str) -> bool:
+        """Store the OCR output on the document. False when there is nothing left to extract."""
+        from app.db.database import SessionLocal
+        from app.db.models import Bill, BillDocument
+
+        db = SessionLocal()
+        try:
+            bill = db.query(Bill).filter(Bill.id == UUID(bill_id)).first()
+            document = db.query(BillDocument).filter(BillDocument.id == UUID(document_id)).first()
+            if not bill or not document:
+                logger.warning(f"Boleto {bill_id} removido antes do fim do OCR")
+                return False
+
+            document.ocr_text = ocr_text
+            document.ocr_confidence = ocr_confidence
+            document.ocr_method = ocr_method
+            db.commit()
+            logger.info(f"OCR concluído para boleto {bill_id} via {ocr_method}. Texto extraído: {len(ocr_text)} caracteres, confiança: {ocr_confidence:.2f}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if not ocr_text or len(ocr_text.strip()) <= 10:
+            logger.warning(f"OCR retornou pouco ou nenhum texto para boleto {bill_id}")
+            return False
+        return True
+
+    @staticmethod
+    def _image_url(s3_path: str) -> Optional[str]:
+        from app.services.storage_service import storage_service
+
+        try:
+            object_name = s3_path.split("/", 1)[1] if "/" in s3_path else s3_path
+            return storage_service.get_presigned_url(object_name, expires_seconds=3600)
+        except Exception:
+            return None  # URL opcional
+
+    @staticmethod
+    def _save_extraction(bill_id: str, document_id: str, ocr_confidence: float, extracted: Dict[str, Any]):
+        """Apply the extracted fields to the bill and remember the result by file hash."""
+        from app.db.database import SessionLocal
+        from app.db.models import Bill, BillDocument
+        from app.services.bill_processing import apply_extracted_fields
+        from app.services.ocr_result_cache import ocr_result_cache
+
+        db = SessionLocal()
+        try:
+            bill = db.query(Bill).filter(Bill.id == UUID(bill_id)).first()
+            document = db.query(BillDocument).filter(BillDocument.id == UUID(document_id)).first()
+            if not bill or not document:
+                logger.warning(f"Boleto {bill_id} removido durante a extração")
+                return
+
+            document.extracted_json = extracted
+            apply_extracted_fields(bill, extracted, ocr_confidence)
+            db.commit()
+            ocr_result_cache.set(document.content_sha256, document.ocr_text, ocr_confidence, extracted)
+            logger.info(f"Extraction concluída para boleto {bill_id}. Confiança: {bill.confidence:.2f}")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _trim_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["finished_at"]]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        """Stop the worker processes (pending jobs are cancelled)."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+ocr_executor = OCRExecutor()
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import BillDocument
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """
+    Content-addressed cache of OCR + extraction results, keyed by SHA-256 of the file.
+
+    Redis is checked first; bill_documents.content_sha256 (indexed) is the
+    durable fallback, so a re-uploaded boleto skips OCR, regex and the LLM even
+    after a Redis flush.
+    """
+
+    KEY_PREFIX = "ocr:result:"
+    STATS_KEY = "ocr:cache:stats"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(file_bytes: bytes) -> str:
+        return hashlib.sha256(file_bytes).hexdigest()
+
+    @property
+    def _redis(self):
+        return cache_service.redis_client if cache_service.enabled else None
+
+    def _record(self, field: str):
+        if field == "hits":
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self._redis:
+            try:
+                self._redis.hincrby(self.STATS_KEY, field, 1)
+            except Exception as e:
+                logger.debug(f"Erro ao registrar métrica do cache de OCR: {e}")
+
+    def get(self, db: Session, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return {ocr_text, ocr_confidence, extracted_json} for previously processed content."""
+        redis_client = self._redis
+        if redis_client:
+            try:
+                cached = redis_client.get(self.KEY_PREFIX + content_hash)
+                if cached:
+                    self._record("hits")
+                    logger.info(f"🎯 Cache de OCR (Redis) para {content_hash[:12]}")
+                    return json.loads(cached)
+            except Exception as e:
+                logger.warning(f"Erro ao ler cache de OCR no Redis: {e}")
+
+        document = db.query(BillDocument).filter(
+            BillDocument.content_sha256 == content_hash,
+            BillDocument.extracted_json.isnot(None)
+        ).order_by(BillDocument.created_at.desc()).first()
+
+        if not document:
+            self._record("misses")
+            return None
+
+        result = {
+            "ocr_text": document.ocr_text,
+            "ocr_confidence": document.ocr_confidence,
+            "extracted_json": document.extracted_json,
+        }
+        self._record("hits")
+        logger.info(f"🎯 Cache de OCR (bill_documents) para {content_hash[:12]}")
+        self._store_redis(content_hash, result)
+        return result
+
+    def set(self, content_hash: Optional[str], ocr_text: str, ocr_confidence: float, extracted_json: Optional[Dict[str, Any]]):
+        """Remember a finished extraction. Results without extracted fields are not cached."""
+        if not content_hash or not extracted_json:
+            return
+        self._store_redis(content_hash, {
+            "ocr_text": ocr_text,
+            "ocr_confidence": ocr_confidence,
+            "extracted_json": extracted_json,
+        })
+
+    def _store_redis(self, content_hash: str, result: Dict[str, Any]):
+        redis_client = self._redis
+        if not redis_client:
+            return
+        try:
+            redis_client.setex(self.KEY_PREFIX + content_hash, settings.OCR_CACHE_TTL, json.dumps(result, default=str))
+        except Exception as e:
+            logger.warning(f"Erro ao gravar cache de OCR no Redis: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and, if Redis is up, across all processes."""
+        total = self.hits + self.misses
+        stats: Dict[str, Any] = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+        if self._redis:
+            try:
+                shared = self._redis.hgetall(self.STATS_KEY)
+                stats["shared"] = {k: int(v) for k, v in shared.items()}
+            except Exception:
+                pass
+        return stats
+
+
+ocr_result_cache = OCRResultCache()
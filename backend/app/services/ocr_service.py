@@ -3,7 +3,13 @@ from PIL import Image
 import pdf2image
 import io
 import logging
-from typing import Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.bill_extractor import brazilian_bill_extractor
+from app.services.boleto_layout import detect_boleto_regions
 
 # OpenCV e NumPy são opcionais - melhoram pré-processamento
 try:
@@ -23,8 +29,24 @@ except ImportError:
     OCRMYPDF_AVAILABLE = False
     logging.warning("ocrmypdf não disponível - funcionalidade de OCR em PDF será limitada")
 
+# pdfminer.six (dependência do OCRmyPDF) lê a camada de texto de PDFs digitais
+try:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    PDFMINER_AVAILABLE = True
+except ImportError:
+    PDFMINER_AVAILABLE = False
+    logging.warning("pdfminer.six não disponível - PDFs digitais passarão por OCR")
+
 logger = logging.getLogger(__name__)
 
+# Campos que, encontrados, dispensam o OCR das páginas restantes do PDF
+ESSENTIAL_FIELDS = ("barcode", "amount", "due_date")
+# Página com menos caracteres que isso na camada de texto é tratada como digitalizada
+MIN_TEXT_LAYER_CHARS = 20
+# Texto embutido no PDF não tem erro de reconhecimento
+TEXT_LAYER_CONFIDENCE = 0.99
+
 
 class OCRService:
     """Service for OCR processing using Tesseract and OCRmyPDF."""
@@ -33,11 +55,15 @@ class OCRService:
         self.tesseract_lang = "por"  # Portuguese
         # Configuração otimizada para boletos brasileiros
         self.tesseract_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,/-:R$ '
+        # Configuração por região do boleto (as demais usam tesseract_config)
+        self.roi_configs = {
+            # Linha digitável: só dígitos, pontos e espaços
+            "linha_digitavel": r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789. ',
+        }
     
     def _preprocess_image(self, image_bytes: bytes):
         """
-        Pré-processa imagem para melhorar qualidade do OCR.
-        Aplica: escala de cinza, threshold, denoising, contraste.
+        Pré-processa imagem (bytes codificados) para melhorar qualidade do OCR.
         """
         if not CV2_AVAILABLE:
             return None
@@ -46,10 +72,24 @@ class OCRService:
             # Converter bytes para numpy array
             nparr = np.frombuffer(image_bytes, np.uint8)
             img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                return None
-            
+        except Exception as e:
+            logger.warning(f"Erro ao decodificar imagem: {e}")
+            return None
+        
+        if img is None:
+            return None
+        
+        return self._preprocess_array(img)
+    
+    def _preprocess_array(self, img):
+        """
+        Pré-processa imagem já decodificada (array BGR ou escala de cinza).
+        Aplica: escala de cinza, threshold, denoising, contraste.
+        """
+        if not CV2_AVAILABLE:
+            return None
+        
+        try:
             # Converter para escala de cinza
             if len(img.shape) == 3:
                 gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -97,68 +137,199 @@ class OCRService:
             
             if preprocessed is not None and CV2_AVAILABLE:
                 # Usar imagem pré-processada
-                image = Image.fromarray(preprocessed)
                 logger.info("Usando imagem pré-processada para OCR")
-            else:
-                # Usar imagem original
-                image = Image.open(io.BytesIO(image_bytes))
-                logger.info("Usando imagem original para OCR (sem pré-processamento)")
+                return self._ocr_preprocessed(preprocessed)
             
-            # Extrair texto com configuração otimizada
-            data = pytesseract.image_to_data(
-                image,
-                lang=self.tesseract_lang,
-                config=self.tesseract_config,
-                output_type=pytesseract.Output.DICT
-            )
-            
-            text_lines = []
-            confidences = []
-            
-            for i, word in enumerate(data['text']):
-                if word.strip():
-                    text_lines.append(word)
-                    conf = float(data['conf'][i]) if data['conf'][i] != -1 else 0.0
-                    confidences.append(conf)
-            
-            full_text = ' '.join(text_lines)
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-            
-            # Log para debug
-            logger.info(f"OCR extraiu {len(text_lines)} palavras com confiança média de {avg_confidence:.1f}%")
-            
-            return full_text, avg_confidence / 100.0  # Normalize to 0-1
+            # Usar imagem original
+            image = Image.open(io.BytesIO(image_bytes))
+            logger.info("Usando imagem original para OCR (sem pré-processamento)")
+            return self._ocr_image(image)
             
         except Exception as e:
             logger.error(f"Error extracting text from image: {e}", exc_info=True)
             return "", 0.0
     
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> Tuple[str, float]:
+    def _ocr_image(self, image: Image.Image, config: Optional[str] = None) -> Tuple[str, float]:
+        """Run Tesseract on a PIL image. Returns: (text, confidence 0-1)"""
+        # Extrair texto com configuração otimizada
+        data = pytesseract.image_to_data(
+            image,
+            lang=self.tesseract_lang,
+            config=config or self.tesseract_config,
+            output_type=pytesseract.Output.DICT
+        )
+        
+        text_lines = []
+        confidences = []
+        
+        for i, word in enumerate(data['text']):
+            if word.strip():
+                text_lines.append(word)
+                conf = float(data['conf'][i]) if data['conf'][i] != -1 else 0.0
+                confidences.append(conf)
+        
+        full_text = ' '.join(text_lines)
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        
+        # Log para debug
+        logger.info(f"OCR extraiu {len(text_lines)} palavras com confiança média de {avg_confidence:.1f}%")
+        
+        return full_text, avg_confidence / 100.0  # Normalize to 0-1
+    
+    def _ocr_boleto_regions(self, preprocessed) -> Optional[Tuple[str, float]]:
         """
-        Extract text from PDF using OCRmyPDF and Tesseract.
-        Returns: (text, confidence)
+        OCR only the boleto regions found by the layout detector.
+        Returns None (caller OCRs the whole page) if no layout is found or the
+        regions do not yield barcode, amount and due date.
         """
+        regions = detect_boleto_regions(preprocessed)
+        if not regions:
+            return None
+        
+        text_parts = []
+        confidences = []
+        for name, (x, y, w, h) in regions.items():
+            crop = preprocessed[y:y + h, x:x + w]
+            if crop.size == 0:
+                continue
+            text, conf = self._ocr_image(Image.fromarray(crop), config=self.roi_configs.get(name))
+            if text:
+                text_parts.append(text)
+                confidences.append(conf)
+        
+        full_text = '\n'.join(text_parts)
+        if not self._has_essential_fields(full_text):
+            logger.info("OCR por regiões incompleto, usando a página inteira")
+            return None
+        
+        logger.info(f"OCR por regiões do boleto: {len(text_parts)}/{len(regions)} regiões com texto")
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return full_text, avg_confidence
+    
+    def _ocr_preprocessed(self, preprocessed) -> Tuple[str, float]:
+        """OCR a preprocessed page: boleto regions first, whole page as fallback."""
+        if settings.OCR_ROI_ENABLED:
+            result = self._ocr_boleto_regions(preprocessed)
+            if result is not None:
+                return result
+        return self._ocr_image(Image.fromarray(preprocessed))
+    
+    def _render_pdf_page(self, pdf_bytes: bytes, page_number: int) -> Optional[Image.Image]:
+        """Render a single PDF page (grayscale) on demand."""
+        pages = pdf2image.convert_from_bytes(
+            pdf_bytes,
+            first_page=page_number,
+            last_page=page_number,
+            grayscale=True
+        )
+        return pages[0] if pages else None
+    
+    def _ocr_pdf_page(self, pdf_bytes: bytes, page_number: int) -> Tuple[str, float]:
+        """Render, preprocess and OCR one page without re-encoding it to PNG."""
+        page = self._render_pdf_page(pdf_bytes, page_number)
+        if page is None:
+            return "", 0.0
+        
+        if CV2_AVAILABLE:
+            # Array numpy direto para o pré-processamento
+            preprocessed = self._preprocess_array(np.asarray(page))
+            if preprocessed is not None:
+                return self._ocr_preprocessed(preprocessed)
+        
+        return self._ocr_image(page)
+    
+    @staticmethod
+    def _has_essential_fields(text: str) -> bool:
+        """True once barcode, amount and due date can all be extracted from the text so far."""
+        extracted = brazilian_bill_extractor.extract_fields(text)
+        return all(extracted.get(field) for field in ESSENTIAL_FIELDS)
+    
+    def _ocr_pdf_pages(
+        self,
+        pdf_bytes: bytes,
+        page_numbers: Optional[List[int]] = None,
+        known_text: str = ""
+    ) -> List[Tuple[int, str, float]]:
+        """
+        OCR the pages of a PDF in parallel, in page order.
+        Pages are rendered lazily (at most one per worker ahead of the page being
+        consumed) and the remaining pages are skipped once the essential boleto
+        fields have been found (known_text counts towards that check).
+        Returns: [(page_number, text, confidence)]
+        """
+        if page_numbers is None:
+            page_count = int(pdf2image.pdfinfo_from_bytes(pdf_bytes)["Pages"])
+            page_numbers = list(range(1, page_count + 1))
+        if not page_numbers:
+            return []
+        
+        workers = max(1, min(settings.OCR_PAGE_WORKERS, len(page_numbers)))
+        to_render = deque(page_numbers)
+        results = []
+        pending = deque()
+        # Tesseract e poppler rodam como subprocessos, então threads paralelizam de verdade
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-page")
         try:
-            # First, try to extract text directly (if PDF has text layer)
-            try:
-                images = pdf2image.convert_from_bytes(pdf_bytes)
-                text_parts = []
-                confidences = []
+            while to_render or pending:
+                while to_render and len(pending) < workers:
+                    page_number = to_render.popleft()
+                    pending.append((page_number, pool.submit(self._ocr_pdf_page, pdf_bytes, page_number)))
                 
-                for image in images:
-                    img_bytes = io.BytesIO()
-                    image.save(img_bytes, format='PNG')
-                    text, conf = self.extract_text_from_image(img_bytes.getvalue())
-                    text_parts.append(text)
-                    confidences.append(conf)
+                page_number, future = pending.popleft()
+                text, conf = future.result()
+                results.append((page_number, text, conf))
                 
-                full_text = '\n'.join(text_parts)
-                avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-                
-                return full_text, avg_confidence
+                has_more = to_render or pending
+                text_so_far = '\n'.join([known_text] + [text for _, text, _ in results])
+                if has_more and self._has_essential_fields(text_so_far):
+                    logger.info(f"⏩ Campos essenciais encontrados após {len(results)}/{len(page_numbers)} páginas com OCR, ignorando as demais")
+                    break
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        return results
+    
+    def _extract_text_layer(self, pdf_bytes: bytes) -> List[str]:
+        """Embedded text of each page ('' for scanned pages), without rasterizing."""
+        pages = []
+        for layout in extract_pages(io.BytesIO(pdf_bytes)):
+            blocks = [element.get_text().strip() for element in layout if isinstance(element, LTTextContainer)]
+            pages.append('\n'.join(block for block in blocks if block))
+        return pages
+    
+    def extract_text_from_pdf_with_method(self, pdf_bytes: bytes) -> Tuple[str, float, str]:
+        """
+        Extract text from PDF: embedded text layer first, Tesseract only for pages
+        without one (OCRmyPDF as last resort).
+        Returns: (text, confidence, method) - method is "text_layer", "mixed", "ocr" or "ocrmypdf"
+        """
+        page_texts: List[str] = []
+        if PDFMINER_AVAILABLE:
+            try:
+                page_texts = self._extract_text_layer(pdf_bytes)
+            except Exception as e:
+                logger.warning(f"Não foi possível ler a camada de texto do PDF: {e}")
+        
+        digital = {i + 1: text for i, text in enumerate(page_texts) if len(text) >= MIN_TEXT_LAYER_CHARS}
+        scanned = [i + 1 for i in range(len(page_texts)) if i + 1 not in digital]
+        digital_text = '\n'.join(digital[page] for page in sorted(digital))
+        
+        if digital and (not scanned or self._has_essential_fields(digital_text)):
+            logger.info(f"📄 Texto extraído da camada de texto do PDF ({len(digital)}/{len(page_texts)} páginas, sem OCR)")
+            return digital_text, TEXT_LAYER_CONFIDENCE, "text_layer"
+        
+        try:
+            try:
+                ocr_pages = self._ocr_pdf_pages(
+                    pdf_bytes,
+                    page_numbers=scanned if page_texts else None,
+                    known_text=digital_text
+                )
                 
             except Exception as e:
                 logger.warning(f"Direct PDF extraction failed: {e}")
+                if digital:
+                    return digital_text, TEXT_LAYER_CONFIDENCE, "text_layer"
                 # Fallback to OCRmyPDF se disponível
                 if OCRMYPDF_AVAILABLE:
                     try:
@@ -167,43 +338,66 @@ class OCRService:
                         output_pdf.seek(0)
                     except Exception as ocr_error:
                         logger.error(f"OCRmyPDF também falhou: {ocr_error}")
-                        return "", 0.0
+                        return "", 0.0, "ocrmypdf"
                 else:
                     logger.warning("OCRmyPDF não disponível, usando apenas Tesseract nas páginas convertidas")
-                    return "", 0.0
-                
-                images = pdf2image.convert_from_bytes(output_pdf.read())
-                text_parts = []
-                confidences = []
-                
-                for image in images:
-                    img_bytes = io.BytesIO()
-                    image.save(img_bytes, format='PNG')
-                    text, conf = self.extract_text_from_image(img_bytes.getvalue())
-                    text_parts.append(text)
-                    confidences.append(conf)
+                    return "", 0.0, "ocr"
                 
-                full_text = '\n'.join(text_parts)
-                avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-                
-                return full_text, avg_confidence
+                # O PDF gerado pelo OCRmyPDF já tem camada de texto
+                if PDFMINER_AVAILABLE:
+                    text = '\n'.join(self._extract_text_layer(output_pdf.getvalue()))
+                    return text, TEXT_LAYER_CONFIDENCE if text else 0.0, "ocrmypdf"
+                ocr_pages = self._ocr_pdf_pages(output_pdf.getvalue())
+                text = '\n'.join(text for _, text, _ in ocr_pages)
+                confidences = [conf for _, _, conf in ocr_pages]
+                return text, sum(confidences) / len(confidences) if confidences else 0.0, "ocrmypdf"
+            
+            texts = dict(digital)
+            confidences = {page: TEXT_LAYER_CONFIDENCE for page in digital}
+            for page_number, text, conf in ocr_pages:
+                texts[page_number] = text
+                confidences[page_number] = conf
+            
+            full_text = '\n'.join(texts[page] for page in sorted(texts))
+            avg_confidence = sum(confidences.values()) / len(confidences) if confidences else 0.0
+            method = "mixed" if digital else "ocr"
+            logger.info(f"📄 PDF processado via {method}: {len(digital)} páginas com camada de texto, {len(ocr_pages)} com OCR")
+            
+            return full_text, avg_confidence, method
                 
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
-            return "", 0.0
+            return "", 0.0, "ocr"
     
-    def extract_text(self, file_bytes: bytes, content_type: str) -> Tuple[str, float]:
+    def extract_text_from_pdf(self, pdf_bytes: bytes) -> Tuple[str, float]:
         """
-        Extract text from file (PDF or image).
+        Extract text from PDF (text layer or OCR).
         Returns: (text, confidence)
         """
+        text, confidence, _ = self.extract_text_from_pdf_with_method(pdf_bytes)
+        return text, confidence
+    
+    def extract_text_with_method(self, file_bytes: bytes, content_type: str) -> Tuple[str, float, str]:
+        """
+        Extract text from file (PDF or image), reporting which path produced it.
+        Returns: (text, confidence, method)
+        """
         if content_type.startswith('image/'):
-            return self.extract_text_from_image(file_bytes)
+            text, confidence = self.extract_text_from_image(file_bytes)
+            return text, confidence, "ocr"
         elif content_type == 'application/pdf':
-            return self.extract_text_from_pdf(file_bytes)
+            return self.extract_text_from_pdf_with_method(file_bytes)
         else:
             logger.warning(f"Unsupported content type: {content_type}")
-            return "", 0.0
+            return "", 0.0, "unsupported"
+    
+    def extract_text(self, file_bytes: bytes, content_type: str) -> Tuple[str, float]:
+        """
+        Extract text from file (PDF or image).
+        Returns: (text, confidence)
+        """
+        text, confidence, _ = self.extract_text_with_method(file_bytes, content_type)
+        return text, confidence
 
 
 ocr_service = OCRService()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.security import get_password_hash, password_needs_rehash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashQueueFullError(Exception):
+    """Raised when too many password hashes are already waiting."""
+
+
+class PasswordHashExecutor:
+    """
+    Argon2 hashing/verification off the event loop.
+
+    Argon2 is CPU- and memory-heavy on purpose; running it inside the async
+    handlers froze every other request during a login storm. Hashes run in a
+    small thread pool (argon2-cffi releases the GIL) and at most
+    PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE are in flight; beyond that
+    PasswordHashQueueFullError is raised so the API answers 503 right away.
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = None):
+        self.workers = max(workers or settings.PASSWORD_HASH_WORKERS, 1)
+        self.capacity = self.workers + max(queue_size if queue_size is not None else settings.PASSWORD_HASH_QUEUE_SIZE, 0)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._hash_seconds = 0.0
+        self._lock = threading.Lock()  # Métricas atualizadas pelas threads do pool
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="argon2")
+        return self._pool
+
+    def _timed(self, func: Callable, queued_at: float, *args):
+        """Runs in a pool thread: records queue wait and hash time around func."""
+        started = time.perf_counter()
+        wait = started - queued_at
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._wait_seconds += wait
+                self._max_wait_seconds = max(self._max_wait_seconds, wait)
+                self._hash_seconds += elapsed
+
+    async def _run(self, func: Callable, *args):
+        if self._in_flight >= self.capacity:
+            self.rejected += 1
+            raise PasswordHashQueueFullError(f"Password hash queue full ({self._in_flight}/{self.capacity})")
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), self._timed, func, time.perf_counter(), *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Cheap (only parses the hash), safe to call on the event loop."""
+        return password_needs_rehash(hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self._running, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_seconds / completed * 1000, 1),
+            "max_wait_ms": round(self._max_wait_seconds * 1000, 1),
+            "avg_hash_ms": round(self._hash_seconds / completed * 1000, 1),
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHashExecutor()
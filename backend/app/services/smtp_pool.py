@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    Persistent SMTP connections driven by a small thread pool.
+
+    Each executor thread owns one connection (connect + STARTTLS + login happen
+    once, not per message) and reconnects transparently when the server drops
+    it. smtplib is blocking, so sends run in the pool instead of on the event loop.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, size: int = 4, timeout: int = 60):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(size, 1), thread_name_prefix="smtp")
+        self._local = threading.local()
+        self._connections: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        logger.info(f"Connecting to SMTP server {self.host}:{self.port} (timeout={self.timeout}s)")
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.starttls()
+            server.login(self.user, self.password)
+        except Exception:
+            self._quietly_close(server)
+            raise
+
+        with self._lock:
+            self._connections.append(server)
+        logger.info("✅ SMTP connection established successfully")
+        return server
+
+    def _get_connection(self) -> smtplib.SMTP:
+        server = getattr(self._local, "server", None)
+        if server is None:
+            server = self._connect()
+            self._local.server = server
+        return server
+
+    def _discard_connection(self):
+        server = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is not None:
+            with self._lock:
+                if server in self._connections:
+                    self._connections.remove(server)
+            self._quietly_close(server)
+
+    @staticmethod
+    def _quietly_close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def send(self, msg: Message):
+        """Send a message on this thread's connection, reconnecting once if it was dropped."""
+        for attempt in (1, 2):
+            server = self._get_connection()
+            try:
+                server.send_message(msg)
+                return
+            except smtplib.SMTPRecipientsRefused:
+                # sendmail already reset the session; the connection is reusable
+                raise
+            except smtplib.SMTPResponseException:
+                # Server rejected this message but the session is still usable
+                try:
+                    server.rset()
+                except Exception:
+                    self._discard_connection()
+                raise
+            except OSError as e:
+                # SMTPServerDisconnected and socket errors: drop the connection
+                # and retry once on a fresh one
+                self._discard_connection()
+                if attempt == 2:
+                    raise
+                logger.warning(f"SMTP connection lost ({e}), reconnecting")
+
+    async def send_async(self, msg: Message):
+        """Send a message from async code without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.send, msg)
+
+    def close(self):
+        """Close every pooled connection and stop the executor."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for server in connections:
+            self._quietly_close(server)
@@ -1,8 +1,7 @@
-from minio import Minio
-from minio.error import S3Error
 import logging
 from typing import Optional
 from app.core.config import settings
+from app.core.lazy import LazyService
 import io
 
 logger = logging.getLogger(__name__)
@@ -18,6 +17,8 @@ class StorageService:
         
         if self.enabled:
             try:
+                from minio import Minio
+                
                 self.client = Minio(
                     settings.MINIO_ENDPOINT,
                     access_key=settings.MINIO_ACCESS_KEY,
@@ -110,21 +111,28 @@ class StorageService:
             # Não quebrar se não conseguir deletar
 
 
-# Inicializar storage_service de forma segura
-try:
-    storage_service = StorageService()
-except Exception as e:
-    logger.error(f"Failed to initialize storage service: {e}")
-    # Criar um objeto mock que não quebra
-    class MockStorage:
-        enabled = False
-        def upload_file(self, file_bytes, object_name, content_type):
-            return f"mock/{object_name}"
-        def get_file(self, object_name):
-            raise FileNotFoundError("Storage is disabled, file not available")
-        def get_presigned_url(self, object_name, expires_seconds=3600):
-            return "#storage-disabled"
-        def delete_file(self, object_name):
-            pass
-    storage_service = MockStorage()
+class MockStorage:
+    """Stand-in used when StorageService itself fails to initialize."""
+    enabled = False
+    def upload_file(self, file_bytes, object_name, content_type):
+        return f"mock/{object_name}"
+    def get_file(self, object_name):
+        raise FileNotFoundError("Storage is disabled, file not available")
+    def get_presigned_url(self, object_name, expires_seconds=3600):
+        return "#storage-disabled"
+    def delete_file(self, object_name):
+        pass
+
+
+def _create_storage_service():
+    """Build the storage service, falling back to MockStorage if it fails."""
+    try:
+        return StorageService()
+    except Exception as e:
+        logger.error(f"Failed to initialize storage service: {e}")
+        # Criar um objeto mock que não quebra
+        return MockStorage()
+
 
+# Cliente MinIO (e checagem do bucket) só no primeiro uso, não no import
+storage_service: StorageService = LazyService(_create_storage_service, "storage_service")
@@ -0,0 +1,222 @@
+import asyncio
+import copy
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from app.core.config import settings
+from app.db.models import User
+from app.services.cache_service import cache_service
+from app.services.local_cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+# Colunas guardadas no cache (nunca senha nem tokens de reset/verificação)
+CACHED_COLUMNS = (
+    "id", "name", "email", "phone", "email_verified", "is_active",
+    "token_version", "notif_prefs", "created_at", "updated_at",
+)
+DATETIME_COLUMNS = ("created_at", "updated_at")
+
+# Mudanças que tornam o usuário em cache obsoleto
+INVALIDATING_COLUMNS = CACHED_COLUMNS[1:] + ("password_hash",)
+
+
+class UserCache:
+    """
+    Short-TTL cache of the users row behind get_current_user.
+
+    L1 is an in-process LocalCache, L2 is Redis (when available) so other
+    workers share the entry; both are read without blocking the event loop
+    (GET+TTL go in one pipeline on the redis.asyncio client). A hit only counts when the cached token_version matches
+    the token's "ver" claim. Entries are dropped after any committed change to
+    a cached column (deactivation, password reset, notif_prefs, ...); other
+    processes keep their L1 copy for at most AUTH_USER_CACHE_TTL seconds.
+    """
+
+    KEY_PREFIX = "auth:user:"
+
+    def __init__(self, ttl: int = None, max_entries: int = None):
+        self.ttl = ttl or settings.AUTH_USER_CACHE_TTL
+        self.local = LocalCache(max_entries or settings.AUTH_USER_CACHE_SIZE, self.ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _redis(self):
+        return cache_service.redis_client if cache_service.enabled else None
+
+    @staticmethod
+    def _snapshot(user: User) -> Dict[str, Any]:
+        state = inspect(user)
+        return {
+            column: copy.deepcopy(getattr(user, column))
+            for column in CACHED_COLUMNS
+            if column not in state.unloaded
+        }
+
+    @staticmethod
+    def _to_user(snapshot: Dict[str, Any]) -> User:
+        """Detached, clean User built from a snapshot (merge(load=False) attaches it without a SELECT)."""
+        user = User(**copy.deepcopy(snapshot))
+        make_transient_to_detached(user)
+        return user
+
+    @staticmethod
+    def _dumps(snapshot: Dict[str, Any]) -> str:
+        return json.dumps(snapshot, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+    @staticmethod
+    def _loads(raw: str) -> Dict[str, Any]:
+        snapshot = json.loads(raw)
+        snapshot["id"] = UUID(snapshot["id"])
+        for column in DATETIME_COLUMNS:
+            if snapshot.get(column):
+                snapshot[column] = datetime.fromisoformat(snapshot[column])
+        return snapshot
+
+    async def _l2_get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        client = cache_service._get_async_client()
+        if client is None:
+            return None
+        try:
+            key = self.KEY_PREFIX + user_id
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                raw, ttl = await pipe.execute()
+        except Exception as e:
+            cache_service._handle_error("reading user", e)
+            return None
+        if not raw:
+            return None
+        snapshot = self._loads(raw)
+        # Não guardar em memória por mais tempo do que resta no Redis
+        self.local.set(user_id, snapshot, ttl if ttl and ttl > 0 else None)
+        return snapshot
+
+    async def aget(self, user_id: str, token_version: int) -> Optional[User]:
+        """Cached active user for this id and token version, or None."""
+        user_id = str(user_id)
+        snapshot = self.local.get(user_id)
+        if snapshot is None:
+            snapshot = await self._l2_get(user_id)
+
+        if snapshot is None or snapshot.get("token_version", 0) != token_version or not snapshot.get("is_active"):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._to_user(snapshot)
+
+    async def aset(self, user: User):
+        snapshot = self._snapshot(user)
+        user_id = str(user.id)
+        self.local.set(user_id, snapshot)
+
+        client = cache_service._get_async_client()
+        if client is None:
+            return
+        try:
+            await client.setex(self.KEY_PREFIX + user_id, self.ttl, self._dumps(snapshot))
+        except Exception as e:
+            cache_service._handle_error("writing user", e)
+
+    def invalidate(self, user_id):
+        user_id = str(user_id)
+        self.local.delete(user_id)
+
+        redis_client = self._redis
+        if redis_client:
+            try:
+                redis_client.delete(self.KEY_PREFIX + user_id)
+            except Exception as e:
+                logger.warning(f"Error invalidating user cache in Redis: {e}")
+
+    async def ainvalidate(self, user_id):
+        user_id = str(user_id)
+        self.local.delete(user_id)
+
+        client = cache_service._get_async_client()
+        if client is None:
+            return
+        try:
+            await client.delete(self.KEY_PREFIX + user_id)
+        except Exception as e:
+            cache_service._handle_error("invalidating user", e)
+
+    def clear(self):
+        """Drop the in-process entries (tests)."""
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": self.local.stats()["entries"],
+        }
+
+
+user_cache = UserCache()
+
+
+def _changed_user_ids(session: Session) -> Set[UUID]:
+    user_ids = set()
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if any(state.attrs[column].history.has_changes() for column in INVALIDATING_COLUMNS):
+                user_ids.add(obj.id)
+    return user_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_users(session: Session, flush_context, instances):
+    user_ids = _changed_user_ids(session)
+    if user_ids:
+        session.info.setdefault("user_cache_invalidate", set()).update(user_ids)
+
+
+# DELETEs no Redis disparados por commits de AsyncSession (referência até terminarem)
+_pending_invalidations: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    """
+    Drop cached users only after the change is visible to other connections.
+    Commits of an AsyncSession run this hook on the event loop: L1 is dropped
+    right away and the Redis DELETE goes to a task instead of blocking the loop.
+    """
+    user_ids = session.info.pop("user_cache_invalidate", ())
+    if not user_ids:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    for user_id in user_ids:
+        if loop is None:
+            user_cache.invalidate(user_id)
+            continue
+        user_cache.local.delete(str(user_id))
+        task = loop.create_task(user_cache.ainvalidate(user_id))
+        _pending_invalidations.add(task)
+        task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop("user_cache_invalidate", None)
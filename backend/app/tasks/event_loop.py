@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Iterable, List, Optional
+
+from celery.signals import worker_process_shutdown  # type: ignore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One event loop per worker process. Created lazily so it is always built after
+# the prefork fork, and reused by every task that process runs.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return the persistent event loop for this worker process."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine on the worker's persistent loop.
+    Drop-in replacement for asyncio.run() inside Celery tasks: the loop (and the
+    pooled HTTP clients bound to it) survive between calls.
+    """
+    return get_worker_loop().run_until_complete(coro)
+
+
+async def gather_bounded(coros: Iterable[Awaitable[Any]], limit: Optional[int] = None) -> List[Any]:
+    """Await coroutines concurrently, at most `limit` at a time (EMAIL_SEND_CONCURRENCY by default)."""
+    semaphore = asyncio.Semaphore(limit or settings.EMAIL_SEND_CONCURRENCY)
+
+    async def _bounded(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(_bounded(coro) for coro in coros), return_exceptions=True)
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs):
+    """Close pooled HTTP/Redis connections and the loop when the worker process exits."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+
+    try:
+        from app.services.notification_service import notification_service
+        _loop.run_until_complete(notification_service.aclose())
+    except Exception as e:
+        logger.warning(f"Error closing notification HTTP client: {e}")
+    try:
+        from app.services.cache_service import cache_service
+        if cache_service.initialized:
+            _loop.run_until_complete(cache_service.aclose())
+    except Exception as e:
+        logger.warning(f"Error closing async Redis client: {e}")
+    finally:
+        _loop.close()
+        _loop = None
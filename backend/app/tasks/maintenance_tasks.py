@@ -0,0 +1,37 @@
+from celery import shared_task  # type: ignore
+from app.core.config import settings
+from app.db.database import engine
+from app.db.partitions import ensure_partitions, drop_expired_partitions
+from app.services.cache_service import cache_service
+from app.services.chatbot_quota import chatbot_quota
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="maintain_partitions")
+def maintain_partitions():
+    """
+    Create the upcoming monthly partitions of notifications/audit_logs and
+    drop (or archive, DATA_RETENTION_ARCHIVE) the ones past DATA_RETENTION_DAYS.
+    """
+    created = ensure_partitions(engine, settings.PARTITION_MONTHS_AHEAD)
+    removed = drop_expired_partitions(
+        engine,
+        settings.DATA_RETENTION_DAYS,
+        archive=settings.DATA_RETENTION_ARCHIVE,
+    )
+    logger.info(f"🗂️ Manutenção de partições: {len(created)} criadas, {len(removed)} expiradas")
+    return {"created": created, "removed": removed}
+
+
+@shared_task(name="flush_chatbot_quota")
+def flush_chatbot_quota():
+    """Copy the Redis chatbot message counters to users.notif_prefs."""
+    return {"flushed": chatbot_quota.flush(engine)}
+
+
+@shared_task(name="reap_chatbot_cache")
+def reap_chatbot_cache():
+    """Delete chatbot responses left behind by invalidated cache generations."""
+    return {"removed": cache_service.reap_stale_entries()}
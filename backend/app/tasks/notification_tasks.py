@@ -1,14 +1,16 @@
 from celery import shared_task  # type: ignore
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case, exists
 from app.db.database import SessionLocal
-from app.db.models import User, Bill, BillStatus, BillType, SavingsGoal, SavingsGoalStatus, Notification, NotificationType
+from app.db.models import User, Bill, BillStatus, BillType, SavingsGoal, SavingsGoalStatus, Notification, NotificationType, UserMonthlySummary
 from app.services.notification_service import notification_service
+from app.services.monthly_summary import summary_query, range_query, summarize, top_expense_categories
+from app.db.partitions import sent_since
+from app.tasks.event_loop import run_async, gather_bounded
 import logging
 from uuid import UUID
 from datetime import datetime, date, timedelta
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +34,7 @@ def schedule_reminder_task(user_id: str, bill_id: str, issuer: str, amount: floa
         due_date = datetime.fromisoformat(due_date_str).date()
         
         # Send reminder
-        import asyncio
-        asyncio.run(
+        run_async(
             notification_service.send_bill_reminder(
                 db=db,
                 user=user,
@@ -53,71 +54,93 @@ def schedule_reminder_task(user_id: str, bill_id: str, issuer: str, amount: floa
         db.close()
 
 
+def budget_alert_query(db: Session, today: date):
+    """
+    Query for (user, monthly_income, monthly_expenses) of every active user whose
+    paid/confirmed expenses this month exceed their income and who has not
+    received an ANOMALY notification today.
+
+    Everything is aggregated in one SQL pass over the user_monthly_summary rows
+    of the current month (anti-joined against today's alerts), so the cost grows
+    with the number of users instead of the total bill history.
+    """
+    month_start = today.replace(day=1)
+    today_start = datetime.combine(today, datetime.min.time())
+    
+    monthly_income = func.coalesce(
+        func.sum(case((UserMonthlySummary.type == BillType.INCOME, UserMonthlySummary.total), else_=0)), 0
+    )
+    monthly_expenses = func.coalesce(
+        func.sum(case((UserMonthlySummary.type == BillType.EXPENSE, UserMonthlySummary.total), else_=0)), 0
+    )
+    
+    totals = (
+        db.query(
+            UserMonthlySummary.user_id.label("user_id"),
+            monthly_income.label("monthly_income"),
+            monthly_expenses.label("monthly_expenses")
+        )
+        .filter(
+            UserMonthlySummary.month == month_start,
+            UserMonthlySummary.status.in_([BillStatus.PAID, BillStatus.CONFIRMED])
+        )
+        .group_by(UserMonthlySummary.user_id)
+        .having(monthly_income > 0, monthly_expenses > monthly_income)
+        .subquery()
+    )
+    
+    alerted_today = exists().where(
+        Notification.user_id == User.id,
+        Notification.type == NotificationType.ANOMALY,
+        sent_since(today_start)
+    )
+    
+    return (
+        db.query(User, totals.c.monthly_income, totals.c.monthly_expenses)
+        .join(totals, totals.c.user_id == User.id)
+        .filter(User.is_active == True, User.email_verified == True, ~alerted_today)
+    )
+
+
+def _budget_alert_candidates(db: Session, today: date):
+    """Rows of budget_alert_query: users over budget this month and not alerted today."""
+    return budget_alert_query(db, today).all()
+
+
 @shared_task(name="check_budget_alerts")
 def check_budget_alerts():
     """Check all users for budget exceeded alerts (runs daily)."""
     db: Session = SessionLocal()
     
     try:
-        users = db.query(User).filter(User.is_active == True, User.email_verified == True).all()
-        today = date.today()
-        current_month = today.month
-        current_year = today.year
+        candidates = _budget_alert_candidates(db, date.today())
+        logger.info(f"💸 {len(candidates)} users crossed the budget threshold today")
         
-        for user in users:
+        async def send_alert(user: User, monthly_income: float, monthly_expenses: float):
+            # Uma sessão por alerta: o commit (ou a falha) de um envio não mexe nos outros em andamento
+            alert_db: Session = SessionLocal()
             try:
-                # Get all bills for current month
-                user_bills = db.query(Bill).filter(
-                    Bill.user_id == user.id,
-                    Bill.due_date.isnot(None)
-                ).all()
-                
-                # Calculate monthly income and expenses
-                monthly_income = sum(
-                    b.amount for b in user_bills
-                    if b.due_date and b.due_date.month == current_month and b.due_date.year == current_year
-                    and b.type == BillType.INCOME and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-                ) or 0.0
-                
-                monthly_expenses = sum(
-                    b.amount for b in user_bills
-                    if b.due_date and b.due_date.month == current_month and b.due_date.year == current_year
-                    and b.type == BillType.EXPENSE and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-                ) or 0.0
+                monthly_income = float(monthly_income)
+                monthly_expenses = float(monthly_expenses)
+                percentage_used = (monthly_expenses / monthly_income * 100) if monthly_income > 0 else 0
                 
-                monthly_balance = monthly_income - monthly_expenses
-                
-                # Check if expenses exceed income
-                if monthly_income > 0 and monthly_expenses > monthly_income:
-                    percentage_over = ((monthly_expenses - monthly_income) / monthly_income) * 100
-                    
-                    # Check if we already sent this alert today
-                    from app.db.models import Notification, NotificationType
-                    today_start = datetime.combine(today, datetime.min.time())
-                    recent_alert = db.query(Notification).filter(
-                        Notification.user_id == user.id,
-                        Notification.type == NotificationType.ANOMALY,
-                        Notification.sent_at >= today_start
-                    ).first()
-                    
-                    if not recent_alert:
-                        # Send spending alert
-                        import asyncio
-                        percentage_used = (monthly_expenses / monthly_income * 100) if monthly_income > 0 else 0
-                        asyncio.run(
-                            notification_service.send_spending_alert(
-                                db=db,
-                                user=user,
-                                current_expenses=monthly_expenses,
-                                monthly_income=monthly_income,
-                                percentage_used=percentage_used
-                            )
-                        )
-                        logger.info(f"✅ Sent spending alert to user {user.id} ({percentage_used:.1f}% used)")
+                # Send spending alert
+                await notification_service.send_spending_alert(
+                    db=alert_db,
+                    user=user,
+                    current_expenses=monthly_expenses,
+                    monthly_income=monthly_income,
+                    percentage_used=percentage_used
+                )
+                logger.info(f"✅ Sent spending alert to user {user.id} ({percentage_used:.1f}% used)")
                         
             except Exception as e:
                 logger.error(f"Error checking budget for user {user.id}: {e}", exc_info=True)
-                continue
+            finally:
+                alert_db.close()
+        
+        # Alerts are independent, so send them concurrently (bounded) on the worker loop
+        run_async(gather_bounded(send_alert(*candidate) for candidate in candidates))
                 
     except Exception as e:
         logger.error(f"Error in check_budget_alerts: {e}", exc_info=True)
@@ -125,6 +148,26 @@ def check_budget_alerts():
         db.close()
 
 
+def upcoming_bills_query(db: Session, user_id: UUID, today: date):
+    """Open bills of the user due in the next 7 days, soonest first."""
+    return db.query(Bill).filter(
+        Bill.user_id == user_id,
+        Bill.status.in_([BillStatus.PENDING, BillStatus.CONFIRMED, BillStatus.SCHEDULED]),
+        Bill.due_date.isnot(None),
+        Bill.due_date >= today,
+        Bill.due_date <= today + timedelta(days=7)
+    ).order_by(Bill.due_date)
+
+
+def reminder_sent_query(db: Session, user_id: UUID, since: datetime):
+    """REMINDER notifications sent to the user since `since`."""
+    return db.query(Notification).filter(
+        Notification.user_id == user_id,
+        Notification.type == NotificationType.REMINDER,
+        sent_since(since)
+    )
+
+
 @shared_task(name="check_upcoming_payments")
 def check_upcoming_payments():
     """Check all users for upcoming payments (runs daily)."""
@@ -137,19 +180,13 @@ def check_upcoming_payments():
         for user in users:
             try:
                 # Get upcoming bills (next 7 days)
-                upcoming_bills_query = db.query(Bill).filter(
-                    Bill.user_id == user.id,
-                    Bill.status.in_([BillStatus.PENDING, BillStatus.CONFIRMED, BillStatus.SCHEDULED]),
-                    Bill.due_date.isnot(None),
-                    Bill.due_date >= today,
-                    Bill.due_date <= today + timedelta(days=7)
-                ).order_by(Bill.due_date).all()
+                bills = upcoming_bills_query(db, user.id, today).all()
                 
-                if not upcoming_bills_query:
+                if not bills:
                     continue
                 
                 upcoming_bills: List[Dict] = []
-                for bill in upcoming_bills_query:
+                for bill in bills:
                     days_until = (bill.due_date - today).days
                     upcoming_bills.append({
                         "issuer": bill.issuer or "Desconhecido",
@@ -160,17 +197,11 @@ def check_upcoming_payments():
                     })
                 
                 # Check if we already sent this alert today
-                from app.db.models import Notification, NotificationType
                 today_start = datetime.combine(today, datetime.min.time())
-                recent_alert = db.query(Notification).filter(
-                    Notification.user_id == user.id,
-                    Notification.type == NotificationType.REMINDER,
-                    Notification.sent_at >= today_start
-                ).first()
+                recent_alert = reminder_sent_query(db, user.id, today_start).first()
                 
                 if not recent_alert and upcoming_bills:
-                    import asyncio
-                    asyncio.run(
+                    run_async(
                         notification_service.send_upcoming_payments_alert(
                             db=db,
                             user=user,
@@ -221,7 +252,7 @@ def check_savings_goals_reminders():
                         recent_notifications = db.query(Notification).filter(
                             Notification.user_id == user.id,
                             Notification.type == NotificationType.SAVINGS_GOAL_REMINDER,
-                            Notification.sent_at >= today_start
+                            sent_since(today_start)
                         ).all()
                         
                         # Check if any notification is for this goal
@@ -232,8 +263,7 @@ def check_savings_goals_reminders():
                                 break
                         
                         if not recent_notification:
-                            import asyncio
-                            asyncio.run(
+                            run_async(
                                 notification_service.send_savings_goal_reminder(
                                     db=db,
                                     user=user,
@@ -255,7 +285,7 @@ def check_savings_goals_reminders():
                         recent_deadline_notifications = db.query(Notification).filter(
                             Notification.user_id == user.id,
                             Notification.type == NotificationType.SAVINGS_GOAL_DEADLINE,
-                            Notification.sent_at >= today_start
+                            sent_since(today_start)
                         ).all()
                         
                         # Check if any notification is for this goal
@@ -266,8 +296,7 @@ def check_savings_goals_reminders():
                                 break
                         
                         if not recent_deadline_notification:
-                            import asyncio
-                            asyncio.run(
+                            run_async(
                                 notification_service.send_savings_goal_reminder(
                                     db=db,
                                     user=user,
@@ -292,163 +321,461 @@ def check_savings_goals_reminders():
         db.close()
 
 
-@shared_task(name="send_monthly_reports")
-def send_monthly_reports():
-    """Send monthly financial reports to all users (runs on the 1st of each month)."""
-    db: Session = SessionLocal()
-    
-    try:
-        today = date.today()
-        
-        # Calculate previous month
-        if today.month == 1:
-            report_month = 12
-            report_year = today.year - 1
-        else:
-            report_month = today.month - 1
-            report_year = today.year
-        
-        # Get all active and verified users
-        users = db.query(User).filter(
+# Number of users handled by each report chunk task. Small enough that a chunk
+# fits comfortably under task_soft_time_limit even with slow SMTP round-trips.
+REPORT_CHUNK_SIZE = 100
+
+# Wall-clock budget per chunk (seconds). Users not started by then are re-queued
+# as a fresh chunk instead of racing task_soft_time_limit (240s).
+REPORT_CHUNK_TIME_BUDGET = 180
+
+# Reports claimed and sent per round inside a chunk. A crash mid-round leaves
+# at most this many claims unconfirmed (never sent again).
+REPORT_SEND_BATCH_SIZE = 25
+
+# Passes a user gets before the chunk gives up on them (counted as failed), so a
+# report that always runs out of time is not re-queued forever.
+REPORT_MAX_ATTEMPTS = 3
+
+REPORT_STATS = ("sent", "skipped", "failed", "unconfirmed", "requeued")
+
+def _iter_user_id_chunks(db: Session, chunk_size: int = REPORT_CHUNK_SIZE, *criteria):
+    """
+    Yield active/verified user ids in chunks using keyset pagination on users.id,
+    so every page is an index range scan regardless of how many users exist.
+    """
+    last_id = None
+    while True:
+        query = db.query(User.id).filter(
             User.is_active == True,
-            User.email_verified == True
-        ).all()
+            User.email_verified == True,
+            *criteria
+        )
+        if last_id is not None:
+            query = query.filter(User.id > last_id)
         
-        logger.info(f"📊 Sending monthly reports for {report_month}/{report_year} to {len(users)} users")
+        ids = [row.id for row in query.order_by(User.id).limit(chunk_size).all()]
+        if not ids:
+            return
         
-        for user in users:
+        yield [str(user_id) for user_id in ids]
+        last_id = ids[-1]
+
+
+def _dispatch_report_chunks(report_type: str, chunk_task, *args, criteria=()) -> Dict:
+    """
+    Fan out one chunk task per block of users as a Celery chord. The chord callback
+    (report_run_summary) aggregates the per-chunk stats once every chunk finishes;
+    a chunk that re-queues users replaces itself in the chord, so the summary also
+    covers the later passes.
+    """
+    from celery import chord  # type: ignore
+    
+    db: Session = SessionLocal()
+    try:
+        signatures = [
+            chunk_task.s(user_ids, *args)
+            for user_ids in _iter_user_id_chunks(db, REPORT_CHUNK_SIZE, *criteria)
+        ]
+    finally:
+        db.close()
+    
+    if not signatures:
+        logger.info(f"📊 No users eligible for {report_type} reports")
+        return {"report_type": report_type, "chunks": 0}
+    
+    result = chord(signatures)(report_run_summary.s(report_type))
+    logger.info(f"📊 Dispatched {len(signatures)} {report_type} report chunks (chord {result.id})")
+    return {"report_type": report_type, "chunks": len(signatures), "chord_id": result.id}
+
+
+def _run_report_chunk(
+    task,
+    report_type: str,
+    user_ids: List[str],
+    build_for_user,
+    *args,
+    attempt: int = 1,
+    carried: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
+    """
+    Send a report to each user in the chunk, reporting progress via task state.
+    
+    The reports are built one user at a time on the chunk's Session, then sent
+    in rounds of REPORT_SEND_BATCH_SIZE. Each round first commits a "pending"
+    report notification per user (the claim _report_already_sent looks for),
+    sends the round through notification_service.send_emails_bulk and marks the
+    claims sent or failed. Once its claim is committed a user is never re-queued
+    nor sent the report again: if the send is cut short (soft time limit),
+    Brevo's answer is lost or the final commit fails, the claim stays "pending"
+    and the user counts as unconfirmed.
+    
+    Users not claimed when the time budget (or the soft time limit) runs out go
+    to a new pass of the chunk, which replaces this task in the chord and carries
+    the stats so far (`carried`); after REPORT_MAX_ATTEMPTS passes they count as
+    failed instead.
+    """
+    import time
+    from celery.exceptions import SoftTimeLimitExceeded  # type: ignore
+    
+    stats = dict.fromkeys(REPORT_STATS, 0)
+    done = set()
+    claimed = set()
+    started_at = time.monotonic()
+    db: Session = SessionLocal()
+    
+    def finish(user_id: str, outcome: str):
+        stats[outcome] += 1
+        done.add(user_id)
+        task.update_state(state="PROGRESS", meta={"done": len(done), "total": len(user_ids), **stats})
+    
+    try:
+        outbox = []
+        for user_id in user_ids:
+            if time.monotonic() - started_at > REPORT_CHUNK_TIME_BUDGET:
+                break  # Left out of `done`, re-queued below
             try:
-                # Get all bills for the report month
-                user_bills = db.query(Bill).filter(
-                    Bill.user_id == user.id,
-                    Bill.due_date.isnot(None),
-                    func.extract('month', Bill.due_date) == report_month,
-                    func.extract('year', Bill.due_date) == report_year
-                ).all()
-                
-                # Calculate totals
-                total_income = sum(
-                    float(b.amount) for b in user_bills
-                    if b.type == BillType.INCOME and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-                ) or 0.0
-                
-                total_expenses = sum(
-                    float(b.amount) for b in user_bills
-                    if b.type == BillType.EXPENSE and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-                ) or 0.0
-                
-                balance = total_income - total_expenses
-                
-                # Count bills by status
-                bills_paid = len([b for b in user_bills if b.status == BillStatus.PAID])
-                bills_pending = len([b for b in user_bills if b.status in [BillStatus.PENDING, BillStatus.CONFIRMED, BillStatus.SCHEDULED]])
-                bills_overdue = len([b for b in user_bills if b.status == BillStatus.OVERDUE])
-                
-                # Top categories
-                category_totals = defaultdict(float)
-                for bill in user_bills:
-                    if bill.type == BillType.EXPENSE and bill.category:
-                        category_totals[bill.category] += float(bill.amount or 0)
-                
-                top_categories = [
-                    {"name": cat, "total": total}
-                    for cat, total in sorted(category_totals.items(), key=lambda x: x[1], reverse=True)[:5]
-                ]
-                
-                # Savings goals progress
-                active_goals = db.query(SavingsGoal).filter(
-                    SavingsGoal.user_id == user.id,
-                    SavingsGoal.status == SavingsGoalStatus.ACTIVE
-                ).all()
-                
-                savings_goals_progress = [
-                    {
-                        "name": goal.name,
-                        "current": float(goal.current_amount),
-                        "target": float(goal.target_amount),
-                        "progress": (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
-                    }
-                    for goal in active_goals[:3]
-                ]
-                
-                # Comparison with previous month
-                if report_month == 1:
-                    prev_month = 12
-                    prev_year = report_year - 1
-                else:
-                    prev_month = report_month - 1
-                    prev_year = report_year
-                
-                prev_month_bills = db.query(Bill).filter(
-                    Bill.user_id == user.id,
-                    Bill.due_date.isnot(None),
-                    func.extract('month', Bill.due_date) == prev_month,
-                    func.extract('year', Bill.due_date) == prev_year
-                ).all()
-                
-                prev_income = sum(
-                    float(b.amount) for b in prev_month_bills
-                    if b.type == BillType.INCOME and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-                ) or 0.0
-                
-                prev_expenses = sum(
-                    float(b.amount) for b in prev_month_bills
-                    if b.type == BillType.EXPENSE and b.status in [BillStatus.PAID, BillStatus.CONFIRMED]
-                ) or 0.0
-                
-                income_change_percent = ((total_income - prev_income) / prev_income * 100) if prev_income > 0 else 0.0
-                expenses_change_percent = ((total_expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0.0
-                
-                comparison_previous = {
-                    "income_change_percent": income_change_percent,
-                    "expenses_change_percent": expenses_change_percent
-                }
-                
-                # Check if we already sent this report (check last 7 days to avoid duplicates)
-                check_start = today - timedelta(days=7)
-                recent_report = db.query(Notification).filter(
-                    Notification.user_id == user.id,
-                    Notification.type == NotificationType.RECONCILIATION,
-                    Notification.sent_at >= check_start
-                ).first()
-                
-                if not recent_report:
-                    monthly_data = {
-                        "total_income": total_income,
-                        "total_expenses": total_expenses,
-                        "balance": balance,
-                        "bills_paid": bills_paid,
-                        "bills_pending": bills_pending,
-                        "bills_overdue": bills_overdue,
-                        "top_categories": top_categories,
-                        "savings_goals_progress": savings_goals_progress,
-                        "comparison_previous": comparison_previous
-                    }
-                    
-                    import asyncio
-                    sent = asyncio.run(
-                        notification_service.send_monthly_report(
-                            db=db,
-                            user=user,
-                            report_month=report_month,
-                            report_year=report_year,
-                            monthly_data=monthly_data
-                        )
-                    )
-                    
-                    if sent:
-                        logger.info(f"✅ Sent monthly report to user {user.id} ({user.email}) for {report_month}/{report_year}")
-                    else:
-                        logger.warning(f"⚠️ Failed to send monthly report to user {user.id} ({user.email})")
-                else:
-                    logger.info(f"⏭️ Monthly report already sent to user {user.id} for {report_month}/{report_year}, skipping")
-                    
+                user = db.query(User).filter(User.id == UUID(user_id)).first()
+                message = build_for_user(db, user, *args) if user else None
+            except SoftTimeLimitExceeded:
+                raise
             except Exception as e:
-                logger.error(f"Error sending monthly report to user {user.id}: {e}", exc_info=True)
+                logger.error(f"Error building {report_type} report for user {user_id}: {e}", exc_info=True)
+                db.rollback()
+                finish(user_id, "failed")
                 continue
-                
-    except Exception as e:
-        logger.error(f"Error in send_monthly_reports: {e}", exc_info=True)
+            
+            if message is None:
+                finish(user_id, "skipped")
+            else:
+                outbox.append((user_id, user, message))
+        
+        for start in range(0, len(outbox), REPORT_SEND_BATCH_SIZE):
+            if time.monotonic() - started_at > REPORT_CHUNK_TIME_BUDGET:
+                break
+            batch = outbox[start:start + REPORT_SEND_BATCH_SIZE]
+            
+            claimed_at = datetime.utcnow()
+            claims = [notification_service.report_notification(user, message["payload"], status="pending")
+                      for _, user, message in batch]
+            claim_ids = [claim.id for claim in claims]
+            db.add_all(claims)
+            try:
+                db.commit()
+            except Exception as e:
+                # Nada foi enviado nesta rodada: os usuários voltam para a fila
+                logger.error(f"Error claiming {report_type} reports: {e}", exc_info=True)
+                db.rollback()
+                break
+            claimed.update(user_id for user_id, _, _ in batch)
+            
+            try:
+                results = run_async(notification_service.send_emails_bulk([message for _, _, message in batch]))
+            except SoftTimeLimitExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"Error sending {report_type} reports: {e}", exc_info=True)
+                results = [None] * len(batch)
+            
+            sent_ids = [claim_id for claim_id, sent in zip(claim_ids, results) if sent is True]
+            failed_ids = [claim_id for claim_id, sent in zip(claim_ids, results) if sent is False]
+            try:
+                for ids, values in ((sent_ids, {"status": "sent", "sent_at": datetime.utcnow()}), (failed_ids, {"status": "failed"})):
+                    if ids:
+                        db.query(Notification).filter(
+                            Notification.id.in_(ids), sent_since(claimed_at)
+                        ).update(values, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                # Os emails já saíram: os avisos ficam "pending", o que ainda impede o reenvio
+                logger.error(f"Error logging {report_type} report notifications: {e}", exc_info=True)
+                db.rollback()
+                results = [None] * len(batch)
+            
+            for (user_id, _, _), sent in zip(batch, results):
+                finish(user_id, "unconfirmed" if sent is None else "sent" if sent else "failed")
+            logger.info(f"✅ Sent {len(sent_ids)}/{len(batch)} {report_type} reports in round")
+    except SoftTimeLimitExceeded:
+        logger.warning("⏱️ Report chunk hit soft time limit")
+        for user_id in claimed - done:
+            finish(user_id, "unconfirmed")
     finally:
         db.close()
+    
+    remaining = [user_id for user_id in user_ids if user_id not in done]
+    if remaining and attempt >= REPORT_MAX_ATTEMPTS:
+        logger.error(f"❌ Giving up on {len(remaining)} users of {report_type} report chunk after {attempt} attempts")
+        stats["failed"] += len(remaining)
+        remaining = []
+    
+    totals = {key: (carried or {}).get(key, 0) + stats[key] for key in REPORT_STATS}
+    if remaining:
+        logger.warning(f"⏱️ Re-queueing {len(remaining)} users from report chunk (attempt {attempt + 1})")
+        totals["requeued"] += len(remaining)
+        # Substitui esta task no chord: o report_run_summary recebe o resultado da última passada
+        return task.replace(task.s(remaining, *args, attempt=attempt + 1, carried=totals))
+    
+    return totals
+
+
+def report_sent_query(db: Session, user_id: UUID, since: datetime, **payload_match):
+    """RECONCILIATION (report) notifications with this payload sent since `since`, failed ones excluded."""
+    query = db.query(Notification.id).filter(
+        Notification.user_id == user_id,
+        Notification.type == NotificationType.RECONCILIATION,
+        Notification.status.is_distinct_from("failed"),
+        sent_since(since)
+    )
+    for key, value in payload_match.items():
+        query = query.filter(Notification.payload[key].astext == str(value))
+    return query
+
+
+def _report_already_sent(db: Session, user: User, since: datetime, **payload_match) -> bool:
+    """
+    Check whether a RECONCILIATION (report) notification with this payload was
+    sent since `since`. Pending claims count as sent: the email may have gone out.
+    """
+    return report_sent_query(db, user.id, since, **payload_match).first() is not None
 
+
+def _month_summary(db: Session, user: User, month_start: date):
+    """Totals for one month, read from the user_monthly_summary rollup."""
+    return summarize(db.execute(summary_query(user.id, month_start, month_start)).all())
+
+
+def _range_summary(db: Session, user: User, start: date, end: date):
+    """Totals for bills due between start and end (inclusive), aggregated in SQL."""
+    return summarize(db.execute(range_query(user.id, start, end)).all())
+
+
+@shared_task(name="report_run_summary")
+def report_run_summary(chunk_results: List[Dict[str, int]], report_type: str) -> Dict[str, int]:
+    """Chord callback: aggregate per-chunk stats for a report run."""
+    totals = dict.fromkeys(REPORT_STATS, 0)
+    for chunk_stats in chunk_results or []:
+        for key in totals:
+            totals[key] += (chunk_stats or {}).get(key, 0)
+    
+    logger.info(
+        f"📊 {report_type} reports finished: {totals['sent']} sent, {totals['skipped']} skipped, "
+        f"{totals['failed']} failed, {totals['unconfirmed']} unconfirmed, {totals['requeued']} re-queued"
+    )
+    return totals
+
+
+def _build_monthly_report_for_user(db: Session, user: User, report_month: int, report_year: int) -> Optional[Dict]:
+    """Monthly report email for one user, or None to skip them (already sent or email off)."""
+    today = date.today()
+    
+    # Check if we already sent this report (check last 7 days to avoid duplicates)
+    check_start = datetime.combine(today - timedelta(days=7), datetime.min.time())
+    if _report_already_sent(db, user, check_start, report_month=report_month, report_year=report_year):
+        logger.info(f"⏭️ Monthly report already sent to user {user.id} for {report_month}/{report_year}, skipping")
+        return None
+    
+    # Totals for the report month (rollup)
+    month_start = date(report_year, report_month, 1)
+    summary = _month_summary(db, user, month_start)
+    
+    # Calculate totals
+    total_income, total_expenses = summary["income"], summary["expenses"]
+    balance = total_income - total_expenses
+    
+    # Count bills by status
+    status_counts = summary["status_counts"]
+    bills_paid = status_counts[BillStatus.PAID]
+    bills_pending = sum(status_counts[s] for s in [BillStatus.PENDING, BillStatus.CONFIRMED, BillStatus.SCHEDULED])
+    bills_overdue = status_counts[BillStatus.OVERDUE]
+    
+    # Top categories
+    top_categories = top_expense_categories(summary)
+    
+    # Savings goals progress
+    active_goals = db.query(SavingsGoal).filter(
+        SavingsGoal.user_id == user.id,
+        SavingsGoal.status == SavingsGoalStatus.ACTIVE
+    ).limit(3).all()
+    
+    savings_goals_progress = [
+        {
+            "name": goal.name,
+            "current": float(goal.current_amount),
+            "target": float(goal.target_amount),
+            "progress": (goal.current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
+        }
+        for goal in active_goals
+    ]
+    
+    # Comparison with previous month
+    prev_month_end = month_start - timedelta(days=1)
+    prev_summary = _month_summary(db, user, prev_month_end.replace(day=1))
+    prev_income, prev_expenses = prev_summary["income"], prev_summary["expenses"]
+    
+    income_change_percent = ((total_income - prev_income) / prev_income * 100) if prev_income > 0 else 0.0
+    expenses_change_percent = ((total_expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0.0
+    
+    monthly_data = {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "balance": balance,
+        "bills_paid": bills_paid,
+        "bills_pending": bills_pending,
+        "bills_overdue": bills_overdue,
+        "top_categories": top_categories,
+        "savings_goals_progress": savings_goals_progress,
+        "comparison_previous": {
+            "income_change_percent": income_change_percent,
+            "expenses_change_percent": expenses_change_percent
+        }
+    }
+    
+    return notification_service.build_monthly_report(
+        user=user,
+        report_month=report_month,
+        report_year=report_year,
+        monthly_data=monthly_data
+    )
+
+
+def _build_weekly_report_for_user(db: Session, user: User, week_start_str: str, week_end_str: str) -> Optional[Dict]:
+    """Weekly report email for one user, or None to skip them (already sent or email off)."""
+    week_start = date.fromisoformat(week_start_str)
+    week_end = date.fromisoformat(week_end_str)
+    
+    check_start = datetime.combine(week_end, datetime.min.time())
+    if _report_already_sent(db, user, check_start, report_type="weekly", week_start=week_start_str):
+        logger.info(f"⏭️ Weekly report already sent to user {user.id} for {week_start_str}, skipping")
+        return None
+    
+    week_summary = _range_summary(db, user, week_start, week_end)
+    total_income, total_expenses = week_summary["income"], week_summary["expenses"]
+    
+    prev_summary = _range_summary(db, user, week_start - timedelta(days=7), week_start - timedelta(days=1))
+    prev_income, prev_expenses = prev_summary["income"], prev_summary["expenses"]
+    
+    weekly_data = {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "balance": total_income - total_expenses,
+        "top_categories": top_expense_categories(week_summary),
+        "comparison_previous": {
+            "income_change_percent": ((total_income - prev_income) / prev_income * 100) if prev_income > 0 else 0.0,
+            "expenses_change_percent": ((total_expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0.0
+        }
+    }
+    
+    return notification_service.build_weekly_report(
+        user=user,
+        week_start=week_start,
+        week_end=week_end,
+        weekly_data=weekly_data
+    )
+
+
+def _build_daily_report_for_user(db: Session, user: User, report_date_str: str) -> Optional[Dict]:
+    """Daily (premium) report email for one user, or None to skip them."""
+    report_date = date.fromisoformat(report_date_str)
+    
+    check_start = datetime.combine(report_date, datetime.min.time())
+    if _report_already_sent(db, user, check_start, report_type="daily", report_date=report_date_str):
+        logger.info(f"⏭️ Daily report already sent to user {user.id} for {report_date_str}, skipping")
+        return None
+    
+    day_summary = _range_summary(db, user, report_date, report_date)
+    total_income, total_expenses = day_summary["income"], day_summary["expenses"]
+    
+    daily_data = {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "balance": total_income - total_expenses,
+        "transactions_count": day_summary["count"],
+        "top_categories": top_expense_categories(day_summary)
+    }
+    
+    return notification_service.build_daily_report(
+        user=user,
+        report_date=report_date,
+        daily_data=daily_data
+    )
+
+
+@shared_task(name="send_monthly_reports_chunk", bind=True)
+def send_monthly_reports_chunk(
+    self, user_ids: List[str], report_month: int, report_year: int,
+    attempt: int = 1, carried: Optional[Dict[str, int]] = None
+):
+    """Send monthly reports to one chunk of users."""
+    return _run_report_chunk(
+        self, "monthly", user_ids, _build_monthly_report_for_user, report_month, report_year,
+        attempt=attempt, carried=carried
+    )
+
+
+@shared_task(name="send_weekly_reports_chunk", bind=True)
+def send_weekly_reports_chunk(
+    self, user_ids: List[str], week_start: str, week_end: str,
+    attempt: int = 1, carried: Optional[Dict[str, int]] = None
+):
+    """Send weekly reports to one chunk of users."""
+    return _run_report_chunk(
+        self, "weekly", user_ids, _build_weekly_report_for_user, week_start, week_end,
+        attempt=attempt, carried=carried
+    )
+
+
+@shared_task(name="send_daily_reports_chunk", bind=True)
+def send_daily_reports_chunk(
+    self, user_ids: List[str], report_date: str,
+    attempt: int = 1, carried: Optional[Dict[str, int]] = None
+):
+    """Send daily reports to one chunk of users."""
+    return _run_report_chunk(
+        self, "daily", user_ids, _build_daily_report_for_user, report_date,
+        attempt=attempt, carried=carried
+    )
+
+
+@shared_task(name="send_monthly_reports")
+def send_monthly_reports():
+    """Dispatch monthly financial reports to all users (runs on the 1st of each month)."""
+    today = date.today()
+    
+    # Calculate previous month
+    if today.month == 1:
+        report_month = 12
+        report_year = today.year - 1
+    else:
+        report_month = today.month - 1
+        report_year = today.year
+    
+    logger.info(f"📊 Dispatching monthly reports for {report_month}/{report_year}")
+    return _dispatch_report_chunks("monthly", send_monthly_reports_chunk, report_month, report_year)
+
+
+@shared_task(name="send_weekly_reports")
+def send_weekly_reports():
+    """Dispatch weekly financial reports for the previous Monday-Sunday week (runs every Monday)."""
+    today = date.today()
+    week_end = today - timedelta(days=today.weekday() + 1)
+    week_start = week_end - timedelta(days=6)
+    
+    logger.info(f"📅 Dispatching weekly reports for {week_start.isoformat()} - {week_end.isoformat()}")
+    return _dispatch_report_chunks("weekly", send_weekly_reports_chunk, week_start.isoformat(), week_end.isoformat())
+
+
+@shared_task(name="send_daily_reports")
+def send_daily_reports():
+    """Dispatch daily reports for yesterday to premium users (runs daily)."""
+    report_date = date.today() - timedelta(days=1)
+    
+    logger.info(f"📊 Dispatching daily reports for {report_date.isoformat()}")
+    return _dispatch_report_chunks(
+        "daily",
+        send_daily_reports_chunk,
+        report_date.isoformat(),
+        criteria=(
+            User.notif_prefs["is_premium"].as_boolean() == True,
+            User.notif_prefs["daily_report_enabled"].as_boolean() == True,
+        )
+    )
@@ -0,0 +1,82 @@
+"""
+Script para comparar requisições/s com a sessão síncrona (SessionLocal) e a
+assíncrona (AsyncSessionLocal + asyncpg) dentro de endpoints async.
+Cada requisição faz a listagem de bills de um usuário e um pg_sleep curto
+simulando uma query lenta; com a sessão síncrona o event loop fica bloqueado.
+Uso: python scripts/benchmark_async_db.py [requisicoes] [concorrencia] [atraso_ms]
+"""
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.database import async_engine, engine, get_async_db, get_db
+from app.db.models import Bill
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USER_ID = uuid.uuid4()  # Usuário sem bills: mede o custo da ida ao banco, não do volume
+
+
+def build_app(delay: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_endpoint(db: Session = Depends(get_db)):
+        db.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+        return {"bills": len(db.query(Bill).filter(Bill.user_id == USER_ID).all())}
+
+    @app.get("/async")
+    async def async_endpoint(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(text("SELECT pg_sleep(:delay)"), {"delay": delay})
+        result = await db.execute(select(Bill).where(Bill.user_id == USER_ID))
+        return {"bills": len(result.scalars().all())}
+
+    return app
+
+
+async def run(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    await client.get(path)  # aquecer o pool de conexões
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, concurrency: int, delay_ms: int):
+    app = build_app(delay_ms / 1000)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        logger.info(f"Benchmark: {requests} requisições, concorrência {concurrency}, query de {delay_ms}ms")
+        sync_rps = await run(client, "/sync", requests, concurrency)
+        async_rps = await run(client, "/async", requests, concurrency)
+
+    logger.info(f"Sessão síncrona:   {sync_rps:>8.1f} req/s")
+    logger.info(f"Sessão assíncrona: {async_rps:>8.1f} req/s ({async_rps / sync_rps:.1f}x)")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    defaults = [500, 20, 20]
+    asyncio.run(main(*(args + defaults[len(args):])))
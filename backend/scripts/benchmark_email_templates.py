@@ -0,0 +1,78 @@
+"""
+Script para medir o custo de renderização dos templates de email.
+Compara o template compilado (cache) com a leitura + replace por envio.
+Uso: python scripts/benchmark_email_templates.py [iteracoes]
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.email_templates import email_templates
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_CONTEXT = {
+    "frontend_url": "http://localhost:3000",
+    "name": "Usuário Teste",
+    "verification_link": "http://localhost:3000/verify-email?token=abc123",
+    "month_name": "Março",
+    "report_year": 2025,
+    "report_date": "15/03/2025",
+    "period": "10/03/2025 a 16/03/2025",
+    "total_income": "5,000.00",
+    "total_expenses": "3,250.75",
+    "balance_abs": "1,749.25",
+    "balance_color": "#059669",
+    "balance_icon": "📈",
+    "balance_text": "Superávit",
+    "bills_paid": 8,
+    "bills_pending": 2,
+    "bills_overdue": 1,
+    "transactions_count": 5,
+    "income_change": "",
+    "expenses_change": "",
+    "categories_section": "",
+    "goals_section": "",
+    "insights": "<li>Você economizou <strong>R$ 1,749.25</strong> este mês! Continue assim! 🎉</li>",
+}
+
+TEMPLATES = ["report_monthly", "report_weekly", "report_daily", "email_welcome", "email_verification"]
+
+
+def legacy_render(template_name: str):
+    """Per-send rendering as done before the cache: read the file and replace each placeholder."""
+    path = email_templates.templates_dir / f"{template_name}.html"
+
+    def render(context):
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        for key, value in context.items():
+            html = html.replace('{{' + key + '}}', str(value))
+        return html
+
+    return render
+
+
+def main(iterations: int):
+    logger.info(f"Benchmark de templates de email ({iterations} renderizações cada)")
+    for template_name in TEMPLATES:
+        if not email_templates.exists(template_name):
+            logger.warning(f"Template {template_name} não encontrado, pulando")
+            continue
+        result = email_templates.benchmark(
+            template_name, SAMPLE_CONTEXT, iterations, legacy_render=legacy_render(template_name)
+        )
+        speedup = result["legacy_render_us"] / result["render_us"] if result["render_us"] else 0
+        logger.info(
+            f"{template_name:<20} compile={result['compile_us']:>9.1f}µs "
+            f"render={result['render_us']:>7.1f}µs legacy={result['legacy_render_us']:>7.1f}µs "
+            f"({speedup:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
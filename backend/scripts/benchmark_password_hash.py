@@ -0,0 +1,75 @@
+"""
+Script para escolher os parâmetros do Argon2id deste deploy: mede o tempo de
+um hash para cada combinação de memória/iterações e sugere a mais forte que
+fica dentro do tempo alvo, com a vazão de logins esperada para o número de
+workers configurado (PASSWORD_HASH_WORKERS).
+Uso: python scripts/benchmark_password_hash.py [alvo_ms] [repeticoes]
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from argon2 import PasswordHasher
+from app.core.config import settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Começa no mínimo recomendado pela OWASP para Argon2id (19 MiB, t=2, p=1)
+MEMORY_COSTS = [19456, 32768, 47104, 65536, 131072]  # KiB
+TIME_COSTS = [1, 2, 3, 4]
+PARALLELISM = [1, 2, 4]
+
+
+def measure(hasher: PasswordHasher, repetitions: int) -> float:
+    """Median ms of one hash + one verify (what a register + login costs)."""
+    samples = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        hashed = hasher.hash("benchmark-password")
+        hasher.verify(hashed, "benchmark-password")
+        samples.append((time.perf_counter() - started) * 1000 / 2)
+    return statistics.median(samples)
+
+
+def main(target_ms: int, repetitions: int) -> int:
+    workers = max(settings.PASSWORD_HASH_WORKERS, 1)
+    logger.info(f"Alvo: {target_ms}ms por hash, {workers} worker(s), {repetitions} repetições")
+
+    results = []
+    for memory_cost in MEMORY_COSTS:
+        for time_cost in TIME_COSTS:
+            if time_cost == 1 and memory_cost < 47104:
+                continue  # t=1 só com memória alta (recomendação OWASP)
+            for parallelism in PARALLELISM:
+                hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+                elapsed_ms = measure(hasher, repetitions)
+                results.append((memory_cost, time_cost, parallelism, elapsed_ms))
+                logger.info(
+                    f"m={memory_cost:>6} KiB t={time_cost} p={parallelism}: {elapsed_ms:7.1f}ms "
+                    f"(~{workers * 1000 / elapsed_ms:.0f} logins/s)"
+                )
+
+    within_target = [r for r in results if r[3] <= target_ms]
+    if not within_target:
+        logger.error("❌ Nenhuma combinação ficou dentro do alvo; use a mais barata ou aumente o alvo")
+        return 1
+
+    # Mais forte = mais memória x iterações; empate decidido pelo menor tempo
+    memory_cost, time_cost, parallelism, elapsed_ms = max(within_target, key=lambda r: (r[0] * r[1], -r[3]))
+    logger.info(f"✅ Sugestão ({elapsed_ms:.1f}ms por hash, ~{workers * 1000 / elapsed_ms:.0f} logins/s):")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_PARALLELISM={parallelism}")
+    return 0
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    defaults = [250, 5]
+    sys.exit(main(*(args + defaults[len(args):])))
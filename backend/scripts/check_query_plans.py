@@ -0,0 +1,36 @@
+"""
+Verifica com EXPLAIN que as consultas por usuário usam os índices compostos.
+Uso: python scripts/check_query_plans.py  (retorna código 1 se houver Seq Scan)
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.database import SessionLocal
+from app.db.query_plans import find_seq_scans, representative_queries
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        names = list(representative_queries(db))
+        offenders = find_seq_scans(db)
+    finally:
+        db.close()
+
+    for name in names:
+        if name in offenders:
+            logger.error(f"❌ {name}: Seq Scan em {', '.join(offenders[name])}")
+        else:
+            logger.info(f"✅ {name}: usa índice")
+    return 1 if offenders else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
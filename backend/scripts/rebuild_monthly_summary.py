@@ -0,0 +1,32 @@
+"""
+Reconstrói a tabela user_monthly_summary a partir de bills (todos os usuários
+ou apenas um). Útil depois de correções manuais direto no banco.
+Uso: python scripts/rebuild_monthly_summary.py [user_id]
+"""
+import sys
+from pathlib import Path
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.database import SessionLocal
+from app.services.monthly_summary import rebuild
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    user_id = UUID(sys.argv[1]) if len(sys.argv) > 1 else None
+    db = SessionLocal()
+    try:
+        rebuild(db, user_id)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def async_session_factory():
+    """
+    Async sessions for the API tests without a connection pool: TestClient
+    runs each request in its own event loop, and asyncpg connections only
+    work in the loop that opened them.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from app.db.database import async_engine
+
+    engine = create_async_engine(async_engine.url, poolclass=NullPool)
+    yield async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def async_db_override(async_session_factory):
+    """Route get_async_db of the app to the test database sessions."""
+    from app.db.database import get_async_db
+    from app.main import app
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
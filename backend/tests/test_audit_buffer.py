@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+
+from app.services.audit_buffer import AuditBuffer
+from app.services.audit_service import AuditService
+
+
+class FakeBind:
+    """Records the batches that would be sent to audit_logs."""
+
+    def __init__(self, fail: bool = False, reject: str = None):
+        self.batches = []
+        self.fail = fail
+        self.reject = reject
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    @contextmanager
+    def connect(self):
+        if self.fail:
+            raise ConnectionError("database down")
+        yield self
+
+    def exec_driver_sql(self, sql):
+        return None
+
+    def execute(self, statement, rows):
+        if self.fail:
+            raise ConnectionError("database down")
+        if any(row["action"] == self.reject for row in rows):
+            raise ValueError("violates foreign key constraint")
+        self.batches.append(list(rows))
+
+
+def _entry(action: str):
+    return AuditService._build_entry("bill", action)
+
+
+def test_entries_are_written_in_batches_on_close():
+    bind = FakeBind()
+    buffer = AuditBuffer(bind=bind, batch_size=2, flush_interval=60, max_entries=100)
+    for action in ("create", "confirm", "delete"):
+        buffer.add(_entry(action))
+
+    buffer.close()
+
+    assert [[row["action"] for row in batch] for batch in bind.batches] == [["create", "confirm"], ["delete"]]
+    assert buffer.stats()["buffered"] == 0
+
+
+def test_entries_are_kept_while_database_is_down():
+    bind = FakeBind(fail=True)
+    buffer = AuditBuffer(bind=bind, batch_size=10, flush_interval=60, max_entries=100)
+    buffer.add(_entry("create"))
+
+    assert buffer.flush() == 0
+    assert buffer.stats()["buffered"] == 1
+
+    bind.fail = False
+    assert buffer.flush() == 1
+    buffer.close()
+
+
+def test_rejected_row_is_dropped_when_database_is_up():
+    bind = FakeBind(reject="delete")
+    buffer = AuditBuffer(bind=bind, batch_size=10, flush_interval=60, max_entries=100)
+    buffer.add(_entry("delete"))
+
+    assert buffer.flush() == 0
+    assert buffer.stats()["buffered"] == 0
+    assert buffer.stats()["failed"] == 1
+
+    buffer.add(_entry("create"))
+    buffer.add(_entry("delete"))
+    assert buffer.flush() == 1
+    assert [[row["action"] for row in batch] for batch in bind.batches] == [["create"]]
+    buffer.close()
+
+
+def test_full_buffer_drops_oldest_entries_without_touching_the_database():
+    bind = FakeBind(fail=True)
+    buffer = AuditBuffer(bind=bind, batch_size=2, flush_interval=60, max_entries=3)
+    buffer._ensure_thread = lambda: None  # Sem thread: só o que add() faz no request
+    bind.connect = bind.begin = None  # add() não pode abrir conexão
+
+    for action in ("a", "b", "c", "d", "e"):
+        buffer.add(_entry(action))
+
+    assert buffer.stats()["buffered"] == 3
+    assert buffer.stats()["dropped"] == 2
+    assert [entry["action"] for entry in buffer._entries] == ["c", "d", "e"]
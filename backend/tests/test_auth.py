@@ -7,6 +7,8 @@ from app.core.security import get_password_hash
 
 client = TestClient(app)
 
+pytestmark = pytest.mark.usefixtures("async_db_override")
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -5,9 +5,12 @@ from app.db.database import SessionLocal, Base, engine
 from app.db.models import User, Bill, BillStatus
 from app.core.security import get_password_hash, create_access_token
 import io
+import asyncio
 
 client = TestClient(app)
 
+pytestmark = pytest.mark.usefixtures("async_db_override")
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -76,3 +79,56 @@ def test_upload_bill(auth_token):
     data = response.json()
     assert "bill_id" in data
 
+
+
+@pytest.fixture
+def local_ocr(monkeypatch):
+    """Celery unavailable: uploads go to a one-slot local OCR executor that never runs."""
+    from app.api.v1 import bills as bills_router
+    from app.services.ocr_executor import OCRExecutor
+    from app.tasks.bill_tasks import process_bill_upload
+
+    def celery_down(*args, **kwargs):
+        raise ConnectionError("broker unavailable")
+
+    executor = OCRExecutor(workers=1, queue_size=0)
+    monkeypatch.setattr(process_bill_upload, "apply_async", celery_down)
+    monkeypatch.setattr(bills_router, "ocr_executor", executor)
+    monkeypatch.setattr(executor, "_run_job", lambda *args, **kwargs: asyncio.sleep(0))
+    return executor
+
+
+def _upload(auth_token):
+    file_content = b"%PDF-1.4\n%%EOF"
+    return client.post(
+        "/api/v1/bills/upload",
+        headers={"Authorization": f"Bearer {auth_token}"},
+        files={"file": ("test.pdf", file_content, "application/pdf")}
+    )
+
+
+def test_upload_is_refused_with_429_when_ocr_queue_is_full(auth_token, local_ocr, db):
+    response = _upload(auth_token)
+    assert response.status_code == 201
+
+    response = _upload(auth_token)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    # O boleto recusado não fica no banco
+    assert db.query(Bill).count() == 1
+
+
+def test_processing_status_reports_the_local_job(auth_token, local_ocr):
+    upload = _upload(auth_token).json()
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.get(f"/api/v1/bills/{upload['bill_id']}/processing-status", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["job_id"] == upload["job_id"]
+    assert response.json()["status"] == "queued"
+
+    job = local_ocr.get_job(upload["job_id"])
+    job.update(status="failed", error="unreadable file")
+    response = client.get(f"/api/v1/bills/{upload['bill_id']}/processing-status", headers=headers)
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"] == "unreadable file"
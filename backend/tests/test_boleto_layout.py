@@ -0,0 +1,84 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services.boleto_layout import detect_boleto_regions
+from app.services.ocr_service import OCRService
+
+WIDTH, HEIGHT = 1200, 1700
+GRID_TOP, ROW, ROWS = 1100, 50, 8
+COLUMN_X = 860
+
+
+def _blank_page():
+    return np.full((HEIGHT, WIDTH), 255, dtype=np.uint8)
+
+
+def _boleto_page():
+    """Binarized page with a payer receipt on top and the ficha de compensação grid below."""
+    page = _blank_page()
+    for y in (200, 260):  # Recibo do pagador
+        page[y:y + 3, 50:WIDTH - 50] = 0
+    for row in range(ROWS + 1):
+        y = GRID_TOP + row * ROW
+        page[y:y + 3, 50:WIDTH - 50] = 0
+    page[GRID_TOP:GRID_TOP + ROWS * ROW, COLUMN_X:COLUMN_X + 3] = 0
+    return page
+
+
+def test_regions_are_found_in_the_ficha_grid():
+    regions = detect_boleto_regions(_boleto_page())
+
+    assert set(regions) == {"linha_digitavel", "campos", "beneficiario"}
+    x, y, w, h = regions["campos"]
+    assert COLUMN_X <= x <= COLUMN_X + 12
+    assert abs(y - GRID_TOP) <= 3 and abs(h - ROWS * ROW) <= 3
+    # Linha digitável logo acima da grade, não no recibo do pagador
+    x, y, w, h = regions["linha_digitavel"]
+    assert GRID_TOP - 2 * ROW < y < GRID_TOP and abs(y + h - GRID_TOP) <= 3
+    x, y, w, h = regions["beneficiario"]
+    assert x == 0 and x + w < COLUMN_X
+
+
+def test_page_without_grid_has_no_regions():
+    assert detect_boleto_regions(_blank_page()) is None
+
+
+def _service_recording_ocr(region_text: str):
+    service = OCRService()
+    service.ocr_sizes = []
+
+    def fake_ocr_image(image, config=None):
+        service.ocr_sizes.append(image.size)
+        return (("page text" if image.size == (WIDTH, HEIGHT) else region_text), 0.9)
+
+    service._ocr_image = fake_ocr_image
+    return service
+
+
+def test_whole_page_is_read_when_no_region_is_found(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ROI_ENABLED", True)
+    service = _service_recording_ocr(region_text="")
+
+    assert service._ocr_preprocessed(_blank_page()) == ("page text", 0.9)
+    assert service.ocr_sizes == [(WIDTH, HEIGHT)]
+
+
+def test_whole_page_is_read_when_regions_miss_essential_fields(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ROI_ENABLED", True)
+    service = _service_recording_ocr(region_text="texto sem campos")
+
+    assert service._ocr_preprocessed(_boleto_page()) == ("page text", 0.9)
+    assert len(service.ocr_sizes) == 4 and service.ocr_sizes[-1] == (WIDTH, HEIGHT)
+
+
+def test_regions_alone_are_read_when_they_have_the_fields(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ROI_ENABLED", True)
+    service = _service_recording_ocr(
+        region_text="Vencimento: 10/11/2026 Valor do documento R$ 150,00 "
+                    "23790.12345 60000.000000 00000.000000 1 00000000015000"
+    )
+
+    text, confidence = service._ocr_preprocessed(_boleto_page())
+
+    assert "page text" not in text and confidence == 0.9
+    assert (WIDTH, HEIGHT) not in service.ocr_sizes
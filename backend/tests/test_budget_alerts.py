@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.security import get_password_hash
+from app.db.database import Base, SessionLocal, engine
+from app.db.models import (
+    BillStatus, BillType, Notification, NotificationChannel, NotificationType, User, UserMonthlySummary
+)
+from app.tasks.notification_tasks import _budget_alert_candidates
+
+TODAY = date(2025, 3, 20)
+MONTH = date(2025, 3, 1)
+
+
+@pytest.fixture(scope="function")
+def db():
+    """Create test database session."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _user(db, name: str, income: float, expenses: float, status=BillStatus.PAID, month=MONTH, **values) -> User:
+    user = User(
+        name=name,
+        email=f"{name}@example.com",
+        password_hash=get_password_hash("test123"),
+        email_verified=values.pop("email_verified", True),
+        **values
+    )
+    db.add(user)
+    db.flush()
+    if income:
+        db.add(UserMonthlySummary(user_id=user.id, month=month, type=BillType.INCOME,
+                                  category="", status=BillStatus.PAID, total=income, count=1))
+    if expenses:
+        db.add(UserMonthlySummary(user_id=user.id, month=month, type=BillType.EXPENSE,
+                                  category="moradia", status=status, total=expenses, count=1))
+    db.commit()
+    return user
+
+
+def _alert(db, user: User, sent_at: datetime):
+    db.add(Notification(
+        user_id=user.id,
+        type=NotificationType.ANOMALY,
+        channel=NotificationChannel.EMAIL,
+        sent_at=sent_at,
+        created_at=sent_at,
+        status="sent"
+    ))
+    db.commit()
+
+
+def _candidate_names(db):
+    return {user.name: (float(income), float(expenses)) for user, income, expenses in _budget_alert_candidates(db, TODAY)}
+
+
+def test_only_users_spending_more_than_they_earn_are_candidates(db):
+    _user(db, "over", income=1000, expenses=1500)
+    _user(db, "under", income=1000, expenses=500)
+    _user(db, "no_income", income=0, expenses=300)
+    _user(db, "pending_only", income=1000, expenses=1500, status=BillStatus.PENDING)
+    _user(db, "last_month", income=1000, expenses=1500, month=date(2025, 2, 1))
+    _user(db, "inactive", income=1000, expenses=1500, is_active=False)
+    _user(db, "unverified", income=1000, expenses=1500, email_verified=False)
+
+    assert _candidate_names(db) == {"over": (1000.0, 1500.0)}
+
+
+def test_users_already_alerted_today_are_left_out(db):
+    alerted = _user(db, "alerted", income=1000, expenses=1500)
+    _alert(db, alerted, datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=8))
+    alerted_yesterday = _user(db, "alerted_yesterday", income=1000, expenses=1500)
+    _alert(db, alerted_yesterday, datetime.combine(TODAY, datetime.min.time()) - timedelta(hours=3))
+
+    assert _candidate_names(db) == {"alerted_yesterday": (1000.0, 1500.0)}
@@ -0,0 +1,204 @@
+import asyncio
+import fnmatch
+import time
+
+from app.services.cache_service import CacheService
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.published = []
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def expire(self, key, ttl):
+        return True
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args: self.calls.append((name, args))
+
+            def execute(self):
+                return [getattr(redis, name)(*args) for name, args in self.calls]
+
+        return Pipeline()
+
+    def scan_iter(self, match, count):
+        return [key for key in list(self.values) if fnmatch.fnmatch(key, match)]
+
+    def delete(self, *keys):
+        return self.unlink(*keys)
+
+    def publish(self, channel, message):
+        self.published.append(message.partition("|")[2])
+
+    def pubsub(self, **kwargs):
+        return FakePubSub()
+
+    def unlink(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+        return len(keys)
+
+
+class FakePubSub:
+    def subscribe(self, channel):
+        pass
+
+    def get_message(self, timeout):
+        time.sleep(timeout)
+        return None
+
+    def close(self):
+        pass
+
+
+def _service() -> CacheService:
+    return CacheService(client=FakeRedis())
+
+
+def test_invalidation_bumps_the_generation():
+    service = _service()
+    service.set_cached_response("user-1", "qual meu saldo?", "R$ 10", context_hash="abc", ttl=300)
+    service.set_cached_response("user-2", "qual meu saldo?", "R$ 20", context_hash="abc", ttl=300)
+
+    service.invalidate_user_cache("user-1")
+
+    assert service.get_cached_response("user-1", "qual meu saldo?", "abc") is None
+    assert service.get_cached_response("user-2", "qual meu saldo?", "abc") == "R$ 20"
+
+
+def test_reaper_removes_only_stale_generations():
+    service = _service()
+    service.set_cached_response("user-1", "oi", "Olá!")
+    service.redis_client.values["chatbot:cache:user-1:1a2b3c4d"] = "formato antigo"
+    service.invalidate_user_cache("user-1")
+    service.set_cached_response("user-1", "oi", "Olá de novo!")
+
+    assert service.reap_stale_entries(batch_size=1) == 2
+    assert service.get_cached_response("user-1", "oi") == "Olá de novo!"
+
+
+def test_l1_serves_repeat_reads_and_deletes_are_broadcast():
+    service = _service()
+    service.set("chatbot:context:user-1", "{}", ttl=60)
+    service.local.clear()
+
+    assert service.get("chatbot:context:user-1") == "{}"  # L2, preenche o L1
+    assert service.get("chatbot:context:user-1") == "{}"  # L1
+    service.delete("chatbot:context:user-1")
+
+    stats = service.stats()
+    assert (stats["l1"]["hits"], stats["l2"]["hits"]) == (1, 1)
+    assert service.redis_client.published == ["chatbot:context:user-1"]
+    assert service.get("chatbot:context:user-1") is None
+
+
+def test_redis_outage_falls_back_to_l1_and_backs_off():
+    service = _service()
+
+    class Down(FakeRedis):
+        def get(self, key):
+            raise ConnectionError("redis down")
+
+    service._client = Down()
+    assert service.get("chatbot:context:user-1") is None
+    assert service.stats()["redis_connected"] is False
+
+    service.set("chatbot:context:user-1", "{}", ttl=60)
+    assert service.get("chatbot:context:user-1") == "{}"
+
+
+class FakeAsyncRedis:
+    def __init__(self, values):
+        self.values = values
+        self.round_trips = 0
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            async def __aenter__(self):
+                self.calls = []
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def setex(self, key, ttl, value):
+                self.calls.append((key, value))
+
+            async def execute(self):
+                redis.round_trips += 1
+                redis.values.update(self.calls)
+
+        return Pipeline()
+
+
+def test_async_simple_and_contextual_lookup_is_one_round_trip():
+    service = _service()
+    service._get_async_client = lambda: fake
+    fake = FakeAsyncRedis(service.redis_client.values)
+
+    async def run():
+        await service.aset_cached_response("user-1", "qual meu saldo?", "R$ 10", context_hash="abc")
+        service.local.clear()
+        fake.round_trips = 0
+        return await service.aget_cached_responses("user-1", "qual meu saldo?", "abc")
+
+    assert asyncio.run(run()) == (None, "R$ 10")
+    assert fake.round_trips == 2  # geração (fora do L1) + as duas respostas num único MGET
+
+
+def test_async_client_is_closed_when_its_event_loop_finishes(monkeypatch):
+    """One redis.asyncio pool per loop, closed by asyncio.run's shutdown instead of leaking."""
+    import redis.asyncio as aioredis
+
+    class ClosableClient:
+        def __init__(self):
+            self.closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    created = []
+    monkeypatch.setattr(aioredis, "from_url", lambda *args, **kwargs: created.append(ClosableClient()) or created[-1])
+    service = _service()
+
+    async def use_client():
+        assert service._get_async_client() is service._get_async_client()
+
+    asyncio.run(use_client())
+    asyncio.run(use_client())
+    assert [client.closed for client in created] == [True, True]
+    assert service._async_client is None
+
+    async def use_and_close():
+        service._get_async_client()
+        await service.aclose()
+        assert created[-1].closed
+
+    asyncio.run(use_and_close())
+    assert len(created) == 3
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import date
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.db.models import Bill, BillType
+from app.services.chatbot_context import ChatbotContextCache, _changed_bill_users
+
+
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    async def aget(self, key):
+        return self.values.get(key)
+
+    async def aset(self, key, value, ttl):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_snapshot_is_only_reused_on_the_same_day():
+    cache = ChatbotContextCache(ttl=60, cache=FakeCache())
+    user_id = uuid4()
+    asyncio.run(cache.aset(user_id, {"as_of": "2025-11-20", "total_bills": 3}))
+
+    assert asyncio.run(cache.aget(user_id, date(2025, 11, 20))) == {"as_of": "2025-11-20", "total_bills": 3}
+    assert asyncio.run(cache.aget(user_id, date(2025, 11, 21))) is None
+
+    cache.invalidate(user_id)
+    assert asyncio.run(cache.aget(user_id, date(2025, 11, 20))) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_bill_writes_mark_the_owner_for_invalidation():
+    session = Session()
+    user_id = uuid4()
+    session.add(Bill(user_id=user_id, type=BillType.EXPENSE, amount=10.0))
+
+    assert _changed_bill_users(session) == {user_id}
@@ -0,0 +1,162 @@
+import asyncio
+from contextlib import contextmanager
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.db.models import User
+from app.services.chatbot_quota import FREE_LIMIT, ChatbotQuota, ChatbotQuotaExceededError
+
+
+class FakeRedis:
+    """Just the commands ChatbotQuota uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def incrby(self, key, amount=1):
+        self.values[key] = int(self.values.get(key, 0)) + amount
+        return self.values[key]
+
+    def incr(self, key):
+        return self.incrby(key)
+
+    def decr(self, key):
+        return self.incrby(key, -1)
+
+    def expireat(self, key, when):
+        return True
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def spop(self, key, count):
+        members = self.sets.get(key, set())
+        return [members.pop() for _ in range(min(count, len(members)))]
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.calls]
+
+
+class FakeAsyncRedis:
+    """redis.asyncio view of the same FakeRedis data (consume runs on the event loop)."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    def pipeline(self):
+        return FakeAsyncPipeline(self.redis)
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        async def call(*args):
+            return command(*args)
+        return call
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return super().execute()
+
+
+class FakeBind:
+    def __init__(self):
+        self.rows = []
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, statement, rows):
+        self.rows.extend(rows)
+
+
+TODAY = date(2025, 11, 20)
+
+
+def _user(**prefs) -> User:
+    return User(id=uuid4(), notif_prefs=prefs)
+
+
+def _quota() -> ChatbotQuota:
+    redis = FakeRedis()
+    return ChatbotQuota(redis_client=redis, async_redis_client=FakeAsyncRedis(redis))
+
+
+def test_counter_is_seeded_from_db_and_stops_at_the_limit():
+    quota = _quota()
+    user = _user(chatbot_messages_this_month=FREE_LIMIT - 1, chatbot_month_reset_date="2025-11-01")
+
+    assert asyncio.run(quota.consume(user, db=None, today=TODAY)) == FREE_LIMIT
+    with pytest.raises(ChatbotQuotaExceededError) as error:
+        asyncio.run(quota.consume(user, db=None, today=TODAY))
+    assert error.value.reset_in_days == 11
+    assert quota._redis.values[quota._key(user.id, date(2025, 11, 1))] == FREE_LIMIT
+
+
+def test_previous_month_counter_is_ignored():
+    quota = _quota()
+    user = _user(chatbot_messages_this_month=FREE_LIMIT, chatbot_month_reset_date="2025-10-01")
+
+    assert asyncio.run(quota.consume(user, db=None, today=TODAY)) == 1
+
+
+def test_flush_writes_dirty_counters():
+    quota = _quota()
+    user = _user()
+    for _ in range(3):
+        asyncio.run(quota.consume(user, db=None, today=TODAY))
+
+    bind = FakeBind()
+    assert quota.flush(bind, today=TODAY) == 1
+    assert bind.rows == [{"user_id": user.id, "used": 3, "month": "2025-11-01"}]
+    assert quota.flush(bind, today=TODAY) == 0
+
+
+def test_redis_error_falls_back_to_the_database():
+    class BrokenRedis(FakeAsyncRedis):
+        def pipeline(self):
+            raise ConnectionError("redis down")
+
+    class FakeResult:
+        def scalar(self):
+            return 1
+
+    class FakeSession:
+        committed = False
+
+        async def execute(self, statement, params):
+            return FakeResult()
+
+        async def commit(self):
+            self.committed = True
+
+    quota = ChatbotQuota(redis_client=FakeRedis(), async_redis_client=BrokenRedis(FakeRedis()))
+    db = FakeSession()
+
+    assert asyncio.run(quota.consume(_user(), db=db, today=TODAY)) == 1
+    assert db.committed
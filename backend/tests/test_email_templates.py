@@ -0,0 +1,28 @@
+from app.services.email_templates import CompiledTemplate, EmailTemplateEngine
+
+
+def test_compiled_template_renders_placeholders():
+    """Placeholders are replaced; missing values render empty."""
+    template = CompiledTemplate("t", "<p>Olá, {{name}}!</p>{{ extra }}<a href=\"{{url}}/app\"></a>")
+    html = template.render({"name": "Ana", "url": "http://x"})
+    assert html == "<p>Olá, Ana!</p><a href=\"http://x/app\"></a>"
+    assert template.fields == ["name", "extra", "url"]
+
+
+def test_engine_caches_compiled_templates(tmp_path):
+    """Templates are read from disk once and reused."""
+    (tmp_path / "partials").mkdir()
+    (tmp_path / "partials" / "row.html").write_text("<li>{{item}}</li>", encoding="utf-8")
+    engine = EmailTemplateEngine(tmp_path)
+
+    assert engine.precompile() == 1
+    (tmp_path / "partials" / "row.html").write_text("changed", encoding="utf-8")
+    assert engine.render("partials/row", item="a") == "<li>a</li>"
+
+
+def test_report_layouts_have_no_unrendered_placeholders():
+    """The shipped report layouts only use the placeholders the service fills."""
+    engine = EmailTemplateEngine()
+    for name in ("report_monthly", "report_weekly", "report_daily"):
+        html = engine.render(name, **{field: "x" for field in engine.get(name).fields})
+        assert "{{" not in html
@@ -0,0 +1,59 @@
+"""
+Import-time budget: importing the API and the Celery task modules must not
+pull in the OCR/storage stacks or connect to Redis/MinIO.
+Orçamento total ajustável com IMPORT_TIME_BUDGET_MS (CI mais lento).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "4000"))
+
+# Só devem ser importados quando o serviço é usado de fato
+HEAVY_MODULES = {"pytesseract", "pdf2image", "cv2", "ocrmypdf", "pdfminer", "minio", "google.generativeai"}
+
+CHECK_LAZY_SERVICES = (
+    "from app.services.cache_service import cache_service; "
+    "from app.services.storage_service import storage_service; "
+    "assert not cache_service.initialized and not storage_service.initialized"
+)
+
+
+def _import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time (us) per module, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["app.main", "app.tasks.bill_tasks"])
+def test_import_skips_heavy_services(module):
+    times = _import_times(f"import {module}; {CHECK_LAZY_SERVICES}")
+    assert not HEAVY_MODULES & set(times), f"{module} importou {sorted(HEAVY_MODULES & set(times))}"
+
+
+def test_api_import_budget():
+    times = _import_times("import app.main")
+    elapsed_ms = times["app.main"] / 1000
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS, f"import app.main levou {elapsed_ms:.0f}ms"
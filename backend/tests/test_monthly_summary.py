@@ -0,0 +1,44 @@
+from datetime import date
+from uuid import uuid4
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from app.db.models import Bill, BillStatus, BillType
+from app.services.monthly_summary import _collect_deltas
+
+
+def _persisted_bill(**values) -> Bill:
+    """Bill attached to a session as if it had been loaded from the database."""
+    bill = Bill(id=uuid4(), **values)
+    make_transient_to_detached(bill)
+    session = Session()
+    session.add(bill)
+    return bill
+
+
+def test_new_bill_adds_to_its_month():
+    user_id = uuid4()
+    session = Session()
+    session.add(Bill(user_id=user_id, due_date=date(2025, 3, 15), amount=100.0, category="moradia"))
+    assert _collect_deltas(session) == {
+        (user_id, date(2025, 3, 1), BillType.EXPENSE, "moradia", BillStatus.PENDING): [100.0, 1]
+    }
+
+
+def test_status_change_moves_bill_between_rows():
+    user_id = uuid4()
+    bill = _persisted_bill(
+        user_id=user_id, due_date=date(2025, 3, 15), amount=80.0,
+        type=BillType.EXPENSE, status=BillStatus.PENDING, category=None
+    )
+    bill.status = BillStatus.PAID
+    assert _collect_deltas(Session.object_session(bill)) == {
+        (user_id, date(2025, 3, 1), BillType.EXPENSE, "", BillStatus.PENDING): [-80.0, -1],
+        (user_id, date(2025, 3, 1), BillType.EXPENSE, "", BillStatus.PAID): [80.0, 1],
+    }
+
+
+def test_bill_without_due_date_is_left_out():
+    session = Session()
+    session.add(Bill(user_id=uuid4(), due_date=None, amount=None))
+    assert _collect_deltas(session) == {}
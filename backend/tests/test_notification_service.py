@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import notification_service as notification_module
+from app.services.notification_service import NotificationService
+
+
+class FakeResponse:
+    status_code = 201
+    text = ""
+
+
+class FakeHTTPClient:
+    def __init__(self):
+        self.payloads = []
+
+    async def post(self, url, json, headers):
+        self.payloads.append(json)
+        return FakeResponse()
+
+
+def _service(brevo: bool = True, smtp: bool = False) -> NotificationService:
+    service = NotificationService()
+    service.brevo_api_key = "key" if brevo else ""
+    service.smtp_host = "smtp.test" if smtp else ""
+    service.smtp_user = service.smtp_password = "x" if smtp else ""
+    return service
+
+
+def _messages(count: int):
+    return [{"to": f"user{i}@example.com", "subject": f"s{i}", "body": f"b{i}", "html_body": None} for i in range(count)]
+
+
+def test_bulk_send_splits_messages_into_brevo_batches(monkeypatch):
+    monkeypatch.setattr(notification_module, "BREVO_BATCH_SIZE", 2)
+    service = _service()
+    client = FakeHTTPClient()
+    service._get_http_client = lambda: client
+
+    assert asyncio.run(service.send_emails_bulk(_messages(5))) == [True] * 5
+    assert [[v["to"][0]["email"] for v in p["messageVersions"]] for p in client.payloads] == [
+        ["user0@example.com", "user1@example.com"],
+        ["user2@example.com", "user3@example.com"],
+        ["user4@example.com"],
+    ]
+
+
+def test_messages_of_a_failed_batch_fall_back_to_smtp(monkeypatch):
+    monkeypatch.setattr(notification_module, "BREVO_BATCH_SIZE", 2)
+    service = _service(smtp=True)
+    batches, smtp_sent = [], []
+
+    async def send_batch(messages):
+        batches.append(len(messages))
+        return len(batches) != 2  # Segundo lote recusado pelo Brevo
+
+    async def send_smtp(to, subject, body, html_body=None):
+        smtp_sent.append(to)
+        return to != "user3@example.com"
+
+    service._send_batch_via_brevo = send_batch
+    service._send_via_smtp = send_smtp
+
+    assert asyncio.run(service.send_emails_bulk(_messages(5))) == [True, True, True, False, True]
+    assert batches == [2, 2, 1]
+    assert smtp_sent == ["user2@example.com", "user3@example.com"]
+
+
+def test_batch_that_timed_out_is_not_resent_over_smtp(monkeypatch):
+    monkeypatch.setattr(notification_module, "BREVO_BATCH_SIZE", 2)
+    service = _service(smtp=True)
+    smtp_sent = []
+
+    async def send_batch(messages):
+        return None  # Timeout depois do envio: o Brevo pode ter aceitado
+
+    async def send_smtp(to, subject, body, html_body=None):
+        smtp_sent.append(to)
+        return True
+
+    service._send_batch_via_brevo = send_batch
+    service._send_via_smtp = send_smtp
+
+    assert asyncio.run(service.send_emails_bulk(_messages(3))) == [None, None, None]
+    assert smtp_sent == []
+
+
+@pytest.mark.parametrize("error, expected", [
+    (httpx.ReadTimeout("read timeout"), None),
+    (httpx.ConnectError("refused"), False),
+])
+def test_brevo_batch_outcome_depends_on_whether_the_request_went_out(error, expected):
+    service = _service()
+
+    class FailingClient:
+        async def post(self, url, json, headers):
+            raise error
+
+    service._get_http_client = lambda: FailingClient()
+
+    assert asyncio.run(service._send_batch_via_brevo(_messages(2))) is expected
+
+
+def test_smtp_fallback_is_bounded(monkeypatch):
+    monkeypatch.setattr(notification_module.settings, "EMAIL_SEND_CONCURRENCY", 2)
+    service = _service(brevo=False, smtp=True)
+    running, peak = 0, 0
+
+    async def send_smtp(to, subject, body, html_body=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    service._send_via_smtp = send_smtp
+
+    assert asyncio.run(service.send_emails_bulk(_messages(6))) == [True] * 6
+    assert peak == 2
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import ocr_executor as ocr_executor_module
+from app.services.ocr_executor import OCRExecutor, OCRQueueFullError
+
+
+class FakeOCRExecutor(OCRExecutor):
+    """OCRExecutor with threads instead of processes and no database."""
+
+    def __init__(self, workers: int, queue_size: int):
+        super().__init__(workers=workers, queue_size=queue_size)
+        self._threads = ThreadPoolExecutor(max_workers=workers)
+        self.stored = []
+        self.published = []
+
+    def _get_pool(self):
+        return self._threads
+
+    async def _store_result(self, bill_id, document_id, ocr_text, ocr_confidence, ocr_method, filename, s3_path):
+        self.stored.append((bill_id, ocr_text, ocr_method))
+
+    async def _publish(self, job):
+        self.published.append(job["status"])
+
+
+@pytest.fixture
+def release(monkeypatch):
+    """Page OCR stand-in that blocks until the test sets the event."""
+    event = threading.Event()
+
+    def fake_run_ocr(file_bytes, content_type):
+        event.wait(5)
+        if file_bytes == b"broken":
+            raise ValueError("unreadable file")
+        return "LINHA DIGITAVEL", 0.9, "ocr"
+
+    monkeypatch.setattr(ocr_executor_module, "_run_ocr", fake_run_ocr)
+    return event
+
+
+def _submit(executor: OCRExecutor, job_id: str, file_bytes: bytes = b"pdf"):
+    return executor.submit(job_id=job_id, bill_id=f"bill-{job_id}", user_id="user", file_bytes=file_bytes, content_type="application/pdf")
+
+
+async def _until_finished(executor: OCRExecutor, *job_ids):
+    while any(not executor.get_job(job_id)["finished_at"] for job_id in job_ids):
+        await asyncio.sleep(0.01)
+
+
+def test_submit_beyond_workers_plus_queue_is_refused(release):
+    async def scenario():
+        executor = FakeOCRExecutor(workers=1, queue_size=1)
+        _submit(executor, "a")
+        _submit(executor, "b")
+        with pytest.raises(OCRQueueFullError):
+            _submit(executor, "c")
+        assert executor.stats() == {"workers": 1, "capacity": 2, "in_flight": 2}
+
+        release.set()
+        await _until_finished(executor, "a", "b")
+        assert executor.has_capacity()
+        _submit(executor, "c")
+        await _until_finished(executor, "c")
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_job_status_goes_from_queued_to_completed(release):
+    async def scenario():
+        executor = FakeOCRExecutor(workers=1, queue_size=0)
+        job = _submit(executor, "a")
+        assert job["status"] == "queued"
+
+        await asyncio.sleep(0.05)
+        assert executor.get_job("a")["status"] == "processing"
+
+        release.set()
+        await _until_finished(executor, "a")
+        assert executor.get_job("a")["status"] == "completed"
+        assert executor.get_job("a")["ocr_method"] == "ocr"
+        assert executor.stored == [("bill-a", "LINHA DIGITAVEL", "ocr")]
+        assert executor.published == ["queued", "processing", "completed"]
+        assert executor.in_flight == 0
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_failed_ocr_marks_the_job_failed(release):
+    async def scenario():
+        executor = FakeOCRExecutor(workers=1, queue_size=0)
+        release.set()
+        _submit(executor, "a", file_bytes=b"broken")
+        await _until_finished(executor, "a")
+
+        job = executor.get_job("a")
+        assert job["status"] == "failed"
+        assert job["error"] == "unreadable file"
+        assert executor.stored == []
+        assert executor.in_flight == 0
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_store_result_keeps_blocking_steps_off_the_event_loop(monkeypatch):
+    from app.services import bill_processing
+
+    threads = {}
+
+    def record(name, result):
+        def step(*args):
+            threads[name] = threading.current_thread()
+            return result
+        return step
+
+    async def extract_bill_fields(**kwargs):
+        threads["extract"] = threading.current_thread()
+        return {"amount": 10.0}
+
+    executor = OCRExecutor(workers=1, queue_size=0)
+    monkeypatch.setattr(executor, "_save_ocr", record("save_ocr", True))
+    monkeypatch.setattr(executor, "_image_url", record("image_url", "http://minio/boleto.pdf"))
+    monkeypatch.setattr(executor, "_save_extraction", record("save_extraction", None))
+    monkeypatch.setattr(bill_processing, "extract_bill_fields", extract_bill_fields)
+
+    asyncio.run(executor._store_result("bill", "doc", "LINHA DIGITAVEL 123", 0.9, "ocr", "b.pdf", "bills/b.pdf"))
+
+    loop_thread = threads.pop("extract")
+    assert loop_thread is threading.current_thread()
+    assert set(threads) == {"save_ocr", "image_url", "save_extraction"}
+    assert all(thread is not loop_thread for thread in threads.values())
+
+
+def test_job_waiting_for_a_worker_stays_queued(release):
+    async def scenario():
+        executor = FakeOCRExecutor(workers=1, queue_size=1)
+        _submit(executor, "a")
+        _submit(executor, "b")
+
+        await asyncio.sleep(0.05)
+        assert executor.get_job("a")["status"] == "processing"
+        assert executor.get_job("b")["status"] == "queued"
+
+        release.set()
+        await _until_finished(executor, "a", "b")
+        assert executor.get_job("b")["status"] == "completed"
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_job_of_another_worker_is_read_from_redis(monkeypatch):
+    class FakeRedis:
+        def __init__(self):
+            self.data = {}
+
+        async def setex(self, key, ttl, value):
+            self.data[key] = value
+
+        async def get(self, key):
+            return self.data.get(key)
+
+    class FakeCacheService:
+        def __init__(self, client):
+            self.client = client
+
+        def _get_async_client(self):
+            return self.client
+
+    monkeypatch.setattr(ocr_executor_module, "cache_service", FakeCacheService(FakeRedis()))
+    owner, other = OCRExecutor(workers=1, queue_size=0), OCRExecutor(workers=1, queue_size=0)
+
+    async def scenario():
+        job = {"job_id": "a", "bill_id": "bill-a", "status": "processing", "error": None}
+        await owner._publish(job)
+        assert other.get_job("a") is None
+        assert await other.aget_job("a") == job
+        assert await other.aget_job("missing") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,118 @@
+from app.core.config import settings
+from app.services.ocr_service import OCRService
+
+# Linha digitável, vencimento e valor: os campos que encerram o OCR das páginas
+BOLETO_TEXT = (
+    "Vencimento: 10/11/2026\n"
+    "Valor do documento R$ 150,00\n"
+    "23790.12345 60000.000000 00000.000000 1 00000000015000"
+)
+
+
+def _service_with_pages(pages):
+    """OCRService whose page OCR returns pages[n] for page n and records the calls."""
+    service = OCRService()
+    service.ocr_calls = []
+
+    def fake_ocr_pdf_page(pdf_bytes, page_number):
+        service.ocr_calls.append(page_number)
+        return pages.get(page_number, f"pagina {page_number}"), 0.8
+
+    service._ocr_pdf_page = fake_ocr_pdf_page
+    return service
+
+
+def test_page_ocr_stops_once_essential_fields_are_found(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_PAGE_WORKERS", 2)
+    service = _service_with_pages({2: BOLETO_TEXT})
+
+    results = service._ocr_pdf_pages(b"%PDF", page_numbers=list(range(1, 11)))
+
+    assert [page for page, _, _ in results] == [1, 2]
+    # Renderização preguiçosa: no máximo um worker à frente da página consumida
+    assert set(service.ocr_calls) <= {1, 2, 3}
+
+
+def test_known_text_counts_towards_early_exit(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_PAGE_WORKERS", 1)
+    service = _service_with_pages({1: "Valor do documento R$ 150,00"})
+    known_text = "Vencimento: 10/11/2026\n23790.12345 60000.000000 00000.000000 1 00000000015000"
+
+    results = service._ocr_pdf_pages(b"%PDF", page_numbers=[1, 2, 3], known_text=known_text)
+
+    assert [page for page, _, _ in results] == [1]
+    assert service.ocr_calls == [1]
+
+
+def test_every_page_is_read_when_fields_are_missing(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_PAGE_WORKERS", 3)
+    service = _service_with_pages({})
+
+    results = service._ocr_pdf_pages(b"%PDF", page_numbers=[1, 2, 3, 4, 5])
+
+    assert [page for page, _, _ in results] == [1, 2, 3, 4, 5]
+
+
+def _pdf(pages):
+    """Minimal PDF with one Helvetica text line per entry of each page ([] = page without text layer)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for lines in pages:
+        content = b"".join(
+            b"BT /F1 12 Tf 50 %d Td (%s) Tj ET\n" % (700 - 20 * i, line.encode("latin-1"))
+            for i, line in enumerate(lines)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+BOLETO_LINES = BOLETO_TEXT.split("\n")
+
+
+def test_digital_pdf_is_read_from_the_text_layer_without_ocr():
+    service = _service_with_pages({})
+
+    text, confidence, method = service.extract_text_from_pdf_with_method(_pdf([BOLETO_LINES]))
+
+    assert method == "text_layer"
+    assert "Valor do documento R$ 150,00" in text
+    assert confidence == 0.99
+    assert service.ocr_calls == []
+
+
+def test_only_pages_without_text_layer_are_rasterized():
+    service = _service_with_pages({2: "Valor do documento R$ 150,00"})
+    pdf = _pdf([["Beneficiario: ACME ENERGIA SA", "Vencimento: 10/11/2026"], [], ["Instrucoes de pagamento do boleto"]])
+
+    text, confidence, method = service.extract_text_from_pdf_with_method(pdf)
+
+    assert method == "mixed"
+    assert service.ocr_calls == [2]
+    # Ordem das páginas preservada: texto embutido, OCR, texto embutido
+    assert text.index("Vencimento") < text.index("Valor do documento") < text.index("Instrucoes")
+    assert 0.8 < confidence < 0.99
+
+
+def test_scanned_pdf_goes_through_ocr():
+    service = _service_with_pages({1: BOLETO_TEXT})
+
+    text, _, method = service.extract_text_from_pdf_with_method(_pdf([[], []]))
+
+    assert method == "ocr"
+    assert service.ocr_calls[0] == 1 and "150,00" in text
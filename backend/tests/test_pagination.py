@@ -0,0 +1,60 @@
+import pytest
+from datetime import date
+from uuid import uuid4
+from fastapi import HTTPException
+
+from app.api.pagination import decode_cursor, encode_cursor, parse_fields, select_columns
+from app.api.v1.bills import BILL_LIST_FIELDS
+from app.db.models import Bill
+
+
+def test_cursor_round_trip():
+    """Cursor keeps the sort value type and the row id."""
+    row_id = uuid4()
+    assert decode_cursor(encode_cursor(date(2025, 3, 10), row_id), Bill.due_date) == (date(2025, 3, 10), row_id)
+    assert decode_cursor(encode_cursor(None, row_id), Bill.due_date) == (None, row_id)
+    assert decode_cursor(encode_cursor(0.42, row_id), Bill.confidence) == (0.42, row_id)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor", Bill.due_date)
+    assert exc.value.status_code == 400
+
+
+def test_fields_projection():
+    """Only the requested columns plus the keyset columns are selected."""
+    names = parse_fields("amount, due_date", BILL_LIST_FIELDS)
+    assert names == ["amount", "due_date"]
+    columns = select_columns(BILL_LIST_FIELDS, names, Bill.due_date, Bill.id)
+    assert [column.key for column in columns] == ["amount", "due_date", "id"]
+
+    assert parse_fields(None, BILL_LIST_FIELDS) == list(BILL_LIST_FIELDS)
+    with pytest.raises(HTTPException):
+        parse_fields("amount,password_hash", BILL_LIST_FIELDS)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/bills", "/api/v1/payments", "/api/v1/investments", "/api/v1/savings-goals", "/api/v1/qa/pending",
+])
+def test_list_endpoints_are_paginated_by_default(path):
+    """A request without ?limit= gets one page, not every row."""
+    from app.core.config import settings
+    from app.main import app
+
+    parameters = app.openapi()["paths"][path]["get"]["parameters"]
+    limit = next(parameter for parameter in parameters if parameter["name"] == "limit")
+    assert limit["schema"]["default"] == settings.LIST_DEFAULT_LIMIT
+    assert limit["schema"]["maximum"] == settings.LIST_MAX_LIMIT
+
+
+def test_next_cursor_header_is_exposed_to_the_browser():
+    """With allow_credentials the browser ignores expose_headers="*"; the frontend reads X-Next-Cursor."""
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.main import app
+
+    origin = settings.get_cors_origins()[0]
+    response = TestClient(app).get("/health", headers={"Origin": origin})
+    exposed = {header.strip().lower() for header in response.headers["access-control-expose-headers"].split(",")}
+    assert "x-next-cursor" in exposed
@@ -0,0 +1,42 @@
+from datetime import date
+
+from app.db.partitions import (
+    Partition,
+    add_months,
+    create_partition_sql,
+    expired,
+    parent_table,
+    parse_partition,
+    partition_name,
+)
+
+
+def test_partition_names_round_trip():
+    name = partition_name("notifications", date(2025, 12, 1))
+
+    assert name == "notifications_p2025_12"
+    assert parse_partition(name) == Partition("notifications", name, date(2025, 12, 1))
+    assert parse_partition("notifications_pkey") is None
+    assert parent_table("audit_logs_p2024_01") == "audit_logs"
+    assert parent_table("bills") == "bills"
+
+
+def test_monthly_bounds_cross_the_year():
+    assert add_months(date(2025, 12, 1), 1) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert "FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')" in create_partition_sql(
+        "audit_logs", date(2025, 12, 1)
+    )
+
+
+def test_only_whole_months_past_retention_expire():
+    partitions = [
+        Partition("audit_logs", partition_name("audit_logs", date(2024, month, 1)), date(2024, month, 1))
+        for month in (9, 10, 11)
+    ]
+
+    # Corte em 2024-11-10: outubro inteiro já passou, novembro ainda tem linhas dentro do prazo
+    assert [p.name for p in expired(partitions, 365, today=date(2025, 11, 10))] == [
+        "audit_logs_p2024_09",
+        "audit_logs_p2024_10",
+    ]
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.services.password_hasher import PasswordHashExecutor, PasswordHashQueueFullError
+
+
+def test_hash_and_verify_off_the_event_loop():
+    executor = PasswordHashExecutor(workers=1, queue_size=1)
+
+    async def run():
+        hashed = await executor.hash("test123")
+        return await executor.verify("test123", hashed), await executor.verify("errada", hashed)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+        assert executor.stats()["completed"] == 3
+    finally:
+        executor.shutdown()
+
+
+def test_full_queue_is_rejected():
+    executor = PasswordHashExecutor(workers=1, queue_size=0)
+
+    async def run():
+        return await asyncio.gather(executor.hash("a"), executor.hash("b"), return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+        assert isinstance(results[1], PasswordHashQueueFullError)
+        assert executor.stats()["rejected"] == 1
+    finally:
+        executor.shutdown()
@@ -0,0 +1,18 @@
+import pytest
+from app.db.database import SessionLocal, Base, engine
+from app.db.query_plans import find_seq_scans
+
+
+@pytest.fixture(scope="function")
+def db():
+    """Create test database session."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_per_user_queries_use_indexes(db):
+    """The endpoint, chatbot and Celery sweep queries must not Seq Scan."""
+    assert find_seq_scans(db) == {}
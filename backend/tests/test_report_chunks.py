@@ -0,0 +1,114 @@
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded  # type: ignore
+
+from app.core.security import get_password_hash
+from app.db.database import Base, SessionLocal, engine
+from app.db.models import Notification, User
+from app.services.notification_service import notification_service
+from app.tasks import notification_tasks
+from app.tasks.notification_tasks import _build_monthly_report_for_user, _run_report_chunk
+
+
+class FakeTask:
+    def __init__(self):
+        self.replaced = []
+
+    def update_state(self, **kwargs):
+        pass
+
+    def s(self, *args, **kwargs):
+        return args, kwargs
+
+    def replace(self, signature):
+        self.replaced.append(signature)
+        return "replaced"
+
+
+@pytest.fixture(scope="function")
+def db():
+    """Create test database session."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def _users(db, *names):
+    users = [
+        User(name=name, email=f"{name}@example.com", password_hash=get_password_hash("test123"), email_verified=True)
+        for name in names
+    ]
+    db.add_all(users)
+    db.commit()
+    return [str(user.id) for user in users]
+
+
+def _statuses(db):
+    db.expire_all()
+    return sorted(
+        (user.name, notification.status)
+        for notification, user in db.query(Notification, User).join(User, User.id == Notification.user_id)
+    )
+
+
+def _run(task, user_ids, **kwargs):
+    return _run_report_chunk(task, "monthly", user_ids, _build_monthly_report_for_user, 9, 2025, **kwargs)
+
+
+def test_claims_keep_unconfirmed_sends_from_going_out_twice(db, monkeypatch):
+    user_ids = _users(db, "sent", "refused", "timeout")
+    outcomes = {"sent@example.com": True, "refused@example.com": False, "timeout@example.com": None}
+    sent_to = []
+
+    async def send_emails_bulk(messages):
+        sent_to.extend(message["to"] for message in messages)
+        return [outcomes[message["to"]] for message in messages]
+
+    monkeypatch.setattr(notification_service, "send_emails_bulk", send_emails_bulk)
+    task = FakeTask()
+
+    assert _run(task, user_ids) == {"sent": 1, "skipped": 0, "failed": 1, "unconfirmed": 1, "requeued": 0}
+    assert _statuses(db) == [("refused", "failed"), ("sent", "sent"), ("timeout", "pending")]
+
+    sent_to.clear()
+    assert _run(task, user_ids)["skipped"] == 2
+    assert sent_to == ["refused@example.com"]  # Só a recusa definitiva é tentada de novo
+    assert task.replaced == []
+
+
+def test_users_claimed_before_the_soft_time_limit_are_not_requeued(db, monkeypatch):
+    user_ids = _users(db, *(f"user{i}" for i in range(5)))
+    monkeypatch.setattr(notification_tasks, "REPORT_SEND_BATCH_SIZE", 2)
+    rounds = []
+
+    async def send_emails_bulk(messages):
+        rounds.append(len(messages))
+        if len(rounds) == 2:
+            raise SoftTimeLimitExceeded()
+        return [True] * len(messages)
+
+    monkeypatch.setattr(notification_service, "send_emails_bulk", send_emails_bulk)
+    task = FakeTask()
+
+    assert _run(task, user_ids) == "replaced"
+
+    (args, kwargs), = task.replaced
+    assert len(args[0]) == 1 and args[1:] == (9, 2025)
+    assert kwargs == {
+        "attempt": 2,
+        "carried": {"sent": 2, "skipped": 0, "failed": 0, "unconfirmed": 2, "requeued": 1},
+    }
+    assert [status for _, status in _statuses(db)].count("pending") == 2
+
+
+def test_chunk_gives_up_after_the_last_attempt(db, monkeypatch):
+    user_ids = _users(db, "slow")
+    monkeypatch.setattr(notification_tasks, "REPORT_CHUNK_TIME_BUDGET", -1)
+    task = FakeTask()
+    carried = {"sent": 3, "skipped": 1, "failed": 0, "unconfirmed": 0, "requeued": 1}
+
+    stats = _run(task, user_ids, attempt=notification_tasks.REPORT_MAX_ATTEMPTS, carried=carried)
+
+    assert stats == {"sent": 3, "skipped": 1, "failed": 1, "unconfirmed": 0, "requeued": 1}
+    assert task.replaced == []
@@ -0,0 +1,77 @@
+import smtplib
+from email.mime.text import MIMEText
+
+import pytest
+
+from app.services import smtp_pool
+from app.services.smtp_pool import SMTPConnectionPool
+
+
+class FakeSMTP:
+    """smtplib.SMTP stand-in; the first connection drops on its first send."""
+
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        self.fail_with = smtplib.SMTPServerDisconnected("Connection unexpectedly closed") if not FakeSMTP.instances else None
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.sent.append(msg["To"])
+
+    def rset(self):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(smtp_pool.smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+
+def _message(to: str):
+    msg = MIMEText("body")
+    msg["To"] = to
+    return msg
+
+
+def test_dropped_connection_is_replaced_and_the_message_retried(fake_smtp):
+    pool = SMTPConnectionPool("smtp.test", 587, "user", "secret", size=1)
+
+    pool.send(_message("a@example.com"))
+    pool.send(_message("b@example.com"))
+
+    first, second = fake_smtp.instances
+    assert first.closed
+    assert second.sent == ["a@example.com", "b@example.com"]
+    pool.close()
+
+
+def test_rejected_message_keeps_the_connection(fake_smtp):
+    pool = SMTPConnectionPool("smtp.test", 587, "user", "secret", size=1)
+    pool.send(_message("a@example.com"))  # Conexão nova depois da primeira cair
+    connection = fake_smtp.instances[-1]
+    connection.fail_with = smtplib.SMTPDataError(550, b"rejected")
+
+    with pytest.raises(smtplib.SMTPDataError):
+        pool.send(_message("b@example.com"))
+
+    connection.fail_with = None
+    pool.send(_message("c@example.com"))
+    assert len(fake_smtp.instances) == 2
+    assert connection.sent == ["a@example.com", "c@example.com"]
+    pool.close()
@@ -0,0 +1,142 @@
+import asyncio
+from uuid import uuid4
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from app.db.models import User
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import UserCache
+
+
+def _user(**values) -> User:
+    user = User(id=uuid4(), name="Test User", email="test@example.com", is_active=True, token_version=0, **values)
+    make_transient_to_detached(user)
+    return user
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.commands.append(("get", key))
+
+    def ttl(self, key):
+        self.commands.append(("ttl", key))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [self.redis.data.get(key) if name == "get" else self.redis.ttl_left for name, key in self.commands]
+
+
+class FakeAsyncRedis:
+    def __init__(self, ttl_left: int = 30):
+        self.data = {}
+        self.ttl_left = ttl_left
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class FakeCacheService:
+    def __init__(self, client):
+        self.client = client
+
+    def _get_async_client(self):
+        return self.client
+
+    def _handle_error(self, action, error):
+        raise error
+
+
+def _get(cache, user_id, token_version):
+    return asyncio.run(cache.aget(user_id, token_version))
+
+
+def _set(cache, user):
+    asyncio.run(cache.aset(user))
+
+
+def test_hit_requires_matching_token_version():
+    cache = UserCache(ttl=60, max_entries=10)
+    user = _user(notif_prefs={"is_premium": True})
+    _set(cache, user)
+
+    assert _get(cache, user.id, token_version=1) is None
+    cached = _get(cache, str(user.id), token_version=0)
+    assert cached.id == user.id and cached.notif_prefs == {"is_premium": True}
+
+
+def test_invalidate_and_lru_eviction():
+    cache = UserCache(ttl=60, max_entries=2)
+    first, second, third = _user(), _user(), _user()
+    for user in (first, second, third):
+        _set(cache, user)
+
+    assert _get(cache, first.id, 0) is None  # o mais antigo sai do LRU
+    cache.invalidate(second.id)
+    assert _get(cache, second.id, 0) is None
+    assert _get(cache, third.id, 0) is not None
+
+
+def test_cached_user_is_a_copy():
+    """Mutating the returned user (chatbot counters) must not change the cache entry."""
+    cache = UserCache(ttl=60, max_entries=10)
+    user = _user(notif_prefs={"chatbot_messages_this_month": 1})
+    _set(cache, user)
+
+    _get(cache, user.id, 0).notif_prefs["chatbot_messages_this_month"] = 99
+    assert _get(cache, user.id, 0).notif_prefs == {"chatbot_messages_this_month": 1}
+
+
+def test_l1_miss_reads_redis_in_one_round_trip(monkeypatch):
+    redis = FakeAsyncRedis(ttl_left=30)
+    monkeypatch.setattr(user_cache_module, "cache_service", FakeCacheService(redis))
+    writer, reader = UserCache(ttl=60, max_entries=10), UserCache(ttl=60, max_entries=10)
+    user = _user()
+    _set(writer, user)
+
+    assert _get(reader, user.id, 0).id == user.id
+    assert redis.round_trips == 1
+    assert _get(reader, user.id, 0) is not None
+    assert redis.round_trips == 1  # segunda leitura vem do L1
+    assert reader.stats()["entries"] == 1
+
+
+class FakeSession:
+    def __init__(self, *user_ids):
+        self.info = {"user_cache_invalidate": set(user_ids)}
+
+
+def test_commit_on_the_event_loop_invalidates_without_blocking(monkeypatch):
+    cache = UserCache(ttl=60, max_entries=10)
+    calls = []
+
+    async def ainvalidate(user_id):
+        calls.append(("async", user_id))
+
+    monkeypatch.setattr(cache, "invalidate", lambda user_id: calls.append(("sync", user_id)))
+    monkeypatch.setattr(cache, "ainvalidate", ainvalidate)
+    monkeypatch.setattr(user_cache_module, "user_cache", cache)
+    user = _user()
+    _set(cache, user)
+
+    async def commit_on_loop():
+        user_cache_module._invalidate_changed_users(FakeSession(user.id))
+        assert cache.local.get(str(user.id)) is None  # L1 sai na hora
+        await asyncio.sleep(0)
+
+    asyncio.run(commit_on_loop())
+    user_cache_module._invalidate_changed_users(FakeSession(user.id))
+
+    assert calls == [("async", user.id), ("sync", user.id)]
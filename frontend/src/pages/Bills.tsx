@@ -1,7 +1,7 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { Link } from 'react-router-dom'
-import api from '../services/api'
+import api, { getAllPages } from '../services/api'
 import { Plus, FileText, Upload, Filter, X, Search, Trash2 } from 'lucide-react'
 import { translateStatus, translateCategory } from '../utils/translations'
 import LoadingSpinner from '../components/LoadingSpinner'
@@ -75,8 +75,7 @@ export default function Bills() {
       if (filters.to_date) params.append('to_date', filters.to_date)
       
       params.append('is_bill', 'true') // Apenas boletos
-      const response = await api.get(`/bills?${params.toString()}`)
-      return response.data
+      return getAllPages(`/bills?${params.toString()}`)
     },
   })
 
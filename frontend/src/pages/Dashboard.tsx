@@ -1,6 +1,6 @@
 import { useMemo } from 'react'
 import { useQuery } from '@tanstack/react-query'
-import api from '../services/api'
+import api, { getAllPages } from '../services/api'
 import { AlertCircle, DollarSign, FileText, ArrowUpCircle, ArrowDownCircle, TrendingUp } from 'lucide-react'
 import { translateStatus, translateCategory } from '../utils/translations'
 import { 
@@ -28,16 +28,14 @@ export default function Dashboard() {
   const { data: bills, isLoading: isLoadingBills } = useQuery({
     queryKey: ['bills'],
     queryFn: async () => {
-      const response = await api.get('/bills?is_bill=true')
-      return response.data
+      return getAllPages('/bills?is_bill=true')
     },
   })
 
   const { data: finances, isLoading: isLoadingFinances } = useQuery({
     queryKey: ['finances'],
     queryFn: async () => {
-      const response = await api.get('/bills?is_bill=false')
-      return response.data
+      return getAllPages('/bills?is_bill=false')
     },
   })
 
@@ -45,8 +43,7 @@ export default function Dashboard() {
     queryKey: ['investments'],
     queryFn: async () => {
       try {
-        const response = await api.get('/investments')
-        return response.data || []
+        return await getAllPages('/investments')
       } catch (error) {
         console.error('Erro ao buscar investimentos:', error)
         return []
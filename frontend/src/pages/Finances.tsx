@@ -1,7 +1,7 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { Link } from 'react-router-dom'
-import api from '../services/api'
+import api, { getAllPages } from '../services/api'
 import { Plus, DollarSign, Filter, X, Search, Trash2, TrendingUp, TrendingDown } from 'lucide-react'
 import { translateStatus, translateCategory } from '../utils/translations'
 import LoadingSpinner from '../components/LoadingSpinner'
@@ -77,8 +77,7 @@ export default function Finances() {
       if (filters.from_date) params.append('from_date', filters.from_date)
       if (filters.to_date) params.append('to_date', filters.to_date)
       
-      const response = await api.get(`/bills?${params.toString()}`)
-      return response.data
+      return getAllPages(`/bills?${params.toString()}`)
     },
   })
 
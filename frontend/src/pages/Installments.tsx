@@ -1,6 +1,6 @@
 import { useMemo } from 'react'
 import { useQuery } from '@tanstack/react-query'
-import api from '../services/api'
+import { getAllPages } from '../services/api'
 import { Plus, CreditCard } from 'lucide-react'
 import { useState } from 'react'
 import { translateStatus } from '../utils/translations'
@@ -23,8 +23,7 @@ export default function Installments() {
   const { data: bills, isLoading } = useQuery({
     queryKey: ['bills'],
     queryFn: async () => {
-      const response = await api.get('/bills')
-      return response.data
+      return getAllPages('/bills')
     },
   })
 
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import api from '../services/api'
+import api, { getAllPages } from '../services/api'
 import { Plus, TrendingUp, Edit, Trash2, X, ArrowUp, ArrowDown } from 'lucide-react'
 
 interface Investment {
@@ -48,8 +48,7 @@ export default function Investments() {
     queryKey: ['investments', typeFilter],
     queryFn: async () => {
       const params = typeFilter ? `?type_filter=${typeFilter}` : ''
-      const response = await api.get(`/investments${params}`)
-      return response.data
+      return getAllPages<Investment>(`/investments${params}`)
     },
   })
 
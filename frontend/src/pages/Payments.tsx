@@ -1,5 +1,5 @@
 import { useQuery } from '@tanstack/react-query'
-import api from '../services/api'
+import { getAllPages } from '../services/api'
 import { Calendar, CheckCircle, Clock } from 'lucide-react'
 import { translateStatus, translatePaymentMethod } from '../utils/translations'
 import LoadingSpinner from '../components/LoadingSpinner'
@@ -9,8 +9,7 @@ export default function Payments() {
   const { data: payments, isLoading } = useQuery({
     queryKey: ['payments'],
     queryFn: async () => {
-      const response = await api.get('/payments')
-      return response.data
+      return getAllPages('/payments')
     },
   })
 
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import api from '../services/api'
+import api, { getAllPages } from '../services/api'
 import { Plus, Target, Calendar, DollarSign, TrendingUp, Edit, Trash2, X, Check } from 'lucide-react'
 
 interface SavingsGoal {
@@ -32,8 +32,7 @@ export default function SavingsGoals() {
   const { data: goals, isLoading } = useQuery<SavingsGoal[]>({
     queryKey: ['savings-goals'],
     queryFn: async () => {
-      const response = await api.get('/savings-goals')
-      return response.data
+      return getAllPages<SavingsGoal>('/savings-goals')
     },
   })
 
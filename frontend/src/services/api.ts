@@ -105,5 +105,17 @@ api.interceptors.response.use(
   }
 )
 
+// Listagens paginadas por cursor: segue o header X-Next-Cursor até a última página
+export async function getAllPages<T = any>(url: string): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | undefined
+  do {
+    const response = await api.get<T[]>(url, { params: cursor ? { cursor } : undefined })
+    items.push(...response.data)
+    cursor = response.headers['x-next-cursor']
+  } while (cursor)
+  return items
+}
+
 export default api
 